@@ -0,0 +1,122 @@
+#Benchmark of the GET_DDL parsing of RealDataProvider
+#Run from the repo root:  python -m benchmarks.ddl_parser_bench  [--quick]
+#
+#Scaling: synthetic GET_DDL strings of growing size (columns, joins, nested functions) are fed to
+#get_transform / get_source_details / get_dynamic_table_config through a stub session,
+#and the time per KB of DDL is compared between the sizes (a quadratic parser blows up here)
+#The round trip of the same synthetic models (model -> DDL -> parser -> model) is tests/test_ddl_parser.py
+#Exit code is 1 if the scaling looks worse than linear.
+import argparse
+import random
+import sys
+import time
+
+from models.column import Column
+from models.dynamic_table import DynamicTable
+from utils.data_provider import RealDataProvider
+from utils.ddl_compiler import compile_from_clause
+
+#Time per KB of the biggest DDL may be at most this many times the time per KB of the 100 column DDL
+MAX_SCALING_RATIO = 3.0
+
+TYPES = ["NUMBER", "NUMBER(38,0)", "VARCHAR", "VARCHAR(100)", "BOOLEAN", "TIMESTAMP_NTZ(9)", "DATE", "FLOAT", "VARIANT"]
+FUNCTIONS = ["LEFT({}, 2)", "UPPER({})", "COALESCE({}, 0)", "TRIM({})", "IFF({} IS NULL, 'a,b', 'c')", "NVL({}, '')"]
+JOIN_TYPES = ["LEFT JOIN", "INNER JOIN", "RIGHT JOIN", "FULL OUTER JOIN"]
+
+
+#Answers every query with the DDL of the object named in it, like SELECT GET_DDL(...) would
+class StubSession:
+
+    def __init__(self, ddls):
+        self.ddls = ddls  #object name -> ddl
+        self.query_count = 0
+
+    def sql(self, query):
+        self.query_count += 1
+        name = query.split("'")[3].split('.')[-1]
+        return _StubResult([[self.ddls[name]]])
+
+
+class _StubResult:
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def collect(self):
+        return self.rows
+
+
+def nested(expression, rnd, depth):
+    for _ in range(depth):
+        expression = rnd.choice(FUNCTIONS).format(expression)
+    return expression
+
+
+#Columns and FROM clause the same way the editors build them
+def synthetic_parts(rnd, n_columns, n_joins, depth):
+    aliases = [f"T{i + 1}" for i in range(n_joins + 1)]
+    columns, expected = [], []
+    for i in range(n_columns):
+        source = f"{rnd.choice(aliases)}.COL_{i}"
+        data_type = rnd.choice(TYPES)
+        kind = rnd.random()
+        if kind < 0.2:
+            name, transformation = f"COL_{i}", source  #source column under its own name
+        elif kind < 0.3:
+            name, transformation = f"COL_{i}", f"COL_{i}"  #unqualified column, rendered without alias
+        else:
+            name, transformation = f"C_{i}", nested(source, rnd, depth)
+        columns.append(Column(name, data_type, expression=transformation))
+        expected.append({'alias': name, 'type': data_type, 'transformation': transformation})
+
+    sources = [{'schema': f"SCH_{i % 3}", 'table': f"TBL_{i}", 'alias': alias} for i, alias in enumerate(aliases)]
+    joins = [{'join_type': rnd.choice(JOIN_TYPES), 'right_alias': alias, 'on_condition': f"T1.ID = {alias}.ID AND {alias}.K = 'x;y'"}
+             for alias in aliases[1:]]
+    return columns, compile_from_clause(sources, joins), expected, sources, joins
+
+
+def parse_all(name, ddl, obj_type):
+    provider = RealDataProvider(session=StubSession({name: ddl}))
+    transforms = provider.get_transform('SCH_0', name, obj_type)
+    sources, joins = provider.get_source_details('SCH_0', name, obj_type)
+    config = provider.get_dynamic_table_config('SCH_0', name) if obj_type == 'Dynamic Table' else None
+    return transforms, sources, joins, config
+
+
+def run_scaling(quick):
+    rnd = random.Random(42)
+    sizes = [(10, 1, 0), (100, 3, 1), (1000, 10, 2), (5000, 30, 3)]
+    if quick:
+        sizes = sizes[:3]
+    print(f"{'columns':>8} {'joins':>6} {'depth':>6} {'ddl KB':>8} {'ms':>9} {'columns/s':>11} {'us/column':>10}")
+    per_kb = []
+    for n_columns, n_joins, depth in sizes:
+        columns, from_clause, _, _, _ = synthetic_parts(rnd, n_columns, n_joins, depth)
+        ddl = DynamicTable('SCH_0', 'BENCH_DT', columns, from_clause, 'WH', '1 minute').create_ddl()
+        runs = max(1, 2000 // n_columns)
+        started = time.perf_counter()
+        for _ in range(runs):
+            parse_all('BENCH_DT', ddl, 'Dynamic Table')
+        elapsed = (time.perf_counter() - started) / runs
+        per_kb.append(elapsed / len(ddl))
+        print(f"{n_columns:>8} {n_joins:>6} {depth:>6} {len(ddl) / 1024:>8.1f} {elapsed * 1000:>9.2f} "
+              f"{n_columns / elapsed:>11.0f} {elapsed / n_columns * 1e6:>10.2f}")
+
+    #the smallest DDL is dominated by fixed costs, compare from the 2nd size on
+    ratio = per_kb[-1] / per_kb[1]
+    print(f"scaling ratio (time per KB, biggest vs {sizes[1][0]} columns): {ratio:.2f}")
+    return ratio <= MAX_SCALING_RATIO
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GET_DDL parser benchmark")
+    parser.add_argument("--quick", action="store_true", help="skip the 5,000 column case")
+    args = parser.parse_args()
+    if not run_scaling(args.quick):
+        print(f"scaling looks worse than linear (ratio > {MAX_SCALING_RATIO})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
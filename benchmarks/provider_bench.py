@@ -0,0 +1,64 @@
+#How the catalog paths of the pages scale with the size of the account, on the synthetic MockDataProvider
+#Run from the repo root:  python -m benchmarks.provider_bench  [--quick] [--latency-ms 50]
+#
+#Every size runs the same calls as a user walking through the pages: schema list, object lists, type-ahead search,
+#columns of the picked sources (bulk), transforms + sources + dynamic table settings of an existing object.
+#Cold = 1st call (goes through the _fetch_* methods), warm = the same call again (served from the catalog cache).
+import argparse
+import sys
+import time
+
+from utils.data_provider import MockDataProvider
+
+SIZES = [
+    (5, 200, 30),
+    (20, 2000, 100),
+    (50, 10000, 500),
+]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def page_calls(provider):
+    schema = provider.get_schemas("DB")[-1]
+    tables = provider.get_tables(schema)
+    view = provider.get_views(schema)[0]
+    dynamic_table = provider.get_tables(schema, 'dynamic')[0]
+    sources = [{'schema': schema, 'table': name} for name in tables[:5]]
+    return [
+        ("get_schemas", lambda: provider.get_schemas("DB")),
+        ("get_tables", lambda: provider.get_tables(schema)),
+        ("search_objects", lambda: provider.search_objects(schema, "ORDERS", limit=50)),
+        ("get_columns_bulk (5)", lambda: provider.get_columns_bulk(sources)),
+        ("get_transform (view)", lambda: provider.get_transform(schema, view, 'View')),
+        ("get_source_details", lambda: provider.get_source_details(schema, view, 'View')),
+        ("get_dynamic_table_config", lambda: provider.get_dynamic_table_config(schema, dynamic_table)),
+    ]
+
+
+def run(sizes, latency_ms):
+    print(f"{'schemas x objects x columns':>28} {'call':>26} {'cold ms':>9} {'warm ms':>9}")
+    for schemas, objects, columns in sizes:
+        provider = MockDataProvider(schemas=schemas, objects_per_schema=objects, columns=columns, latency_ms=latency_ms)
+        for name, call in page_calls(provider):
+            provider.invalidate()
+            cold = timed(call)
+            warm = timed(call)
+            print(f"{f'{schemas} x {objects} x {columns}':>28} {name:>26} {cold:9.1f} {warm:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog provider scaling benchmark (synthetic catalog)")
+    parser.add_argument("--quick", action="store_true", help="skip the 50 x 10,000 x 500 case")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated round trip per query")
+    args = parser.parse_args()
+    run(SIZES[:-1] if args.quick else SIZES, args.latency_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+from utils.snowflake_connector import get_session
+from utils.settings import get_igloo_settings
+from utils.batch_deploy import get_batch, get_batch_runs, start_batch, dependency_waves, DEFAULT_PARALLELISM
+
+
+def batch_deploy():
+    st.markdown("## Batch Deploy")
+    st.caption("Objects added with 'Add to batch' on the Create / Modify pages. They are deployed in dependency order: "
+               "an object waits for the tables and views it selects from, independent objects run at the same time.")
+
+    batch = get_batch()
+    waves = None
+
+    #1. QUEUED OBJECTS + the order they will run in
+    with st.container(border=True):
+        st.markdown("#### 1. Queued Objects")
+        if not batch:
+            st.info("The batch is empty. Build an object and press 'Add to batch'.")
+        else:
+            try:
+                waves, depends_on = dependency_waves(batch)
+            except ValueError as e:
+                st.error(str(e))
+
+            if waves:
+                rows = []
+                for number, wave in enumerate(waves, start=1):
+                    for item in wave:
+                        rows.append({
+                            "wave": number,
+                            "object": f"{item.schema_name}.{item.object_name}",
+                            "type": item.object_type,
+                            "waits for": ", ".join(".".join(dep) for dep in sorted(depends_on[item.key])),
+                        })
+                st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+            c1, c2, c3 = st.columns([2, 1, 1])
+            with c1:
+                to_remove = st.selectbox("Object", [f"{item.schema_name}.{item.object_name}" for item in batch], key="batch_remove_object")
+            with c2:
+                st.write("")
+                if st.button("Remove", key="batch_remove_btn"):
+                    batch[:] = [item for item in batch if f"{item.schema_name}.{item.object_name}" != to_remove]
+                    st.rerun()
+            with c3:
+                st.write("")
+                if st.button("Clear batch", key="batch_clear_btn"):
+                    batch.clear()
+                    st.rerun()
+
+            with st.expander("DDL of the queued objects"):
+                for item in batch:
+                    st.markdown(f"**{item.schema_name}.{item.object_name}** ({item.object_type})")
+                    st.code(item.ddl_sql, language='sql')
+
+    #2. DEPLOY
+    if batch and waves:
+        with st.container(border=True):
+            st.markdown("#### 2. Deploy")
+            parallelism = st.number_input("Parallel deploys", min_value=1, max_value=32,
+                                          value=int(get_igloo_settings().get("batch_parallelism", DEFAULT_PARALLELISM)),
+                                          help="How many objects of the same wave are deployed at the same time")
+            if st.button("Deploy batch", type="primary", key="batch_deploy_btn"):
+                session = get_session()
+                if not session:
+                    st.error("No active Snowflake connection found. Check your connection settings.")
+                else:
+                    start_batch(session, list(batch), parallelism)
+                    batch.clear()
+                    st.rerun()
+
+    #3. REPORT of the batches of this session (the Deploys panel in the sidebar keeps them running)
+    for run in get_batch_runs():
+        with st.expander(f"Batch #{run.batch_id} - {'finished' if run.done() else 'running'}", expanded=run.batch_id == len(get_batch_runs())):
+            st.dataframe(pd.DataFrame(run.report()), use_container_width=True, hide_index=True)
+            st.caption(f"{len(run.waves)} waves, {run.elapsed():.1f}s in total")
+            if run.git_result:
+                if "Success!" in run.git_result:
+                    st.success(run.git_result)
+                else:
+                    st.error(run.git_result)
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from utils.snowflake_connector import get_session
+from utils.snowflake_connector import get_current_database
 from utils.data_provider import get_data_provider
 from components.table_editor import create_table, modify_table
 from components.view_editor import create_view, modify_view
@@ -9,11 +9,37 @@ from components.deploy_ui import display_deploy_button
 
 
 
-session = get_session()
-database = session.get_current_database()
-provider = get_data_provider()
+#Schemas with more objects than this get a search box, and the selectbox only gets the top matches
+SEARCH_THRESHOLD = 500
+SEARCH_LIMIT = 50
+
+#Dynamic table options
+REFRESH_MODES = ["AUTO", "INCREMENTAL", "FULL"]
+REFRESH_MODE_HELP = "INCREMENTAL only processes the changed rows, FULL recomputes the whole table, AUTO lets Snowflake choose."
+#ON_SCHEDULE first: the deploy returns at once instead of waiting for the initial refresh
+INITIALIZE_OPTIONS = ["ON_SCHEDULE", "ON_CREATE"]
+INITIALIZE_HELP = "ON_SCHEDULE: the deploy returns at once, the table fills at its 1st scheduled refresh. ON_CREATE: the deploy waits for the initial refresh."
+
+
+#Selectbox for picking an object of a schema. obj_type: 'all', 'normal', 'dynamic' or 'view'
+#Small schemas: plain selectbox with every object, it filters as you type (in the browser).
+#Big schemas: only the matches of the search text are sent to the browser. st.text_input only reruns the script on
+#Enter / leaving the box (no per keystroke event without a custom component), so the search runs on Enter,
+#the selectbox then filters those matches as you type
+def object_selectbox(label, schema_name, obj_type, key):
+    provider = get_data_provider()
+    count = provider.count_objects(schema_name, obj_type)
+    if count <= SEARCH_THRESHOLD:
+        return st.selectbox(label, provider.search_objects(schema_name, "", obj_type, limit=None), key=key)
+
+    query = st.text_input(f"Search {label}", key=f"{key}_search", placeholder="Type a part of the name, press Enter",
+                          help=f"{count} objects in {schema_name}, search on the server")
+    return st.selectbox(label, provider.search_objects(schema_name, query, obj_type, limit=SEARCH_LIMIT), key=key,
+                        help=f"Showing the first {SEARCH_LIMIT} matches of the search")
 
 def create_object():
+    provider = get_data_provider()
+    database = get_current_database()
     st.markdown("### Create new object")
     st.markdown("Configure your new Snowflake object below.")
 
@@ -47,7 +73,7 @@ def create_object():
             with c1:
                 src_schema = st.selectbox("Source Schema", provider.get_schemas(database), key="new_src_schema")
             with c2:
-                src_table = st.selectbox("Source Table", provider.get_tables(src_schema), key="new_src_table")
+                src_table = object_selectbox("Source Table", src_schema, 'all', key="new_src_table")
             with c3:
                 # Default alias: T + count
                 next_alias = f"T{len(st.session_state.builder_source_tables) + 1}"
@@ -111,6 +137,11 @@ def create_object():
                 warehouse = st.selectbox("Warehouse", ["COMPUTE_WH"], help="WH used for the refresh") #TODO: Get the WHs
             with c2:
                 target_lag = st.text_input("Refresh Lag", value="1 minute", help="e.g. '1 minute', '1 hour'")
+            c3, c4 = st.columns(2)
+            with c3:
+                refresh_mode = st.selectbox("Refresh Mode", REFRESH_MODES, help=REFRESH_MODE_HELP)
+            with c4:
+                initialize = st.selectbox("Initialize", INITIALIZE_OPTIONS, help=INITIALIZE_HELP)
 
     st.divider()
 
@@ -133,7 +164,7 @@ def create_object():
 
     elif obj_type == 'Dynamic Table':
         if source_tables:
-            final_ddl = create_dynamic_table(source_tables, joins, target_schema, target_name, warehouse, target_lag)
+            final_ddl = create_dynamic_table(source_tables, joins, target_schema, target_name, warehouse, target_lag, refresh_mode, initialize)
         else:
              st.info("Please select source tables.")
 
@@ -156,6 +187,8 @@ def create_object():
 
 
 def modify_object():
+    provider = get_data_provider()
+    database = get_current_database()
     st.markdown("### Modify an existing object")
     st.markdown("Configure your Snowflake object below.")
 
@@ -173,11 +206,11 @@ def modify_object():
         
         with c3:
             if obj_type == "View":
-                object_name = st.selectbox("Select Object", provider.get_views(selected_schema))
+                object_name = object_selectbox("Select Object", selected_schema, 'view', key="mod_object_view")
             elif obj_type == "Table":
-                object_name = st.selectbox("Select Object", provider.get_tables(selected_schema, 'normal'))
+                object_name = object_selectbox("Select Object", selected_schema, 'normal', key="mod_object_table")
             elif obj_type == "Dynamic Table":
-                object_name = st.selectbox("Select Object", provider.get_tables(selected_schema, 'dynamic'))
+                object_name = object_selectbox("Select Object", selected_schema, 'dynamic', key="mod_object_dt")
 
     #SOURCE CONFIGURATION (Modify)
     source_tables = []
@@ -218,7 +251,7 @@ def modify_object():
             with c1:
                 src_schema = st.selectbox("Source Schema", provider.get_schemas(database), key="mod_src_schema")
             with c2:
-                src_table = st.selectbox("Source Table", provider.get_tables(src_schema), key="mod_src_table")
+                src_table = object_selectbox("Source Table", src_schema, 'all', key="mod_src_table")
             with c3:
                 next_alias = f"T{len(st.session_state.builder_source_tables) + 1}"
                 src_alias = st.text_input("Alias", value=next_alias, key="mod_src_alias")
@@ -274,19 +307,51 @@ def modify_object():
             else:
                 joins = []
 
+    #ADVANCED SETTINGS (prefilled from the deployed table)
+    warehouse, target_lag, refresh_mode, initialize = None, None, None, None
+    if obj_type == "Dynamic Table" and object_name:
+        current_warehouse, current_lag = provider.get_dynamic_table_config(selected_schema, object_name)
+        current_mode = (provider.get_object_definition(selected_schema, object_name, 'Dynamic Table').refresh_mode or "AUTO").upper()
+        with st.container(border=True):
+            st.markdown("#### Dynamic Table Settings")
+
+            c1, c2 = st.columns(2)
+            with c1:
+                warehouse_options = sorted({"COMPUTE_WH", current_warehouse or "COMPUTE_WH"}) #TODO: Get the WHs
+                warehouse = st.selectbox("Warehouse", warehouse_options, index=warehouse_options.index(current_warehouse or "COMPUTE_WH"),
+                                         help="WH used for the refresh", key=f"mod_dt_wh_{selected_schema}_{object_name}")
+            with c2:
+                target_lag = st.text_input("Refresh Lag", value=current_lag or "1 minute", help="e.g. '1 minute', '1 hour'",
+                                           key=f"mod_dt_lag_{selected_schema}_{object_name}")
+            c3, c4 = st.columns(2)
+            with c3:
+                refresh_mode = st.selectbox("Refresh Mode", REFRESH_MODES,
+                                            index=REFRESH_MODES.index(current_mode) if current_mode in REFRESH_MODES else 0,
+                                            help=REFRESH_MODE_HELP + " Changing it recreates the table.",
+                                            key=f"mod_dt_mode_{selected_schema}_{object_name}")
+            with c4:
+                initialize = st.selectbox("Initialize", INITIALIZE_OPTIONS, help=INITIALIZE_HELP + " Only used if the table is recreated.",
+                                          key=f"mod_dt_init_{selected_schema}_{object_name}")
+
     #EDITORS:
     st.subheader(f"Design {obj_type} Columns")
     
     final_ddl = None # Initialize variable
+    git_ddl = None # Full CREATE statement for git, when final_ddl only has the changes (ALTER ...)
 
     if obj_type == 'Table':
-        final_ddl = modify_table(selected_schema, object_name)
+        final_ddl, git_ddl = modify_table(selected_schema, object_name)
+        if git_ddl and not final_ddl:
+            st.info("No changes compared to the deployed table.")
 
     if obj_type == 'View':
         final_ddl = modify_view(selected_schema, object_name, source_tables, joins)
 
     if obj_type == 'Dynamic Table':
-        final_ddl = modify_dynamic_table(selected_schema, object_name, source_tables, joins)
+        final_ddl, git_ddl = modify_dynamic_table(selected_schema, object_name, source_tables, joins, warehouse, target_lag,
+                                                  refresh_mode, initialize)
+        if git_ddl and not final_ddl:
+            st.info("No changes compared to the deployed dynamic table.")
 
 
 
@@ -303,6 +368,6 @@ def modify_object():
         
         commitmsg = st.text_input("Commit message", value="Commit msg")
         #Deployment Button
-        display_deploy_button(final_ddl,selected_schema,obj_type,object_name,commitmsg)
+        display_deploy_button(final_ddl,selected_schema,obj_type,object_name,commitmsg,git_content=git_ddl)
     
     return None
\ No newline at end of file
@@ -1,53 +1,124 @@
+import time
 import streamlit as st
 from utils.snowflake_connector import get_session
-from utils.git_manager import push_to_github
+from utils.deploy_jobs import submit_deploy, get_jobs, poll_jobs, running_jobs, SUCCEEDED, FAILED
+from utils.batch_deploy import BatchItem, add_to_batch, get_batch, get_batch_runs, poll_batches, running_batches
+from utils.git_manager import get_git_queue, get_git_backend
 
+#Seconds between 2 status checks of the running deploys
+POLL_INTERVAL = 2
 
-def display_deploy_button(ddl_sql,schema_name,object_type,object_name,commitmsg):
+#st.fragment reruns only the status panel on a timer (Streamlit >= 1.37), older versions get a refresh button
+_fragment = getattr(st, "fragment", None)
 
-    #Renders a 'Deploy' button. When clicked, it executes the provided SQL using the active Snowflake session.
+
+def display_deploy_button(ddl_sql,schema_name,object_type,object_name,commitmsg,git_content=None):
+
+    #Renders a 'Deploy' button. When clicked, it submits the provided SQL as an async Snowflake query and returns at once,
+    #the job (and the git push after it) is followed in the Deploys panel of the sidebar
+    #ddl_sql can hold more statements (eg. ALTER TABLE ...; ALTER TABLE ...;), they run in order
+    #git_content: what goes to the repo if it's not ddl_sql itself (the full CREATE statement for an ALTER deploy)
     # Don't show anything if there is no SQL
     if not ddl_sql:
         return
     
+    #Batch: collect more objects, deploy them together on the Batch Deploy page (in dependency order)
+    c1, c2 = st.columns([1, 4])
+    with c2:
+        if st.button("Add to batch", key="global_batch_btn", help="Deploy it later together with other objects (Batch Deploy page)"):
+            add_to_batch(BatchItem(schema_name, object_type, object_name, ddl_sql, commitmsg, git_content))
+            st.success(f"{schema_name}.{object_name} added to the batch ({len(get_batch())} objects).")
+
     # Using 'type="primary"' makes the button "stand out" - so user will know TO PRESS THIS!
-    if st.button("Deploy to Snowflake", type="primary", key="global_deploy_btn"):
+    with c1:
+        deploy_clicked = st.button("Deploy to Snowflake", type="primary", key="global_deploy_btn")
+    if deploy_clicked:
         
         session = get_session()
         
         if not session:
             st.error("No active Snowflake connection found. Check your connection settings.")
             return
-        
-        try:
-            with st.spinner("Executing DDL on Snowflake..."):
-                # .collect() actually runs the query and returns the result
-                result_df = session.sql(ddl_sql).collect()
-            
+
+        job = submit_deploy(session, ddl_sql, schema_name, object_type, object_name, commitmsg, git_content)
+        if job.status == FAILED:
+            st.error(f"Deployment Failed: {job.error}")
+        elif job.status == SUCCEEDED:
             st.success("Deployment Successful!")
-            
-            # Show the feedback from Snowflake (e.g. "View TEST_VIEW successfully created.")
-            st.dataframe(result_df)
-            
-            #Only push if it is sucesfully deployed to sf.
-            #Git push
-            with st.spinner("Pushing to GitHub..."):
-                #Construct a clean path: objects/SCHEMA/TYPE/NAME.sql
-                #file_path = f"snowflake_objects/testschema/testtype/testname.sql".lower()
-                file_path = f"snowflake_objects/{schema_name}/{object_type}/{object_name}.sql".lower()
-
-                git_result = push_to_github(
-                    file_path=file_path, 
-                    file_content=ddl_sql, 
-                    commit_message=commitmsg
-                )
-
-                if "Success!" in git_result:
-                    st.success(git_result)
-                else:
-                    st.error(git_result)
-            
-            
-        except Exception as e:
-            st.error(f"Deployment Failed: {e}")
+        else:
+            st.info(f"Deploy #{job.job_id} submitted, you can keep editing. Follow it in the Deploys panel.")
+
+
+#1 line per job: status, object, elapsed time, query id, errors / git result
+def _render_jobs():
+    finished = poll_jobs() + poll_batches()
+    if finished and not running_jobs() and not running_batches():
+        #everything is done: 1 full rerun stops the polling and the pages see the new catalog
+        st.rerun()
+    for run in get_batch_runs():
+        counts = ", ".join(f"{count} {status.lower()}" for status, count in run.counts().items())
+        st.markdown(f"{'✅' if run.done() else '⏳'} **Batch #{run.batch_id}** · wave {min(run.wave + 1, len(run.waves))}/{len(run.waves)} · {counts}")
+    jobs = get_jobs()
+    if not jobs:
+        if not get_batch_runs():
+            st.caption("No deploys in this session.")
+        return
+    for job in jobs:
+        icon = {SUCCEEDED: "✅", FAILED: "❌"}.get(job.status, "⏳")
+        st.markdown(f"{icon} **#{job.job_id} {job.schema_name}.{job.object_name}** · {job.status.lower()} · {job.elapsed():.0f}s")
+        if job.query_ids:
+            st.caption(f"Query ID: {job.query_ids[-1]}")
+        if job.error:
+            st.error(job.error)
+        if job.git_result:
+            if "Success!" in job.git_result:
+                st.caption(job.git_result)
+            else:
+                st.error(job.git_result)
+
+
+#GitHub sync queue: files waiting for the background push, failures (with a retry button)
+#With the local backend the queue commits into the clone, the clone's own push is shown under it
+def _render_git_sync():
+    backend = get_git_backend()
+    status = get_git_queue().status()
+    line = f"{'Git commit' if backend else 'GitHub sync'}: {status['pending']} pending"
+    if status['failed']:
+        line += f", {status['failed']} failed"
+    if status['last_push']:
+        line += f" · last {'commit' if backend else 'push'} {time.time() - status['last_push']:.0f}s ago"
+    st.caption(line)
+    if status['last_error'] and (status['pending'] or status['failed']):
+        st.caption(f"Last error: {status['last_error']}")
+    if status['failed'] and st.button("Retry GitHub sync", key="git_sync_retry"):
+        get_git_queue().retry_failed()
+    if backend and backend.remote:
+        remote = backend.status()
+        line = f"Git push: {remote['unpushed']} commit(s) waiting"
+        if remote['last_push']:
+            line += f" · last push {time.time() - remote['last_push']:.0f}s ago"
+        st.caption(line)
+        if remote['last_error']:
+            st.caption(f"Last push error: {remote['last_error']}")
+        if remote['unpushed'] and st.button("Push now", key="git_push_now"):
+            backend.push_now()
+
+
+def _render_panel():
+    _render_jobs()
+    _render_git_sync()
+
+
+def _busy():
+    return bool(running_jobs() or running_batches() or get_git_queue().status()['pending'])
+
 
+#Status panel of the deploys of this session (put it in the sidebar), polls while something runs
+def display_deploy_jobs():
+    if _fragment is not None:
+        #run_every only while a job runs (or files wait for GitHub), an idle panel doesn't rerun
+        _fragment(run_every=POLL_INTERVAL if _busy() else None)(_render_panel)()
+    else:
+        _render_panel()
+        if _busy():
+            st.button("Refresh status", key="deploy_jobs_refresh")
@@ -0,0 +1,64 @@
+import streamlit as st
+import pandas as pd
+from utils.snowflake_connector import get_session, get_current_database
+from utils.data_provider import get_data_provider
+from utils.drift import scan_drift, IN_SYNC, DRIFTED, NOT_IN_GIT, NOT_DEPLOYED
+
+
+def drift_report():
+    st.markdown("## Drift Report")
+    st.caption("Compares the deployed tables, views and dynamic tables with their .sql files in the repo. "
+               "Only what Igloo manages is compared (columns and types, the query, the dynamic table settings), "
+               "formatting differences don't count.")
+
+    provider = get_data_provider()
+
+    #1. SCAN
+    with st.container(border=True):
+        st.markdown("#### 1. Schemas")
+        schemas = provider.get_schemas(get_current_database())
+        selected = st.multiselect("Schemas to scan", schemas, default=schemas, key="drift_schemas")
+        if st.button("Scan", type="primary", key="drift_scan_btn", disabled=not selected):
+            session = get_session()
+            if not session:
+                st.error("No active Snowflake connection found. Check your connection settings.")
+            else:
+                with st.spinner("Reading the deployed DDL and the repo..."):
+                    try:
+                        st.session_state.drift_report = scan_drift(session, selected)
+                    except Exception as e:
+                        st.error(f"Scan failed: {e}")
+
+    report = st.session_state.get("drift_report")
+    if report is None:
+        return
+
+    #2. REPORT
+    with st.container(border=True):
+        st.markdown("#### 2. Report")
+        counts = report.counts()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("In sync", counts.get(IN_SYNC, 0))
+        c2.metric("Drifted", counts.get(DRIFTED, 0))
+        c3.metric("Not in Git", counts.get(NOT_IN_GIT, 0))
+        c4.metric("Not deployed", counts.get(NOT_DEPLOYED, 0))
+        st.caption(f"{len(report.rows)} objects in {len(report.schemas)} schema(s), scanned in {report.seconds:.1f}s")
+
+        statuses = st.multiselect("Show", [DRIFTED, NOT_IN_GIT, NOT_DEPLOYED, IN_SYNC],
+                                  default=[DRIFTED, NOT_IN_GIT, NOT_DEPLOYED], key="drift_status_filter")
+        rows = [row for row in report.rows if row['status'] in statuses]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.success("Nothing to show.")
+
+    #3. DIFF of 1 drifted object
+    drifted = [row for row in report.rows if row['status'] == DRIFTED]
+    if drifted:
+        with st.container(border=True):
+            st.markdown("#### 3. Differences")
+            path = st.selectbox("Object", [row['path'] for row in drifted],
+                                format_func=lambda path: next(f"{row['schema']}.{row['object']} ({row['type']})"
+                                                              for row in drifted if row['path'] == path),
+                                key="drift_diff_object")
+            st.code(report.diff(path), language='diff')
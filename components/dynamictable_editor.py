@@ -2,22 +2,30 @@
 import streamlit as st
 import pandas as pd
 from models.dynamic_table import DynamicTable  
+from utils.ddl_compiler import compile_select_columns, compile_from_clause, select_column_rows
+from utils.dynamic_table_diff import plan_dynamic_table_changes
 from utils.data_provider import get_data_provider
+from components.validation_ui import show_validation
+from utils.snowflake_connector import get_session
+from utils.refresh_mode_check import incremental_blockers, check_incremental
 
 #Base Types 
 sf_types = ["NUMBER", "VARCHAR", "BOOLEAN", "TIMESTAMP", "DATE", "VARIANT", "FLOAT"]
 #Base df
 #Prepare Data & Dynamic Options for existing datatypes from get_columns()
-provider = get_data_provider()
 
 
 
-def create_dynamic_table(source_tables, joins, target_schema, target_name, warehouse, target_lag):
+def create_dynamic_table(source_tables, joins, target_schema, target_name, warehouse, target_lag, refresh_mode=None, initialize=None):
+    provider = get_data_provider()
     
     #1. Create dynamic col_type options (both standard and already existing)
     #need this because i gave the coice to select the base types, but already existing can have more precies ones like NUMBER(38,0)
     #Fetch ALL columns at once
     rows_list = []
+
+    # Load the columns of every source table in one go (1 query per schema, not 1 DESCRIBE per table)
+    columns_by_source = provider.get_columns_bulk(source_tables)
         
     # Iterate through all source tables
     for tbl in source_tables:
@@ -25,8 +33,7 @@ def create_dynamic_table(source_tables, joins, target_schema, target_name, wareh
         table = tbl['table']
         alias = tbl['alias']
         
-        # We assume source is a Table for now
-        source_cols = provider.get_columns(schema, table, 'Dynamic Table') 
+        source_cols = columns_by_source[(schema, table)]
         
         for col_name, col_type, nullable in source_cols:
             rows_list.append({
@@ -65,50 +72,35 @@ def create_dynamic_table(source_tables, joins, target_schema, target_name, wareh
     )   
 
 
-    #4. Generate DDL   
-    col_definitions = []
-    col_names_only = [] #For view DDL
-
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["src_col_nm"]: 
-            
-            rule = row['transformation'] if row['transformation'] else row['src_col_nm']    #Check that we have rule or not. if not, use the original column name
-
-            if rule != row["new_col_nm"]:  #If we have rule that means we need to build the string in a different way, we need alias anyways with this method
-                col_str = f"{rule}::{row['data_type']} AS {row['new_col_nm']}"
-            else:
-                col_str = f"{row['src_col_nm']}::{row['data_type']}"
-            col_definitions.append(col_str) 
-            col_names_only.append(row["new_col_nm"])   
-    cols_sql = ",\n\t".join(col_definitions)          #Result: "ID NUMBER, NAME VARCHAR"
-    cols_names_str = ",\n\t".join(col_names_only)      #Result: "ID, NAME"   
+    #4. Generate DDL (whole columns at once, see utils/ddl_compiler.py)
+    columns = compile_select_columns(editor_result)
 
 
 
     #5. Object display  
-    # Construct the FROM clause
-    base_tbl = source_tables[0]
-    from_clause = f"{base_tbl['schema']}.{base_tbl['table']} {base_tbl['alias']}"
-    
-    # Append joins
-    for join in joins:
-        right_tbl_def = next((t for t in source_tables if t['alias'] == join['right_alias']), None)
-        if right_tbl_def:
-            from_clause += f"\n{join['join_type']} {right_tbl_def['schema']}.{right_tbl_def['table']} {right_tbl_def['alias']} ON {join['on_condition']}"
+    # Construct the FROM clause (source_tables[0] is the base, joins are appended)
+    from_clause = compile_from_clause(source_tables, joins)
 
     result = DynamicTable(
         schema = target_schema, 
         name = target_name, 
-        columns=cols_sql,
-        col_names=cols_names_str,
+        columns=columns,
         source_object=from_clause,
         warehouse=warehouse,
-        target_lag=target_lag)
-    
+        target_lag=target_lag,
+        refresh_mode=refresh_mode,
+        initialize=initialize)
+
+    show_refresh_mode_check(result, key="dt_create_incremental_check")
+
+    #Compile the query before it can be deployed (no deploy button on errors)
+    if not show_validation(result, select_column_rows(editor_result)):
+        return None
     
     return result.create_ddl()
 
-def modify_dynamic_table(selected_schema, selected_object_name, source_tables, joins):
+def modify_dynamic_table(selected_schema, selected_object_name, source_tables, joins, warehouse, target_lag, refresh_mode=None, initialize=None):
+    provider = get_data_provider()
     
     # 1. Create dynamic col_type options
     rows_list = []
@@ -116,11 +108,13 @@ def modify_dynamic_table(selected_schema, selected_object_name, source_tables, j
     #rows_list is a list, and the result of get_columns is also a list with 2 stuffs in it. first is the column name, second is the type. So with this for loop i can build the required list
     if not source_tables:
         source_cols_from_dt = provider.get_columns(selected_schema, selected_object_name, 'Dynamic Table')
+        #GET_DDL is fetched and parsed once here, not once per column
+        definition = provider.get_object_definition(selected_schema, selected_object_name, 'Dynamic Table')
         for col_name, col_type, nullable in source_cols_from_dt:
              rows_list.append({
                 "src_col_nm": col_name,
                 "new_col_nm": col_name,
-                "transformation": provider.get_transform_by_alias(selected_schema,selected_object_name,'Dynamic Table',col_name),
+                "transformation": definition.transform_by_alias(col_name),
                 "data_type": col_type   #can be number(38,0)
             })
     
@@ -135,13 +129,15 @@ def modify_dynamic_table(selected_schema, selected_object_name, source_tables, j
         for cdd in current_dt_defs:
             clean_transform = cdd['transformation'].strip()
             src_to_target[clean_transform] = cdd
+
+        columns_by_source = provider.get_columns_bulk(source_tables)
             
         for tbl in source_tables:
             schema = tbl['schema']
             table = tbl['table']
             alias = tbl['alias']
             
-            source_cols = provider.get_columns(schema, table, 'Table') # Assuming sources are tables
+            source_cols = columns_by_source[(schema, table)]
             
             for col_name, col_type, nullable in source_cols:
                 src_col_full = f"{alias}.{col_name}"
@@ -192,50 +188,59 @@ def modify_dynamic_table(selected_schema, selected_object_name, source_tables, j
     )   
 
 
-    #4. Generate DDL   
-    col_definitions = []
-    col_names_only = [] #For view DDL
-
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["src_col_nm"]: 
-            
-            rule = row['transformation'] if row['transformation'] else row['src_col_nm']    #Check that we have rule or not. if not, use the original column name
-
-            if rule != row["new_col_nm"]:  #If we have rule that means we need to build the string in a different way, we need alias anyways with this method
-                col_str = f"{rule}::{row['data_type']} AS {row['new_col_nm']}"
-            else:
-                col_str = f"{row['src_col_nm']}::{row['data_type']}"
-            col_definitions.append(col_str) 
-            col_names_only.append(row["new_col_nm"])   
-    cols_sql = ",\n\t".join(col_definitions)          
-    cols_names_str = ",\n\t".join(col_names_only)       #Result: "ID, NAME"  
+    #4. Generate DDL (whole columns at once, see utils/ddl_compiler.py)
+    columns = compile_select_columns(editor_result)
 
     # Construct source object from passed sources
-    source_object = ""
-    if source_tables:
-        base_tbl = source_tables[0]
-        from_clause = f"{base_tbl['schema']}.{base_tbl['table']} {base_tbl['alias']}"
-        
-        for join in joins:
-            right_tbl_def = next((t for t in source_tables if t['alias'] == join['right_alias']), None)
-            if right_tbl_def:
-                from_clause += f"\n{join['join_type']} {right_tbl_def['schema']}.{right_tbl_def['table']} {right_tbl_def['alias']} ON {join['on_condition']}"
-        source_object = from_clause
-    else:
-        source_schema_name, source_obj_name = provider.get_source(selected_schema,selected_object_name,'Dynamic Table')
-        source_object = f"{source_schema_name}.{source_obj_name}"
-        
-    warehouse, target_lag = provider.get_dynamic_table_config(selected_schema,selected_object_name)
+    source_object = compile_from_clause(source_tables, joins)
+    if not source_tables:
+        # Fallback if no sources passed: keep the FROM clause of the deployed object
+        source_object = provider.get_object_definition(selected_schema, selected_object_name, 'Dynamic Table').source_object
 
     #5. Object display  
     result = DynamicTable(
         schema = selected_schema, 
         name = selected_object_name, 
-        columns=cols_sql,
-        col_names=cols_names_str,
+        columns=columns,
         source_object = source_object,
         warehouse=warehouse,
-        target_lag=target_lag)
-    
-    
-    return result.create_ddl()
\ No newline at end of file
+        target_lag=target_lag,
+        refresh_mode=refresh_mode,
+        initialize=initialize)
+
+    show_refresh_mode_check(result, key="dt_modify_incremental_check")
+
+    #6. Same query as the deployed one -> only ALTER the settings, a CREATE OR REPLACE would reinitialize the whole table
+    deployed = provider.get_object_definition(selected_schema, selected_object_name, 'Dynamic Table')
+    statements, recreate = plan_dynamic_table_changes(deployed, result)
+    if statements and not recreate:
+        st.info("Only the settings changed: the dynamic table is altered in place, without a reinitialization.")
+
+    #A new query is compiled before it can be deployed (no deploy button on errors)
+    if recreate and not show_validation(result, select_column_rows(editor_result)):
+        return None, None
+
+    return "\n".join(statements), result.create_ddl()
+
+
+
+#Warns before deploy if the query can't refresh incrementally (AUTO would fall back to FULL refreshes)
+def show_refresh_mode_check(result, key):
+    refresh_mode = (result.refresh_mode or "AUTO").upper()
+    if refresh_mode == "FULL":
+        return
+    blockers = incremental_blockers(result.query())
+    if blockers and refresh_mode == "INCREMENTAL":
+        st.error("REFRESH_MODE = INCREMENTAL will most likely be rejected: " + ", ".join(blockers))
+    elif blockers:
+        st.warning("REFRESH_MODE = AUTO will most likely choose FULL refreshes: " + ", ".join(blockers))
+
+    #the text check is a heuristic, Snowflake can answer for sure without running a refresh
+    if st.button("Check incremental refresh in Snowflake", key=key, disabled=not result.name,
+                 help=None if result.name else "Name the dynamic table first"):
+        with st.spinner("Creating a throwaway INCREMENTAL dynamic table..."):
+            error = check_incremental(get_session(), result)
+        if error:
+            st.error(f"Not eligible for incremental refresh: {error}")
+        else:
+            st.success("The query supports incremental refresh.")
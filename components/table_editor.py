@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 from models.table import Table  
+from models.column import Column
+from utils.ddl_compiler import compile_table_columns
+from utils.table_diff import plan_table_changes, column_origins, swap_table, drop_swap_statement, SWAP_SUFFIX
+from utils.snowflake_connector import get_session
 from utils.data_provider import get_data_provider
 
 #Base Types 
@@ -9,7 +13,6 @@ sf_types = ["NUMBER", "VARCHAR", "BOOLEAN", "TIMESTAMP", "DATE", "VARIANT", "FLO
 default_data = pd.DataFrame(
     [{"col_nm": "ID", "data_type": "NUMBER", "nullable": True}],
 )
-provider = get_data_provider()
 
 
 
@@ -32,22 +35,14 @@ def create_table(target_schema,target_name):
     )
 
     #2. Create the DDL
-    col_definitions = []
-
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["col_nm"]: 
-            col_str = f"{row['col_nm']} {row['data_type']}"
-            if not row["nullable"]:
-                col_str += " NOT NULL"
-            col_definitions.append(col_str)
-    cols_sql = ",\n\t".join(col_definitions)          #Result: "ID NUMBER, NAME VARCHAR"
+    columns = compile_table_columns(editor_result, "col_nm")
     
 
     #3. Display the DDL
     result = Table(
         schema = target_schema, 
         name = target_name, 
-        columns=cols_sql)
+        columns=columns)
 
 
     return result.create_ddl()
@@ -55,7 +50,30 @@ def create_table(target_schema,target_name):
 
 
 
+#A rebuild keeps the old data under <table>__IGLOO_SWAP, dropping it is a separate step (and a next rebuild fails while it's there)
+def show_leftover_swap_table(provider, selected_schema, selected_object_name):
+    leftover = f"{selected_object_name}{SWAP_SUFFIX}".upper()
+    if leftover not in {name.upper() for name in provider.get_tables(selected_schema, 'normal')}:
+        return
+    st.info(f"{swap_table(selected_schema, selected_object_name)} holds the data from before the last rebuild. "
+            "Drop it once the rebuilt table is checked.")
+    if st.button("Drop the old data", key="table_drop_swap_btn"):
+        session = get_session()
+        if not session:
+            st.error("No active Snowflake connection found. Check your connection settings.")
+            return
+        try:
+            session.sql(drop_swap_statement(selected_schema, selected_object_name)).collect()
+        except Exception as e:
+            st.error(f"Drop failed: {e}")
+            return
+        provider.invalidate(selected_schema)
+        st.rerun()
+
+
 def modify_table(selected_schema,selected_object_name):
+    provider = get_data_provider()
+    show_leftover_swap_table(provider, selected_schema, selected_object_name)
     #reuse some part from create_table and create_dynamic_table
     #1. Create dynamic col_type options (both standard and already existing)
     #need this because i gave the coice to select the base types, but already existing can have more precies ones like NUMBER(38,0)
@@ -99,20 +117,25 @@ def modify_table(selected_schema,selected_object_name):
     )   
 
     #4. Generate DDL   
-    col_definitions = []
-    
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["src_col_nm"]: 
-            col_str = f"{row['src_col_nm']} {row['data_type']}"
-            if row["nullable"] in ('N', 'False'):               #nullable can be 'N/Y' from DESC TABLE command (so init data, first run), or True/False once it was modified in the editor
-                col_str += " NOT NULL"
-            col_definitions.append(col_str)
-    cols_sql = ",\n\t".join(col_definitions)          #Result: "ID NUMBER, NAME VARCHAR"
+    #nullable can be 'N/Y' from DESC TABLE command (so init data, first run), or True/False once it was modified in the editor
+    columns = compile_table_columns(editor_result, "src_col_nm")
 
     #5. Display the DDL
     result = Table(
         schema = selected_schema, 
         name = selected_object_name, 
-        columns=cols_sql)
-    
-    return result.create_ddl()
\ No newline at end of file
+        columns=columns)
+    if not columns:
+        st.warning("A table needs at least 1 column.")
+        return None, None
+
+    #6. Deploy only the difference to the deployed table (ALTER TABLE), git still gets the full CREATE statement
+    deployed = Table(
+        schema = selected_schema,
+        name = selected_object_name,
+        columns=[Column(col_name, col_type, nullable not in ('N', 'NO')) for col_name, col_type, nullable in source_cols])
+    plan = plan_table_changes(deployed, result, column_origins(editor_result, "src_col_nm", deployed))
+    if plan and not plan.in_place:
+        st.warning("This change can't be done with ALTER TABLE, the table is rebuilt (CTAS + SWAP WITH, the old data is kept until you drop it): " + "; ".join(plan.reasons))
+
+    return plan.script(), result.create_ddl()
\ No newline at end of file
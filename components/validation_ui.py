@@ -0,0 +1,25 @@
+import streamlit as st
+from utils.snowflake_connector import find_session
+from utils.data_provider import get_data_provider, MockDataProvider
+from utils.validation import validate
+
+
+#Compile the SELECT of a View / DynamicTable before deploy -> True if it can be deployed
+#Errors point to the editor row (or join) the message is about, rows: ddl_compiler.select_column_rows of the editor
+#No Snowflake to ask (mock catalog, no connection) -> skipped without a message, the deploy isn't blocked
+def show_validation(obj, rows=None):
+    if isinstance(get_data_provider(), MockDataProvider):
+        return True
+    session = find_session()
+    if session is None:
+        return True
+    with st.spinner("Validating the query..."):
+        result = validate(session, obj)
+    if result.ok:
+        if not result.checked:
+            st.caption(result.message)
+        return True
+
+    location = result.location(obj, rows)
+    st.error(f"Validation failed{' at ' + location if location else ''}: {result.message}")
+    return False
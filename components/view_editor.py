@@ -2,33 +2,36 @@
 import streamlit as st
 import pandas as pd
 from models.view import View  
+from utils.ddl_compiler import compile_select_columns, compile_from_clause, select_column_rows
 from utils.data_provider import get_data_provider
+from components.validation_ui import show_validation
 
 #Base Types 
 sf_types = ["NUMBER", "VARCHAR", "BOOLEAN", "TIMESTAMP", "DATE", "VARIANT", "FLOAT"]
 #Base df
 #Prepare Data & Dynamic Options for existing datatypes from get_columns()
-provider = get_data_provider()
 
 
 
 
 def create_view(source_tables, joins, target_schema, target_name):
+    provider = get_data_provider()
      
     #1. Create dynamic col_type options (both standard and already existing)
     #need this because i gave the coice to select the base types, but already existing can have more precies ones like NUMBER(38,0)
     #Fetch ALL columns at once
     rows_list = []
 
+    # Load the columns of every source table in one go (1 query per schema, not 1 DESCRIBE per table)
+    columns_by_source = provider.get_columns_bulk(source_tables)
+
     # Iterate through all source tables
     for tbl in source_tables:
         schema = tbl['schema']
         table = tbl['table']
         alias = tbl['alias']
         
-        # We assume source is a Table for now, based on builders_ui.py behavior
-        # In a generic implementation we might need to know if it's a View
-        source_cols = provider.get_columns(schema, table, 'Table') 
+        source_cols = columns_by_source[(schema, table)]
         
         for col_name, col_type, nullable in source_cols:
             rows_list.append({
@@ -66,56 +69,29 @@ def create_view(source_tables, joins, target_schema, target_name):
     )   
 
 
-    #4. Generate DDL   
-    col_definitions = []
-    col_names_only = [] #For view DDL
-
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["src_col_nm"]: 
-            
-            rule = row['transformation'] if row['transformation'] else row['src_col_nm']    #Check that we have rule or not. if not, use the original column name
-
-            # If user explicitly wrote a transformation rule, trust them. 
-            # If not, use the src_col_nm which now includes the alias (e.g. "T1.ID")
-            
-            if rule != row["new_col_nm"]:  
-                col_str = f"{rule}::{row['data_type']} AS {row['new_col_nm']}"
-            else:
-                col_str = f"{row['src_col_nm']}::{row['data_type']}"
-            col_definitions.append(col_str) 
-            col_names_only.append(row["new_col_nm"])   
-    cols_sql = ",\n\t".join(col_definitions)          
-    cols_names_str = ",\n\t".join(col_names_only)       
+    #4. Generate DDL (whole columns at once, see utils/ddl_compiler.py)
+    columns = compile_select_columns(editor_result)
 
-    # Construct the FROM clause
-    # source_tables[0] is the base
-    base_tbl = source_tables[0]
-    from_clause = f"{base_tbl['schema']}.{base_tbl['table']} {base_tbl['alias']}"
-    
-    # Append joins
-    for join in joins:
-        # join = {'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': 'T1.ID = T2.ID'}
-        # We need to find the right table definition to get schema/table name from alias
-        right_tbl_def = next((t for t in source_tables if t['alias'] == join['right_alias']), None)
-        
-        if right_tbl_def:
-            from_clause += f"\n{join['join_type']} {right_tbl_def['schema']}.{right_tbl_def['table']} {right_tbl_def['alias']} ON {join['on_condition']}"
+    # Construct the FROM clause (source_tables[0] is the base, joins are appended)
+    from_clause = compile_from_clause(source_tables, joins)
 
     #5. Object display  
     result = View(
         schema = target_schema, 
         name = target_name, 
-        columns=cols_sql,
-        col_names=cols_names_str,
+        columns=columns,
         source_object = from_clause) # Pass the full FROM/JOIN clause as source_object
     
-    
+    #6. Compile the query before it can be deployed (no deploy button on errors)
+    if not show_validation(result, select_column_rows(editor_result)):
+        return None
     
     return result.create_ddl()
 
 
 
 def modify_view(selected_schema, selected_object_name, source_tables, joins):
+    provider = get_data_provider()
     
     #1. Create dynamic col_type options (both standard and already existing)
     #need this because i gave the coice to select the base types, but already existing can have more precies ones like NUMBER(38,0)
@@ -132,11 +108,13 @@ def modify_view(selected_schema, selected_object_name, source_tables, joins):
         # Fallback to old simple mode if no sources defined (shouldn't happen if parsing works)
         # Or just show empty and let user add sources
         source_cols_from_view = provider.get_columns(selected_schema, selected_object_name, 'View')
+        #GET_DDL is fetched and parsed once here, not once per column
+        definition = provider.get_object_definition(selected_schema, selected_object_name, 'View')
         for col_name, col_type, nullable in source_cols_from_view:
              rows_list.append({
                 "src_col_nm": col_name,
                 "new_col_nm": col_name,
-                "transformation": provider.get_transform_by_alias(selected_schema,selected_object_name,'View',col_name),
+                "transformation": definition.transform_by_alias(col_name),
                 "data_type": col_type #This can be 'NUMBER(38,0)', wich is not part of the base types
             })
 
@@ -189,13 +167,15 @@ def modify_view(selected_schema, selected_object_name, source_tables, joins):
             # e.g. "T1.ID" or "LEFT(T1.NAME, 2)"
             clean_transform = cvd['transformation'].strip()
             src_to_target[clean_transform] = cvd
+
+        columns_by_source = provider.get_columns_bulk(source_tables)
             
         for tbl in source_tables:
             schema = tbl['schema']
             table = tbl['table']
             alias = tbl['alias']
             
-            source_cols = provider.get_columns(schema, table, 'Table') 
+            source_cols = columns_by_source[(schema, table)]
             
             for col_name, col_type, nullable in source_cols:
                 src_col_full = f"{alias}.{col_name}"
@@ -248,48 +228,25 @@ def modify_view(selected_schema, selected_object_name, source_tables, joins):
     )   
 
 
-    #4. Generate DDL   
-    col_definitions = []
-    col_names_only = [] #For view DDL
-
-    for index, row in editor_result.iterrows(): #need index to have string as a result, not tuple
-        if row["src_col_nm"]: 
-            
-            rule = row['transformation'] if row['transformation'] else row['src_col_nm']    #Check that we have rule or not. if not, use the original column name
-
-            if rule != row["new_col_nm"]:  #If we have rule that means we need to build the string in a different way, we need alias anyways with this method
-                col_str = f"{rule}::{row['data_type']} AS {row['new_col_nm']}"
-            else:
-                col_str = f"{row['src_col_nm']}::{row['data_type']}"
-            col_definitions.append(col_str) 
-            col_names_only.append(row["new_col_nm"])   
-    cols_sql = ",\n\t".join(col_definitions)          
-    cols_names_str = ",\n\t".join(col_names_only)      
+    #4. Generate DDL (whole columns at once, see utils/ddl_compiler.py)
+    columns = compile_select_columns(editor_result)
 
     # Construct the FROM clause from the PASSED source_tables and joins (Edited version)
-    source_object = ""
-    if source_tables:
-        base_tbl = source_tables[0]
-        from_clause = f"{base_tbl['schema']}.{base_tbl['table']} {base_tbl['alias']}"
-        
-        for join in joins:
-            right_tbl_def = next((t for t in source_tables if t['alias'] == join['right_alias']), None)
-            if right_tbl_def:
-                from_clause += f"\n{join['join_type']} {right_tbl_def['schema']}.{right_tbl_def['table']} {right_tbl_def['alias']} ON {join['on_condition']}"
-        source_object = from_clause
-    else:
-        # Fallback if no sources passed? 
-        source_schema_name, source_obj_name = provider.get_source(selected_schema,selected_object_name,'View')
-        source_object = f"{source_schema_name}.{source_obj_name}"
+    source_object = compile_from_clause(source_tables, joins)
+    if not source_tables:
+        # Fallback if no sources passed: keep the FROM clause of the deployed object
+        source_object = provider.get_object_definition(selected_schema, selected_object_name, 'View').source_object
 
 
     #5. Object display  
     result = View(
         schema = selected_schema, 
         name = selected_object_name, 
-        columns=cols_sql,
-        col_names=cols_names_str,
+        columns=columns,
         source_object = source_object)
     
+    #6. Compile the query before it can be deployed (no deploy button on errors)
+    if not show_validation(result, select_column_rows(editor_result)):
+        return None
     
     return result.create_ddl()
\ No newline at end of file
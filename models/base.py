@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 
 class DatabaseObject(ABC):
@@ -6,8 +7,28 @@ class DatabaseObject(ABC):
     def __init__(self, schema, name, columns):
         self.schema = schema
         self.name = name
-        self.columns = columns
+        self.columns = tuple(columns)  #tuple of models.column.Column
+
+    #Everything the DDL depends on, subclasses add their own settings (source, lag, ...)
+    def key(self):
+        return (type(self).__name__, self.schema, self.name, self.columns)
+
+    #2 objects with the same structure are equal (and hash the same), so a rerun with an unchanged editor hits the DDL cache
+    def __eq__(self, other):
+        return isinstance(other, DatabaseObject) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
 
-    @abstractmethod
     def create_ddl(self):
-        pass
\ No newline at end of file
+        return _render_ddl(self)
+
+    @abstractmethod
+    def render_ddl(self):
+        pass
+
+
+#Memoized on the structure of the object (see DatabaseObject.key), the same editor state renders only once
+@lru_cache(maxsize=256)
+def _render_ddl(obj):
+    return obj.render_ddl()
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+
+#1 column of a table / view / dynamic table
+#Frozen -> hashable, so objects built from the same editor state compare (and cache) as equal
+@dataclass(frozen=True)
+class Column:
+    name: str
+    data_type: str
+    nullable: bool = True
+    expression: str = None  #what the SELECT reads for this column (views, dynamic tables), eg. "T1.ID" or "LEFT(T1.NAME, 2)"
+
+    #"ID NUMBER NOT NULL" (CREATE TABLE column list)
+    def table_sql(self):
+        return f"{self.name} {self.data_type}" if self.nullable else f"{self.name} {self.data_type} NOT NULL"
+
+    #"LEFT(T1.NAME, 2)::VARCHAR AS SHORT_NAME" (SELECT list), the alias is only left out when the expression is the name itself
+    #(same output as the editors always wrote: "T1.ID::NUMBER AS ID" keeps its alias)
+    def select_sql(self):
+        expression = self.expression or self.name
+        if expression == self.name:
+            return f"{expression}::{self.data_type}"
+        return f"{expression}::{self.data_type} AS {self.name}"
@@ -3,17 +3,34 @@ from models.base import DatabaseObject
 
 class DynamicTable(DatabaseObject):
 
-    def __init__(self, schema, name, columns, col_names, source_object, warehouse, target_lag):
+    def __init__(self, schema, name, columns, source_object, warehouse, target_lag, refresh_mode=None, initialize=None):
         # super(): pass the standard stuff to the Parent (base.py - DatabaseObject)
         super().__init__(schema, name, columns)
         
         # Save the new specific stuff to self
-        self.col_names = col_names #to store only the name of the columns, withput the types
         self.sourceobject = source_object
         self.warehouse = warehouse
         self.target_lag = target_lag
+        self.refresh_mode = refresh_mode #AUTO / INCREMENTAL / FULL, None -> Snowflake default (AUTO)
+        self.initialize = initialize #ON_CREATE (deploy waits for the 1st refresh) / ON_SCHEDULE (returns at once), None -> ON_CREATE
 
-    def create_ddl(self):
-            ddl = f"""CREATE OR REPLACE DYNAMIC TABLE {self.schema}.{self.name}\nTARGET_LAG = '{self.target_lag}'\nWAREHOUSE = {self.warehouse}\n(\n\t{self.col_names}\n)\nAS SELECT\n\t{self.columns}\nFROM {self.sourceobject};
+    def key(self):
+        return super().key() + (self.sourceobject, self.warehouse, self.target_lag, self.refresh_mode, self.initialize)
+
+    #TARGET_LAG value: '5 minutes' is a string, DOWNSTREAM a keyword (Snowflake rejects it quoted)
+    def lag_sql(self):
+        lag = (self.target_lag or "").strip()
+        return "DOWNSTREAM" if lag.upper() == "DOWNSTREAM" else f"'{lag}'"
+
+    #The SELECT ... FROM ... body, the part that decides if the table has to be recreated (and reinitialized)
+    def query(self):
+        columns = ",\n\t".join(col.select_sql() for col in self.columns)
+        return f"SELECT\n\t{columns}\nFROM {self.sourceobject}"
+
+    def render_ddl(self):
+            col_names = ",\n\t".join(col.name for col in self.columns) #only the name of the columns, without the types
+            options = f"\nREFRESH_MODE = {self.refresh_mode}" if self.refresh_mode else ""
+            options += f"\nINITIALIZE = {self.initialize}" if self.initialize else ""
+            ddl = f"""CREATE OR REPLACE DYNAMIC TABLE {self.schema}.{self.name}\nTARGET_LAG = {self.lag_sql()}\nWAREHOUSE = {self.warehouse}{options}\n(\n\t{col_names}\n)\nAS {self.query()};
             """
-            return ddl.strip() # strip() removes extra whitespace from the start/end
\ No newline at end of file
+            return ddl.strip() # strip() removes extra whitespace from the start/end
@@ -3,9 +3,10 @@ from models.base import DatabaseObject
 
 class Table(DatabaseObject):
 
-    def create_ddl(self):
+    def render_ddl(self):
         # f-strings handle the spacing and variables cleanly
         #ddl = f"CREATE OR REPLACE TABLE {self.schema}.{self.name} ({self.columns})"
-        ddl = f"CREATE OR REPLACE TABLE {self.schema}.{self.name}(\n\t{self.columns}\n);"
+        columns = ",\n\t".join(col.table_sql() for col in self.columns)          #Result: "ID NUMBER, NAME VARCHAR"
+        ddl = f"CREATE OR REPLACE TABLE {self.schema}.{self.name}(\n\t{columns}\n);"
         return ddl
     
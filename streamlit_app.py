@@ -1,9 +1,21 @@
+import importlib
+import time
 import streamlit as st
-import pandas as pd
-from utils.snowflake_connector import get_session
-from utils.data_provider import get_data_provider
-from components.builders_ui import create_object, modify_object
-from components.home_ui import home
+
+#Page modules (and their heavy imports) are only loaded when the page is opened, the data provider too (imported where
+#it's used): nothing here imports pandas / snowpark before the sidebar is drawn (checked by tests/test_page_imports.py)
+#Above this, the sidebar shows how long loading the page modules took
+PAGE_IMPORT_BUDGET_MS = 300
+
+
+#Import a page module on first use and return its render function
+def load_page(module_name, function_name):
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_ms = (time.perf_counter() - started) * 1000
+    if import_ms > PAGE_IMPORT_BUDGET_MS:
+        st.sidebar.caption(f"Page loaded in {import_ms:.0f} ms (budget: {PAGE_IMPORT_BUDGET_MS} ms)")
+    return getattr(module, function_name)
 
 
 
@@ -13,41 +25,58 @@ st.title("❄️Igloo - Snowflake Object Management Tool")
 st.divider()
 
 st.sidebar.title("Menu")
-page = st.sidebar.radio("Go to", ["Home", "Create New Object", "Modify Existing", "Sandbox"])
+page = st.sidebar.radio("Go to", ["Home", "Create New Object", "Modify Existing", "Batch Deploy", "Drift Report", "Sandbox"])
 
-session = get_session()
-database = session.get_current_database()
-provider = get_data_provider()
+#Catalog data (schemas, tables, columns) is cached for a few minutes, this picks up the changes made since the last load
+if st.sidebar.button("Refresh catalog", help="Reload the schemas, tables and columns that changed in Snowflake"):
+    from utils.data_provider import get_data_provider  #pandas + snowpark, only loaded when it's needed
+    get_data_provider().refresh_catalog()
 
 
 # ==========================================
 # PAGE 1: HOME (Dashboard)
 # ==========================================
 if page == "Home":
-    home()
+    load_page("components.home_ui", "home")()
 
 
 # ==========================================
 # PAGE 2: CREATE NEW OBJECT 
 # ==========================================
 elif page == "Create New Object":
-    create_object()
+    load_page("components.builders_ui", "create_object")()
 
 
 # ==========================================
 # PAGE 3: MODIFY EXISTING 
 # ==========================================
 elif page == "Modify Existing":
-    modify_object()
+    load_page("components.builders_ui", "modify_object")()
+
+
+# ==========================================
+# PAGE 4: BATCH DEPLOY
+# ==========================================
+elif page == "Batch Deploy":
+    load_page("components.batch_ui", "batch_deploy")()
+
+
+# ==========================================
+# PAGE 5: DRIFT REPORT
+# ==========================================
+elif page == "Drift Report":
+    load_page("components.drift_ui", "drift_report")()
 
 
     
 # ==========================================
-# PAGE 4: Sandbox
+# PAGE 6: Sandbox
 # ==========================================
 elif page == "Sandbox":
     st.header("Sandbox")
     st.write("This section is my playground")
+    from utils.data_provider import get_data_provider
+    provider = get_data_provider()
 
     tf = provider.get_transform('ANALYTICS','NEWVIEW','View')
     st.code(tf)
@@ -58,3 +87,11 @@ elif page == "Sandbox":
     st.code(provider.get_transform('ANALYTICS','testdt','Dynamic Table')[0]['transformation'])
     st.code(provider.get_transform_by_alias('ANALYTICS','testdt','Dynamic Table','ID')),
 
+
+#Deploys run in the background, their status is shown on every page
+#(after the page, so a deploy submitted in this run is already listed)
+if st.session_state.get("deploy_jobs") or st.session_state.get("deploy_batches"):
+    with st.sidebar:
+        st.divider()
+        st.markdown("#### Deploys")
+        load_page("components.deploy_ui", "display_deploy_jobs")()
@@ -0,0 +1,161 @@
+import random
+
+import pytest
+
+from benchmarks.ddl_parser_bench import synthetic_parts, parse_all
+from models.column import Column
+from models.dynamic_table import DynamicTable
+from models.view import View
+from utils.ddl_compiler import compile_from_clause
+from utils.ddl_parser import query_fingerprint, parse_definition, split_statements
+
+#Random View / DynamicTable models (same generator as the benchmark) -> create_ddl() -> parser:
+#the parsed result must match the model input, and the model rebuilt from it must render the same DDL again
+#(what modify does with a deployed object). Fixed seed per case, so a failure names a reproducible case
+ROUND_TRIP_CASES = 40
+
+
+#SELECT list the editors wrote before the Column model: "rule::type AS name", only "name::type" when the rule is the name
+#Deployed objects look like this, the models must keep rendering it
+def baseline_select_list(columns):
+    items = []
+    for col in columns:
+        if col.expression != col.name:
+            items.append(f"{col.expression}::{col.data_type} AS {col.name}")
+        else:
+            items.append(f"{col.name}::{col.data_type}")
+    return ",\n\t".join(items)
+
+
+@pytest.mark.parametrize("case", range(ROUND_TRIP_CASES))
+def test_round_trip(case):
+    rnd = random.Random(case)
+    n_columns, n_joins, depth = rnd.randint(1, 40), rnd.randint(0, 5), rnd.randint(0, 3)
+    columns, from_clause, expected, sources, joins = synthetic_parts(rnd, n_columns, n_joins, depth)
+    if case % 2:
+        obj_type, name = 'View', f"RT_VIEW_{case}"
+        ddl = View('SCH_0', name, columns, from_clause).create_ddl()
+    else:
+        obj_type, name = 'Dynamic Table', f"RT_DT_{case}"
+        ddl = DynamicTable('SCH_0', name, columns, from_clause, f"WH_{case}", f"{case + 1} minutes").create_ddl()
+
+    assert f"AS SELECT\n\t{baseline_select_list(columns)}\nFROM " in ddl
+    transforms, parsed_sources, parsed_joins, config = parse_all(name, ddl, obj_type)
+    assert transforms == expected
+    assert parsed_sources == sources
+    assert parsed_joins == joins
+
+    rebuilt_columns = tuple(Column(col['alias'], col['type'], expression=col['transformation']) for col in transforms)
+    rebuilt_from = compile_from_clause(parsed_sources, parsed_joins)
+    if obj_type == 'View':
+        rebuilt = View('SCH_0', name, rebuilt_columns, rebuilt_from).create_ddl()
+    else:
+        assert config == (f"WH_{case}", f"{case + 1} minutes")
+        rebuilt = DynamicTable('SCH_0', name, rebuilt_columns, rebuilt_from, *config).create_ddl()
+    assert rebuilt == ddl
+    assert query_fingerprint(rebuilt) == query_fingerprint(ddl)
+
+
+#Same-name columns must be in the generated cases, they are the ones the alias handling can get wrong
+def test_round_trip_cases_cover_same_name_columns():
+    same_name = 0
+    for case in range(ROUND_TRIP_CASES):
+        rnd = random.Random(case)
+        n_columns, n_joins, depth = rnd.randint(1, 40), rnd.randint(0, 5), rnd.randint(0, 3)
+        columns = synthetic_parts(rnd, n_columns, n_joins, depth)[0]
+        same_name += sum(1 for col in columns if col.expression.split('.')[-1] == col.name)
+    assert same_name >= ROUND_TRIP_CASES
+
+
+def test_commas_keywords_and_semicolons_in_string_literals():
+    definition = parse_definition("""CREATE OR REPLACE VIEW S.V AS SELECT
+	IFF(T1.A = 'x, FROM y; ''z''', 'a,b', T1.A)::VARCHAR AS A,
+	T1.B::NUMBER AS B
+FROM S.T T1;""", "S")
+    assert definition.columns == [
+        {'alias': 'A', 'type': 'VARCHAR', 'transformation': "IFF(T1.A = 'x, FROM y; ''z''', 'a,b', T1.A)"},
+        {'alias': 'B', 'type': 'NUMBER', 'transformation': 'T1.B'},
+    ]
+    assert definition.source_tables == [{'schema': 'S', 'table': 'T', 'alias': 'T1'}]
+
+
+def test_comments_are_skipped():
+    definition = parse_definition("""-- header, FROM nowhere
+CREATE OR REPLACE VIEW S.V /* AS SELECT 1 */ AS SELECT
+	T1.A::NUMBER AS A, -- first, FROM x
+	/* second, */ T1.B::NUMBER AS B
+FROM S.T T1 // the base table, JOIN nothing
+LEFT JOIN S.U T2 ON T1.A = T2.A;""", "S")
+    assert [col['alias'] for col in definition.columns] == ['A', 'B']
+    assert definition.joins == [{'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': 'T1.A = T2.A'}]
+    assert split_statements("CREATE VIEW A AS SELECT 1; -- a; b\nCREATE VIEW B AS SELECT ';' /* ; */;\n-- the end;") == [
+        "CREATE VIEW A AS SELECT 1", "-- a; b\nCREATE VIEW B AS SELECT ';' /* ; */"]
+
+
+def test_quoted_identifiers():
+    definition = parse_definition("""CREATE OR REPLACE VIEW S.V AS SELECT
+	"t1"."Order, Id"::NUMBER AS "Order Id",
+	"t1".PLAIN::VARCHAR
+FROM "My Schema"."Orders; Old" "t1";""", "S")
+    assert definition.columns == [
+        {'alias': '"Order Id"', 'type': 'NUMBER', 'transformation': '"t1"."Order, Id"'},
+        {'alias': 'PLAIN', 'type': 'VARCHAR', 'transformation': '"t1".PLAIN'},
+    ]
+    assert definition.source_tables == [{'schema': '"My Schema"', 'table': '"Orders; Old"', 'alias': '"t1"'}]
+
+
+def test_case_expressions_keep_their_commas():
+    definition = parse_definition("""CREATE OR REPLACE VIEW S.V AS SELECT
+	CASE WHEN T1.A IN (1, 2) THEN 'x' WHEN T1.A = 3 THEN COALESCE(T1.B, 'y') ELSE 'z' END::VARCHAR AS KIND,
+	CASE T1.C WHEN 1 THEN CASE WHEN T1.D THEN 'a' END ELSE 'b' END::VARCHAR AS NESTED,
+	T1.E::NUMBER AS E
+FROM S.T T1;""", "S")
+    assert definition.columns == [
+        {'alias': 'KIND', 'type': 'VARCHAR',
+         'transformation': "CASE WHEN T1.A IN (1, 2) THEN 'x' WHEN T1.A = 3 THEN COALESCE(T1.B, 'y') ELSE 'z' END"},
+        {'alias': 'NESTED', 'type': 'VARCHAR', 'transformation': "CASE T1.C WHEN 1 THEN CASE WHEN T1.D THEN 'a' END ELSE 'b' END"},
+        {'alias': 'E', 'type': 'NUMBER', 'transformation': 'T1.E'},
+    ]
+
+
+def test_multi_join_from_clause():
+    definition = parse_definition("""CREATE OR REPLACE VIEW S.V AS SELECT
+	T1.ID::NUMBER AS ID
+FROM DB.S.ORDERS T1
+LEFT JOIN S.CUSTOMERS AS T2 ON T1.CUSTOMER_ID = T2.ID AND (T2.ACTIVE OR T2.KIND IN ('a', 'b'))
+INNER JOIN ITEMS T3 ON T3.ORDER_ID = T1.ID
+FULL OUTER JOIN S.RETURNS T4 ON T4.ORDER_ID = T1.ID
+CROSS JOIN S.CALENDAR T5
+WHERE T1.ID > 0;""", "S")
+    assert definition.source_tables == [
+        {'schema': 'S', 'table': 'ORDERS', 'alias': 'T1'},
+        {'schema': 'S', 'table': 'CUSTOMERS', 'alias': 'T2'},
+        {'schema': 'S', 'table': 'ITEMS', 'alias': 'T3'},
+        {'schema': 'S', 'table': 'RETURNS', 'alias': 'T4'},
+    ]
+    assert definition.joins == [
+        {'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': "T1.CUSTOMER_ID = T2.ID AND (T2.ACTIVE OR T2.KIND IN ('a', 'b'))"},
+        {'join_type': 'INNER JOIN', 'right_alias': 'T3', 'on_condition': 'T3.ORDER_ID = T1.ID'},
+        {'join_type': 'FULL OUTER JOIN', 'right_alias': 'T4', 'on_condition': 'T4.ORDER_ID = T1.ID'},
+    ]
+    assert definition.source_object.endswith("WHERE T1.ID > 0")
+
+
+def test_dynamic_table_options():
+    definition = parse_definition("""create or replace dynamic table S.DT(
+	ID COMMENT 'key, = 1',
+	NAME
+)
+target_lag = '5 minutes' refresh_mode = INCREMENTAL initialize = ON_SCHEDULE
+warehouse = COMPUTE_WH
+as SELECT
+	T1.ID::NUMBER AS ID,
+	T1.NAME::VARCHAR AS NAME
+FROM S.T T1;""", "S")
+    assert (definition.target_lag, definition.warehouse, definition.refresh_mode, definition.initialize) == (
+        '5 minutes', 'COMPUTE_WH', 'INCREMENTAL', 'ON_SCHEDULE')
+    assert [col['alias'] for col in definition.columns] == ['ID', 'NAME']
+    downstream = parse_definition("CREATE DYNAMIC TABLE S.DT TARGET_LAG = DOWNSTREAM WAREHOUSE = WH AS SELECT T1.ID::NUMBER AS ID FROM S.T T1",
+                                  "S")
+    assert downstream.target_lag == 'DOWNSTREAM'
+    assert downstream.query == "SELECT T1.ID::NUMBER AS ID FROM S.T T1"
@@ -0,0 +1,44 @@
+from models.column import Column
+from models.dynamic_table import DynamicTable
+from utils.ddl_parser import parse_definition
+from utils.dynamic_table_diff import plan_dynamic_table_changes
+
+#GET_DDL of a dynamic table deployed by the editors before the Column model: the source columns kept "AS <same name>"
+BASELINE_DDL = """CREATE OR REPLACE DYNAMIC TABLE ANALYTICS.ORDERS_DT
+TARGET_LAG = '1 minute'
+WAREHOUSE = COMPUTE_WH
+(
+	ID,
+	SHORT_NAME
+)
+AS SELECT
+	T1.ID::NUMBER AS ID,
+	LEFT(T1.NAME, 2)::VARCHAR AS SHORT_NAME
+FROM ANALYTICS.ORDERS T1;"""
+
+
+def edited(target_lag='1 minute', warehouse='COMPUTE_WH', short_name="LEFT(T1.NAME, 2)"):
+    columns = (Column("ID", "NUMBER", True, "T1.ID"), Column("SHORT_NAME", "VARCHAR", True, short_name))
+    return DynamicTable("ANALYTICS", "ORDERS_DT", columns, "ANALYTICS.ORDERS T1", warehouse, target_lag)
+
+
+def test_lag_change_of_baseline_table_is_altered_in_place():
+    statements, recreate = plan_dynamic_table_changes(parse_definition(BASELINE_DDL, "ANALYTICS"), edited(target_lag='5 minutes'))
+    assert not recreate
+    assert statements == ["ALTER DYNAMIC TABLE ANALYTICS.ORDERS_DT SET TARGET_LAG = '5 minutes';"]
+
+
+def test_warehouse_change_of_baseline_table_is_altered_in_place():
+    statements, recreate = plan_dynamic_table_changes(parse_definition(BASELINE_DDL, "ANALYTICS"), edited(warehouse='BIG_WH'))
+    assert not recreate
+    assert statements == ["ALTER DYNAMIC TABLE ANALYTICS.ORDERS_DT SET WAREHOUSE = BIG_WH;"]
+
+
+def test_unchanged_baseline_table_has_no_statements():
+    assert plan_dynamic_table_changes(parse_definition(BASELINE_DDL, "ANALYTICS"), edited()) == ([], False)
+
+
+def test_query_change_recreates():
+    statements, recreate = plan_dynamic_table_changes(parse_definition(BASELINE_DDL, "ANALYTICS"), edited(short_name="LEFT(T1.NAME, 3)"))
+    assert recreate
+    assert statements[0].startswith("CREATE OR REPLACE DYNAMIC TABLE ANALYTICS.ORDERS_DT")
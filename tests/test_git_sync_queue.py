@@ -0,0 +1,115 @@
+import pytest
+
+import utils.git_manager as git_manager
+from utils.git_manager import GitSyncQueue, MAX_ATTEMPTS, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+#Records the pushed commits, fails while fail is set
+class Remote:
+
+    def __init__(self):
+        self.commits = []
+        self.fail = False
+
+    def push(self, files, message):
+        if self.fail:
+            raise RuntimeError("remote unreachable")
+        self.commits.append((dict(files), message))
+        return f"sha{len(self.commits)}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(git_manager, "time", clock)
+    return clock
+
+
+#No worker thread: the tests call sync_once themselves
+@pytest.fixture
+def queue(tmp_path, monkeypatch, clock):
+    remote = Remote()
+    queue = GitSyncQueue(str(tmp_path / "queue.sqlite"), push=remote.push)
+    monkeypatch.setattr(queue, "start", lambda: None)
+    queue.remote = remote
+    return queue
+
+
+def test_writes_of_the_same_path_are_coalesced(queue):
+    queue.enqueue("a.sql", "v1", "first")
+    queue.enqueue("a.sql", "v2", "second")
+    queue.enqueue("b.sql", "b", "add b")
+    assert queue.pending_files() == {"a.sql": "v2", "b.sql": "b"}
+
+    assert queue.sync_once() is None
+    assert len(queue.remote.commits) == 1
+    files, message = queue.remote.commits[0]
+    assert files == {"a.sql": "v2", "b.sql": "b"}
+    assert message == "Igloo sync of 2 files\n\n- a.sql: second\n- b.sql: add b"
+    assert queue.status()['pending'] == 0
+    assert queue.status()['last_commit'] == "sha1"
+
+
+def test_single_file_keeps_its_message(queue):
+    queue.enqueue("a.sql", "v1", "Add S.A")
+    queue.sync_once()
+    assert queue.remote.commits == [({"a.sql": "v1"}, "Add S.A")]
+
+
+def test_failed_push_backs_off_exponentially(queue, clock):
+    queue.remote.fail = True
+    queue.enqueue("a.sql", "v1", "first")
+    waits = []
+    for _ in range(MAX_ATTEMPTS):
+        waits.append(queue.sync_once())
+        clock.now += waits[-1] if waits[-1] is not None else 0
+    expected = [min(RETRY_BASE_SECONDS * 2 ** attempt, RETRY_MAX_SECONDS) for attempt in range(MAX_ATTEMPTS - 1)]
+    assert waits == expected + [None]  #the last failure marks the file failed, nothing left to wait for
+    status = queue.status()
+    assert (status['pending'], status['failed'], status['last_error']) == (0, 1, "remote unreachable")
+
+
+def test_nothing_is_pushed_before_the_retry_is_due(queue, clock):
+    queue.remote.fail = True
+    queue.enqueue("a.sql", "v1", "first")
+    queue.sync_once()
+    queue.remote.fail = False
+    clock.now += RETRY_BASE_SECONDS - 1
+    assert queue.sync_once() == pytest.approx(1)
+    assert queue.remote.commits == []
+    clock.now += 1
+    queue.sync_once()
+    assert queue.remote.commits == [({"a.sql": "v1"}, "first")]
+
+
+def test_a_new_write_resets_the_backoff(queue, clock):
+    queue.remote.fail = True
+    queue.enqueue("a.sql", "v1", "first")
+    queue.sync_once()
+    queue.remote.fail = False
+    queue.enqueue("a.sql", "v2", "second")  #due right away again
+    queue.sync_once()
+    assert queue.remote.commits == [({"a.sql": "v2"}, "second")]
+
+
+def test_retry_failed_gives_failed_files_another_round(queue, clock):
+    queue.remote.fail = True
+    queue.enqueue("a.sql", "v1", "first")
+    for _ in range(MAX_ATTEMPTS):
+        clock.now += RETRY_MAX_SECONDS
+        queue.sync_once()
+    assert queue.status()['failed'] == 1
+    queue.remote.fail = False
+    queue.retry_failed()
+    queue.sync_once()
+    assert queue.remote.commits == [({"a.sql": "v1"}, "first")]
+    assert queue.status()['failed'] == 0
@@ -0,0 +1,71 @@
+import subprocess
+
+import pytest
+
+from utils.git_manager import LocalGitBackend
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+#A bare repo standing in for GitHub / GitLab, with 1 commit on main
+@pytest.fixture
+def remote(tmp_path):
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(bare))
+    seed = tmp_path / "seed"
+    git(tmp_path, "clone", "-q", str(bare), str(seed))
+    git(seed, "config", "user.name", "Test")
+    git(seed, "config", "user.email", "test@localhost")
+    (seed / "README.md").write_text("repo\n")
+    git(seed, "add", "README.md")
+    git(seed, "commit", "-q", "-m", "init")
+    git(seed, "push", "-q", "origin", "HEAD:main")
+    return bare
+
+
+def backend(tmp_path, remote, name="clone"):
+    return LocalGitBackend(str(tmp_path / name), remote=str(remote), branch="main")
+
+
+def test_commit_stays_local_until_push(tmp_path, remote):
+    local = backend(tmp_path, remote)
+    sha = local.commit_files({"snowflake_objects/s/tables/t.sql": "CREATE TABLE S.T(ID NUMBER);"}, "Add S.T")
+    assert sha
+    assert local.status()['unpushed'] == 1
+    assert git(remote, "log", "-1", "--format=%s", "main") == "init"
+
+    local.push()
+    assert local.status() == {'unpushed': 0, 'last_push': local.last_push, 'last_error': None}
+    assert git(remote, "log", "-1", "--format=%s", "main") == "Add S.T"
+    assert git(remote, "show", "main:snowflake_objects/s/tables/t.sql") == "CREATE TABLE S.T(ID NUMBER);"
+
+
+def test_unchanged_content_is_no_commit(tmp_path, remote):
+    local = backend(tmp_path, remote)
+    files = {"snowflake_objects/s/views/v.sql": "CREATE VIEW S.V AS SELECT 1 AS X;"}
+    assert local.commit_files(files, "Add S.V")
+    assert local.commit_files(files, "Add S.V again") is None
+    assert local.read_files("snowflake_objects/") == files
+
+
+def test_rejected_push_is_rebased(tmp_path, remote):
+    first, second = backend(tmp_path, remote, "first"), backend(tmp_path, remote, "second")
+    first.commit_files({"snowflake_objects/s/tables/a.sql": "A"}, "Add A")
+    second.commit_files({"snowflake_objects/s/tables/b.sql": "B"}, "Add B")
+    first.push()
+    second.push()  #behind the remote now -> fetch, rebase, push again
+    assert second.last_error is None
+    assert git(remote, "log", "--format=%s", "main").splitlines() == ["Add B", "Add A", "init"]
+
+
+def test_conflicting_push_reports_the_error(tmp_path, remote):
+    first, second = backend(tmp_path, remote, "first"), backend(tmp_path, remote, "second")
+    first.commit_files({"snowflake_objects/s/tables/a.sql": "A1"}, "A1")
+    second.commit_files({"snowflake_objects/s/tables/a.sql": "A2"}, "A2")
+    first.push()
+    second.push()
+    assert "conflict" in second.status()['last_error']
+    assert second.status()['unpushed'] == 1
+    assert git(remote, "show", "main:snowflake_objects/s/tables/a.sql") == "A1"
@@ -0,0 +1,17 @@
+import ast
+import pathlib
+
+APP = pathlib.Path(__file__).resolve().parent.parent / "streamlit_app.py"
+TREE = ast.parse(APP.read_text())
+
+
+#The page modules, the data provider and their heavy imports (pandas, snowpark) are loaded when they're used:
+#the script itself only imports what drawing the sidebar needs
+def test_app_imports_nothing_of_its_own_at_startup():
+    top_level = set()
+    for node in TREE.body:
+        if isinstance(node, ast.Import):
+            top_level.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            top_level.add(node.module)
+    assert top_level <= {"importlib", "time", "streamlit"}
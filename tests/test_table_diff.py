@@ -0,0 +1,92 @@
+import pandas as pd
+
+from models.column import Column
+from models.table import Table
+from utils.ddl_compiler import compile_table_columns
+from utils.table_diff import plan_table_changes, column_origins, normalize_type, can_widen
+
+DEPLOYED = Table("S", "T", [Column("ID", "NUMBER(38,0)", False), Column("NAME", "VARCHAR(100)", True),
+                            Column("PRICE", "NUMBER(10,2)", True)])
+
+
+#Same rows as the Modify Table editor: the deployed columns keep their position as index, added rows get a new one
+def editor(rows, index=None):
+    return pd.DataFrame(rows, columns=["src_col_nm", "data_type", "nullable"], index=index)
+
+
+def plan(result):
+    new = Table("S", "T", compile_table_columns(result, "src_col_nm"))
+    return plan_table_changes(DEPLOYED, new, column_origins(result, "src_col_nm", DEPLOYED))
+
+
+def test_normalize_type_aliases_and_defaults():
+    assert normalize_type("int") == normalize_type("NUMBER(38,0)") == ('NUMBER', (38, 0))
+    assert normalize_type("NUMBER(10)") == ('NUMBER', (10, 0))
+    assert normalize_type("string") == ('VARCHAR', (16777216,))
+    assert normalize_type("GEOGRAPHY") == ('GEOGRAPHY', ())
+
+
+def test_can_widen():
+    assert can_widen("VARCHAR(10)", "VARCHAR(100)")
+    assert can_widen("NUMBER(10,2)", "NUMBER(20,2)")
+    assert not can_widen("VARCHAR(100)", "VARCHAR(10)")
+    assert not can_widen("NUMBER(10,2)", "NUMBER(20,4)")
+    assert not can_widen("VARCHAR(10)", "NUMBER")
+
+
+def test_unchanged_editor_is_no_change():
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["NAME", "VARCHAR(100)", "Y"], ["PRICE", "NUMBER(10,2)", "Y"]])
+    assert plan(result).statements == []
+
+
+def test_rename():
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["FULL_NAME", "VARCHAR(100)", "Y"], ["PRICE", "NUMBER(10,2)", "Y"]])
+    changes = plan(result)
+    assert changes.in_place
+    assert changes.statements == ["ALTER TABLE S.T RENAME COLUMN NAME TO FULL_NAME;"]
+
+
+def test_widen_in_place():
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["NAME", "VARCHAR(200)", "Y"], ["PRICE", "NUMBER(12,2)", False]])
+    assert plan(result).statements == [
+        "ALTER TABLE S.T ALTER COLUMN NAME SET DATA TYPE VARCHAR(200);",
+        "ALTER TABLE S.T ALTER COLUMN PRICE SET DATA TYPE NUMBER(12,2);",
+        "ALTER TABLE S.T ALTER COLUMN PRICE SET NOT NULL;",
+    ]
+
+
+def test_narrow_rebuilds():
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["NAME", "VARCHAR(10)", "Y"], ["PRICE", "NUMBER(10,2)", "Y"]])
+    changes = plan(result)
+    assert not changes.in_place
+    assert changes.reasons == ["NAME: VARCHAR(100) -> VARCHAR(10) can't be altered in place"]
+    assert changes.statements == [
+        "CREATE TABLE S.T__IGLOO_SWAP CLONE S.T COPY GRANTS;",
+        "CREATE OR REPLACE TABLE S.T__IGLOO_SWAP(\n\tID NUMBER(38,0) NOT NULL,\n\tNAME VARCHAR(10),\n\tPRICE NUMBER(10,2)\n)\n"
+        "COPY GRANTS\nAS SELECT\n\tID::NUMBER(38,0),\n\tNAME::VARCHAR(10),\n\tPRICE::NUMBER(10,2)\nFROM S.T;",
+        "ALTER TABLE S.T SWAP WITH S.T__IGLOO_SWAP;",
+    ]
+
+
+def test_add_and_drop():
+    #PRICE (row 2) deleted, 1 row added
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["NAME", "VARCHAR(100)", "Y"], ["QTY", "NUMBER", "Y"]], index=[0, 1, 3])
+    assert plan(result).statements == [
+        "ALTER TABLE S.T DROP COLUMN PRICE;",
+        "ALTER TABLE S.T ADD COLUMN QTY NUMBER;",
+    ]
+
+
+def test_blank_rows_are_skipped():
+    #a blank added row between the deployed ones, and a deployed row whose name was cleared (= removed)
+    result = editor([["ID", "NUMBER(38,0)", "N"], [None, None, None], ["", "VARCHAR(100)", "Y"], ["PRICE", "NUMBER(10,2)", "Y"]],
+                    index=[0, 3, 1, 2])
+    assert column_origins(result, "src_col_nm", DEPLOYED) == ["ID", "PRICE"]
+    assert plan(result).statements == ["ALTER TABLE S.T DROP COLUMN NAME;"]
+
+
+def test_rename_to_an_existing_name_rebuilds():
+    result = editor([["ID", "NUMBER(38,0)", "N"], ["PRICE", "VARCHAR(100)", "Y"], ["OLD_PRICE", "NUMBER(10,2)", "Y"]])
+    changes = plan(result)
+    assert not changes.in_place
+    assert changes.reasons == ["NAME is renamed to the name of an existing column (PRICE)"]
@@ -0,0 +1,97 @@
+import pandas as pd
+
+from models.view import View
+from utils.ddl_compiler import compile_select_columns, compile_from_clause, select_column_rows
+from utils.validation import explain_query, _map_error, validate
+
+SOURCES = [{'schema': 'S', 'table': 'ORDERS', 'alias': 'T1'}, {'schema': 'S', 'table': 'CUSTOMERS', 'alias': 'T2'}]
+JOINS = [{'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': 'T1.CUSTOMER_ID = T2.ID'}]
+
+#View editor with a blank row (added, never filled) between the 1st and the 2nd column
+EDITOR = pd.DataFrame([
+    {'src_col_nm': 'T1.ID', 'new_col_nm': 'ID', 'data_type': 'NUMBER', 'transformation': ''},
+    {'src_col_nm': None, 'new_col_nm': None, 'data_type': None, 'transformation': None},
+    {'src_col_nm': 'T1.NAME', 'new_col_nm': 'SHORT_NAME', 'data_type': 'VARCHAR', 'transformation': 'LEFT(T1.NAME,\n2)'},
+    {'src_col_nm': 'T2.ID', 'new_col_nm': 'CUSTOMER_ID', 'data_type': 'NUMBER', 'transformation': ''},
+])
+
+
+def view():
+    return View("S", "V", compile_select_columns(EDITOR), compile_from_clause(SOURCES, JOINS))
+
+
+def error(line):
+    return f"001003 (42000): SQL compilation error:\nsyntax error line {line} at position 4 unexpected ','."
+
+
+def test_explain_query_has_every_column_and_join_on_its_own_lines():
+    query, spans = explain_query(view())
+    assert query == ("EXPLAIN USING TEXT\nSELECT\n"
+                     "\tT1.ID::NUMBER AS ID,\n"
+                     "\tLEFT(T1.NAME,\n2)::VARCHAR AS SHORT_NAME,\n"
+                     "\tT2.ID::NUMBER AS CUSTOMER_ID\n"
+                     "FROM S.ORDERS T1\n"
+                     "LEFT JOIN S.CUSTOMERS T2 ON T1.CUSTOMER_ID = T2.ID")
+    assert spans == [(3, 3, 'column', 0), (4, 5, 'column', 1), (6, 6, 'column', 2), (7, 7, 'from', -1), (8, 8, 'from', 0)]
+
+
+def test_error_line_maps_to_the_editor_row():
+    obj = view()
+    _, spans = explain_query(obj)
+    #line 5 is the 2nd line of the multi-line transformation -> 2nd column, shown on the 3rd editor row (blank row above it)
+    result = _map_error(error(5), spans)
+    assert not result.ok
+    assert result.column_index == 1
+    assert result.message == "syntax error line 5 at position 4 unexpected ','."
+    assert result.location(obj, select_column_rows(EDITOR)) == "Row 3 (SHORT_NAME)"
+    assert _map_error(error(6), spans).location(obj, select_column_rows(EDITOR)) == "Row 4 (CUSTOMER_ID)"
+
+
+def test_error_line_maps_to_the_join():
+    obj = view()
+    _, spans = explain_query(obj)
+    assert _map_error(error(7), spans).location(obj) == "FROM (base table)"
+    assert _map_error(error(8), spans).location(obj) == "Join 1"
+
+
+def test_error_without_line_has_no_location():
+    result = _map_error("002003 (42S02): SQL compilation error:\nObject 'S.ORDERS' does not exist.", [])
+    assert not result.ok
+    assert result.message == "Object 'S.ORDERS' does not exist."
+    assert result.location(view()) is None
+
+
+class FakeSession:
+
+    def __init__(self, role, fails):
+        self.role = role
+        self.fails = fails
+        self.queries = 0
+
+    def get_current_user(self):
+        return "ME"
+
+    def get_current_role(self):
+        return self.role
+
+    def get_current_database(self):
+        return "DB"
+
+    def sql(self, query):
+        self.queries += 1
+        if self.fails:
+            raise Exception(error(3).replace("syntax error", "invalid identifier 'T1.ID'"))
+        return self
+
+    def collect(self):
+        return []
+
+
+def test_results_are_cached_per_role():
+    obj = View("S", "CACHE_TEST", compile_select_columns(EDITOR), compile_from_clause(SOURCES, JOINS))
+    allowed, denied = FakeSession("OWNER", fails=False), FakeSession("READER", fails=True)
+    assert validate(allowed, obj).ok
+    assert validate(allowed, obj).ok
+    assert allowed.queries == 1
+    assert not validate(denied, obj).ok  #not the OWNER's cached result
+    assert denied.queries == 1
@@ -0,0 +1,194 @@
+import time
+import streamlit as st
+from utils.ddl_parser import parse_definition
+from utils.deploy_jobs import DeployJob, RUNNING, SUCCEEDED, FAILED, git_path
+from utils.git_manager import get_git_queue
+
+#Deploys many objects in 1 go: the FROM/JOIN sources of every DDL (same parser as get_source_details) give the dependency
+#graph, the objects go out in topological waves (a wave only starts when the previous one finished),
+#inside a wave at most `parallelism` deploys run at the same time
+
+PENDING = "PENDING"
+SKIPPED = "SKIPPED"  #a dependency failed
+
+#Concurrent deploys inside a wave, if the [igloo] secrets don't say otherwise
+DEFAULT_PARALLELISM = 4
+
+
+class BatchItem:
+
+    def __init__(self, schema_name, object_type, object_name, ddl_sql, commitmsg, git_content=None):
+        self.schema_name = schema_name
+        self.object_type = object_type
+        self.object_name = object_name
+        self.ddl_sql = ddl_sql
+        self.commitmsg = commitmsg
+        self.git_content = git_content or ddl_sql
+
+    @property
+    def key(self):
+        return (self.schema_name.upper(), self.object_name.upper())
+
+    #(SCHEMA, NAME) of every table/view the object reads, tables have none
+    def sources(self):
+        if self.object_type == 'Table':
+            return set()
+        definition = parse_definition(self.git_content, self.schema_name)
+        return {(src['schema'].strip('"').upper(), src['table'].strip('"').upper()) for src in definition.source_tables}
+
+
+#Kahn's algorithm level by level -> [[items without dependencies in the batch], [items depending only on wave 1], ...]
+#Sources outside of the batch are assumed to be deployed already. ValueError on a cycle
+def dependency_waves(items):
+    by_key = {item.key: item for item in items}
+    depends_on = {item.key: {src for src in item.sources() if src in by_key and src != item.key} for item in items}
+    waves = []
+    done = set()
+    remaining = [item.key for item in items]
+    while remaining:
+        wave = [key for key in remaining if depends_on[key] <= done]
+        if not wave:
+            cycle = ", ".join(".".join(key) for key in remaining)
+            raise ValueError(f"Circular dependency between: {cycle}")
+        waves.append([by_key[key] for key in wave])
+        done.update(wave)
+        remaining = [key for key in remaining if key not in done]
+    return waves, depends_on
+
+
+class BatchRun:
+
+    def __init__(self, batch_id, items, parallelism=DEFAULT_PARALLELISM):
+        self.batch_id = batch_id
+        self.waves, self.depends_on = dependency_waves(items)
+        self.parallelism = max(1, int(parallelism))
+        self.status = {item.key: PENDING for item in items}
+        self.jobs = {}  #key -> DeployJob, once submitted
+        self.wave = 0
+        self.session = None
+        self.git_result = None
+
+    def start(self, session):
+        self.session = session
+        self.poll()
+
+    def done(self):
+        return self.wave >= len(self.waves)
+
+    #Check the running deploys, submit the next ones. Returns True if the whole batch finished in this call
+    def poll(self):
+        if self.done():
+            return False
+        while not self.done():
+            wave = self.waves[self.wave]
+            for item in wave:
+                job = self.jobs.get(item.key)
+                if job is not None and not job.done():
+                    job.poll()
+                    self.status[item.key] = job.status
+
+            #a failed dependency skips the object (and, through it, everything downstream)
+            for item in wave:
+                if self.status[item.key] == PENDING and any(self.status[dep] in (FAILED, SKIPPED) for dep in self.depends_on[item.key]):
+                    self.status[item.key] = SKIPPED
+
+            running = sum(1 for item in wave if self.status[item.key] == RUNNING)
+            for item in wave:
+                if running >= self.parallelism:
+                    break
+                if self.status[item.key] == PENDING:
+                    self._submit(item)
+                    running += self.status[item.key] == RUNNING
+
+            if any(self.status[item.key] in (PENDING, RUNNING) for item in wave):
+                return False
+            self.wave += 1
+        self._push_git()
+        return True
+
+    #Every deployed object of the batch is queued at once, the sync worker pushes them in 1 commit
+    def _push_git(self):
+        items = [item for wave in self.waves for item in wave if self.status[item.key] == SUCCEEDED]
+        if not items:
+            return
+        get_git_queue().enqueue_many([(git_path(item.schema_name, item.object_type, item.object_name), item.git_content,
+                                       f"{item.schema_name}.{item.object_name}: {item.commitmsg}") for item in items])
+        self.git_result = f"Success! Queued {len(items)} files for GitHub."
+
+    def _submit(self, item):
+        job = DeployJob(f"{self.batch_id}.{len(self.jobs) + 1}", item.ddl_sql, item.schema_name, item.object_type,
+                        item.object_name, item.commitmsg, item.git_content, push_git=False)
+        self.jobs[item.key] = job
+        try:
+            job.start(self.session)
+            job.poll()
+        except Exception as e:
+            job._finish(FAILED, error=str(e))
+        self.status[item.key] = job.status
+
+    #1 row per object for the report table
+    def report(self):
+        rows = []
+        for number, wave in enumerate(self.waves, start=1):
+            for item in wave:
+                job = self.jobs.get(item.key)
+                rows.append({
+                    "wave": number,
+                    "object": f"{item.schema_name}.{item.object_name}",
+                    "type": item.object_type,
+                    "status": self.status[item.key],
+                    "seconds": round(job.elapsed(), 1) if job else None,
+                    "error": job.error if job else None,
+                })
+        return rows
+
+    #Wall clock seconds from the 1st submit to the last finish (or now)
+    def elapsed(self):
+        if not self.jobs:
+            return 0
+        started = min(job.submitted_at for job in self.jobs.values())
+        finished = [job.finished_at for job in self.jobs.values()]
+        return (max(finished) if self.done() and all(finished) else time.time()) - started
+
+    def counts(self):
+        counts = {}
+        for status in self.status.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+#Objects waiting to be deployed together (this browser session)
+def get_batch():
+    if "deploy_batch" not in st.session_state:
+        st.session_state.deploy_batch = []
+    return st.session_state.deploy_batch
+
+
+#Adding an object again replaces its earlier version
+def add_to_batch(item):
+    batch = get_batch()
+    batch[:] = [queued for queued in batch if queued.key != item.key]
+    batch.append(item)
+
+
+def get_batch_runs():
+    if "deploy_batches" not in st.session_state:
+        st.session_state.deploy_batches = []
+    return st.session_state.deploy_batches
+
+
+def start_batch(session, items, parallelism):
+    runs = get_batch_runs()
+    run = BatchRun(len(runs) + 1, items, parallelism)
+    runs.insert(0, run)
+    run.start(session)
+    return run
+
+
+#Poll every running batch -> the batches that finished now
+def poll_batches():
+    return [run for run in get_batch_runs() if run.poll()]
+
+
+def running_batches():
+    return [run for run in get_batch_runs() if not run.done()]
@@ -0,0 +1,69 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+#Small in-memory cache for catalog metadata (schemas, tables, views, columns)
+#Every entry has its own TTL, and the least recently used entries are evicted once max_entries is reached
+#Entries are tagged with the schema they belong to, so a deploy only has to drop that schema
+class CatalogCache:
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  #key -> (expires_at, schema, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, schema, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)  #mark as recently used
+            return value
+
+    def put(self, key, value, ttl, schema=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, schema.upper() if schema else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)  #drop the least recently used
+
+    #Return the cached value or call loader() and cache its result
+    #Callers get a copy, so mutating the result (eg. appending to a source list) can't corrupt the cache
+    #copy_result=False is for internal structures that are only read (eg. the object index)
+    def get_or_load(self, key, ttl, loader, schema=None, copy_result=True):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.put(key, value, ttl, schema)
+        return copy.deepcopy(value) if copy_result else value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    #All entries that are not expired yet, as (key, value) pairs
+    def items(self):
+        now = time.monotonic()
+        with self._lock:
+            return [(key, entry[2]) for key, entry in self._entries.items() if entry[0] >= now]
+
+    #Drop every entry of one schema, or everything if no schema is given
+    def invalidate(self, schema=None):
+        with self._lock:
+            if schema is None:
+                self._entries.clear()
+                return
+            schema = schema.upper()
+            for key in [k for k, entry in self._entries.items() if entry[1] == schema]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
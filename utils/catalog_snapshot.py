@@ -0,0 +1,65 @@
+import threading
+from datetime import datetime
+from utils.sqlite_db import connect
+
+_TABLES = """
+CREATE TABLE IF NOT EXISTS schemas (db_name TEXT, schema_name TEXT, position INTEGER);
+CREATE TABLE IF NOT EXISTS objects (schema_name TEXT, object_name TEXT, kind TEXT, last_altered TEXT);
+CREATE TABLE IF NOT EXISTS columns (schema_name TEXT, object_name TEXT, position INTEGER, column_name TEXT, data_type TEXT, nullable TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+#LAST_ALTERED comes back as a datetime from Snowflake, sqlite stores it as ISO text
+def _to_text(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _from_text(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+#Local sqlite copy of the catalog (schemas, objects + LAST_ALTERED, columns)
+#A new app process reads this first, so the first page render doesn't have to wait for Snowflake
+class CatalogSnapshot:
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with connect(self.path) as conn:
+            conn.executescript(_TABLES)
+
+    #Returns {'schemas': {db: [schema, ...]},
+    #         'objects': {schema: [(name, kind, last_altered), ...]},
+    #         'columns': {(schema, name): [(column, type, null?), ...]},
+    #         'meta': {key: value}}
+    def load(self):
+        snapshot = {'schemas': {}, 'objects': {}, 'columns': {}, 'meta': {}}
+        with self._lock, connect(self.path) as conn:
+            for db_name, schema_name in conn.execute("SELECT db_name, schema_name FROM schemas ORDER BY db_name, position"):
+                snapshot['schemas'].setdefault(db_name, []).append(schema_name)
+            for schema_name, object_name, kind, last_altered in conn.execute("SELECT schema_name, object_name, kind, last_altered FROM objects"):
+                snapshot['objects'].setdefault(schema_name, []).append((object_name, kind, _from_text(last_altered)))
+            for schema_name, object_name, column_name, data_type, nullable in conn.execute(
+                    "SELECT schema_name, object_name, column_name, data_type, nullable FROM columns ORDER BY schema_name, object_name, position"):
+                snapshot['columns'].setdefault((schema_name, object_name), []).append((column_name, data_type, nullable))
+            snapshot['meta'] = dict(conn.execute("SELECT key, value FROM meta"))
+        return snapshot
+
+    #Replace the whole snapshot in 1 transaction, same shapes as load()
+    def save(self, schemas, objects, columns, meta=None):
+        with self._lock, connect(self.path) as conn:
+            conn.execute("DELETE FROM schemas")
+            conn.execute("DELETE FROM objects")
+            conn.execute("DELETE FROM columns")
+            conn.executemany("INSERT INTO schemas VALUES (?, ?, ?)",
+                             [(db_name, name, i) for db_name, names in schemas.items() for i, name in enumerate(names)])
+            conn.executemany("INSERT INTO objects VALUES (?, ?, ?, ?)",
+                             [(schema_name, name, kind, _to_text(last_altered))
+                              for schema_name, objs in objects.items() for name, kind, last_altered in objs])
+            conn.executemany("INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?)",
+                             [(schema_name, object_name, i, col_name, col_type, nullable)
+                              for (schema_name, object_name), cols in columns.items()
+                              for i, (col_name, col_type, nullable) in enumerate(cols)])
+            for key, value in (meta or {}).items():
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, _to_text(value)))
@@ -1,39 +1,208 @@
 # utils/data_provider.py
+import copy
+import datetime
+import hashlib
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
-from utils.snowflake_connector import get_session
-
-#Get some sample data for offline dev
-class MockDataProvider:
-    def get_schemas(self, db_name):
-        return["BRONZE", "SILVER", "GOLD"]
-
-    def get_tables(self, schema_name):
-        #Returns a fake list of tables for testing UI
-        if "BRONZE" in schema_name:
-            return ["LANDING_USERS", "LANDING_ORDERS", "RAW_LOGS"]
-        elif "SILVER" in schema_name:
-            return ["DIM_CUSTOMERS", "FACT_ORDERS"]
-        else:
-            return ["UNKNOWN_TABLE"]
-
-    def get_columns(self, schema_name, table_name, obj_type):
-        #Returns fake columns based on table name
-        if "USERS" in table_name:
-            return [("ID", "NUMBER"), ("NAME", "VARCHAR"), ("CREATED_AT", "TIMESTAMP")]
-        elif "ORDERS" in table_name:
-            return [("ORDER_ID", "NUMBER"), ("USER_ID", "NUMBER"), ("AMOUNT", "FLOAT")]
-        else:
-            return [("COL_1", "VARCHAR"), ("COL_2", "NUMBER")]
+from utils.snowflake_connector import get_session, find_session
+from utils.settings import get_igloo_settings
+from utils.catalog_cache import CatalogCache
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.ddl_parser import parse_definition
+from utils.ddl_compiler import compile_from_clause
+from utils.object_index import ObjectIndex, classify, TABLE, DYNAMIC_TABLE, VIEW
+from models.column import Column
+from models.table import Table
+from models.view import View
+from models.dynamic_table import DynamicTable
+
+#How long (in seconds) a catalog answer is reused before asking Snowflake again
+CACHE_TTL = {
+    'schemas': 600,
+    'objects': 120,
+    'columns': 300,
+    'ddl': 300,
+}
+CACHE_MAX_ENTRIES = 2048
+#Min seconds between 2 writes of the on-disk catalog snapshot
+SNAPSHOT_SAVE_INTERVAL = 60
+#A snapshot older than this (seconds) isn't loaded, the catalog comes from Snowflake again
+SNAPSHOT_MAX_AGE = 7 * 24 * 3600
+#Max number of metadata queries running at the same time
+MAX_PARALLEL_QUERIES = 8
+
+#Escape a value so it can be used inside a single quoted SQL string literal
+def _sql_str(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+#INFORMATION_SCHEMA.COLUMNS splits the type into DATA_TYPE + precision/length columns, DESCRIBE returns them together (NUMBER(38,0))
+#Rebuild the DESCRIBE style type, so the editors get the same values no matter which path loaded the columns
+def _describe_type(row):
+    data_type = row["DATA_TYPE"]
+    if data_type == "NUMBER" and row["NUMERIC_PRECISION"] is not None:
+        return f"NUMBER({row['NUMERIC_PRECISION']},{row['NUMERIC_SCALE']})"
+    if data_type == "TEXT" and row["CHARACTER_MAXIMUM_LENGTH"] is not None:
+        return f"VARCHAR({row['CHARACTER_MAXIMUM_LENGTH']})"
+    if data_type == "BINARY" and row["CHARACTER_MAXIMUM_LENGTH"] is not None:
+        return f"BINARY({row['CHARACTER_MAXIMUM_LENGTH']})"
+    if data_type.startswith(("TIMESTAMP", "TIME")) and row["DATETIME_PRECISION"] is not None:
+        return f"{data_type}({row['DATETIME_PRECISION']})"
+    return data_type
+
+
+#Snowpark documents sharing 1 Session between threads from 1.24.0 on, older versions run the queries 1 by 1
+def _snowpark_version():
+    try:
+        from snowflake.snowpark import __version__
+        return tuple(int(part) for part in re.findall(r"\d+", __version__)[:3])
+    except Exception:
+        return (0,)
+
+
+SESSION_THREAD_SAFE = _snowpark_version() >= (1, 24, 0)
+
+
+#Call fn for every item at the same time (bounded thread pool), results come back in the order of items
+#Metadata queries are mostly waiting on cloud services, so the page waits for the slowest one instead of the sum
+#parallel=False -> 1 by 1 on the calling thread (the Snowpark session can't be shared, see SESSION_THREAD_SAFE)
+def _run_parallel(fn, items, parallel=True):
+    if len(items) <= 1 or not parallel:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_QUERIES, len(items))) as executor:
+        return list(executor.map(fn, items))
 
 
 #returns real data from snowflake
 class RealDataProvider:
-    def __init__(self):
-        self.session = get_session()
+    #snapshot_path: optional sqlite file, the catalog is loaded from it on start and written back regularly
+    #session: defaults to get_session(), pass one in to run the provider against something else (eg. a stub in benchmarks)
+    def __init__(self, snapshot_path=None, session=None):
+        self._session = session
+        #Catalog answers are reused between reruns instead of running the same SHOW/DESCRIBE on every widget interaction
+        self._cache = CatalogCache(max_entries=CACHE_MAX_ENTRIES)
+        #(SCHEMA, NAME, ddl hash) -> ObjectDefinition
+        self._definitions = {}
+
+        self._snapshot = None
+        self._snapshot_dirty = False
+        self._snapshot_saved_at = 0
+        if snapshot_path:
+            self._snapshot = CatalogSnapshot(snapshot_path)
+            snapshot = self._hydrate_from_snapshot()
+            if snapshot['schemas'] or snapshot['objects']:
+                #Serve the snapshot right away, check it against Snowflake in the background
+                threading.Thread(target=self._revalidate_snapshot, args=(snapshot,), daemon=True).start()
+
+    #The provider is cached for the whole process, a session kept from the start would be the closed one after a
+    #reconnect (expired token...) -> ask get_session() on every use (it returns its cached session, no new login)
+    @property
+    def session(self):
+        return self._session or self._connect()
+
+    def _connect(self):
+        return get_session()
+
+    #Drop cached catalog data, for one schema (eg. after a deploy) or everything (refresh button)
+    def invalidate(self, schema_name=None):
+        self._cache.invalidate(schema_name)
+
+    #Account + database the catalog belongs to, written into the snapshot meta. Snowpark reads both from the connection
+    #(no query). find_session: no st.error from here, None if there is no session
+    def _snapshot_owner(self):
+        try:
+            session = self._session or find_session()
+            return {'account': str(session.get_current_account()).upper(), 'database': str(session.get_current_database()).upper()}
+        except Exception:
+            return None
+
+    #A snapshot is only used if it was written for the same account + database and isn't older than SNAPSHOT_MAX_AGE
+    #(the file can be copied between environments, or left over from a connection to another database)
+    def _snapshot_usable(self, meta):
+        owner = self._snapshot_owner()
+        if owner is None or any(meta.get(key) != value for key, value in owner.items()):
+            return False
+        try:
+            saved_at = datetime.datetime.fromisoformat(meta['saved_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (datetime.datetime.now(datetime.timezone.utc) - saved_at).total_seconds() < SNAPSHOT_MAX_AGE
+
+    #Put the snapshot content into the cache, as if it was just loaded from Snowflake
+    #An unusable snapshot (see _snapshot_usable) is skipped, it's overwritten on the next save
+    def _hydrate_from_snapshot(self):
+        snapshot = self._snapshot.load()
+        if not self._snapshot_usable(snapshot['meta']):
+            return {'schemas': {}, 'objects': {}, 'columns': {}, 'meta': {}}
+        for db_name, schemas in snapshot['schemas'].items():
+            self._cache.put(('schemas', db_name), schemas, CACHE_TTL['schemas'])
+        for schema_name, objects in snapshot['objects'].items():
+            self._cache.put(('objects', schema_name.upper()), ObjectIndex(schema_name, objects), CACHE_TTL['objects'], schema=schema_name)
+        for (schema_name, obj_name), columns in snapshot['columns'].items():
+            self._cache.put(('columns', schema_name.upper(), obj_name.upper()), columns, CACHE_TTL['columns'], schema=schema_name)
+        return snapshot
+
+    #Runs in a background thread after hydration: reload schemas + object indexes, drop the snapshot columns/DDL of the
+    #dropped objects and recheck the ones whose LAST_ALTERED moved (_reload_changed)
+    def _revalidate_snapshot(self, snapshot):
+        try:
+            for db_name in snapshot['schemas']:
+                self._cache.put(('schemas', db_name), self._fetch_schemas(db_name), CACHE_TTL['schemas'])
+            for schema_name, objects in snapshot['objects'].items():
+                fresh = self._fetch_object_index(schema_name)
+                changed = []
+                for obj_name, kind, last_altered in objects:
+                    current = fresh.objects.get(obj_name)
+                    if current is None:
+                        self._cache.delete(('columns', schema_name.upper(), obj_name.upper()))
+                        self._cache.delete(('ddl', schema_name.upper(), obj_name.upper()))
+                    elif current['last_altered'] != last_altered:
+                        changed.append({'schema': schema_name, 'table': obj_name, 'kind': current['kind']})
+                self._reload_changed(changed)
+                self._cache.put(('objects', schema_name.upper()), fresh, CACHE_TTL['objects'], schema=schema_name)
+            self.save_snapshot()
+        except Exception:
+            #Not fatal: the entries simply expire with their TTL and get reloaded on demand
+            pass
+
+    #Write the cached schemas, object indexes and columns to the snapshot file
+    def save_snapshot(self):
+        if not self._snapshot:
+            return
+        schemas, objects, columns = {}, {}, {}
+        for key, value in self._cache.items():
+            if key[0] == 'schemas':
+                schemas[key[1]] = value
+            elif key[0] == 'objects':
+                objects[value.schema] = [(name, obj['kind'], obj['last_altered']) for name, obj in list(value.objects.items())]
+            elif key[0] == 'columns':
+                columns[(key[1], key[2])] = value
+        owner = self._snapshot_owner()
+        if owner is None:
+            return  #can't tell whose catalog this is, a later save writes it
+        self._snapshot.save(schemas, objects, columns, dict(owner, saved_at=datetime.datetime.now(datetime.timezone.utc)))
+        self._snapshot_dirty = False
+        self._snapshot_saved_at = time.monotonic()
+
+    #Called after loads: write the snapshot at most every SNAPSHOT_SAVE_INTERVAL seconds, off the render path
+    def _maybe_save_snapshot(self):
+        if self._snapshot and self._snapshot_dirty and time.monotonic() - self._snapshot_saved_at > SNAPSHOT_SAVE_INTERVAL:
+            self._snapshot_saved_at = time.monotonic()
+            threading.Thread(target=self.save_snapshot, daemon=True).start()
 
     #Get schemas in the current db
     def get_schemas(self, db_name):
+        schemas = self._cache.get_or_load(('schemas', db_name), CACHE_TTL['schemas'], lambda: self._fetch_schemas(db_name))
+        self._maybe_save_snapshot()
+        return schemas
+
+    def _fetch_schemas(self, db_name):
+        self._snapshot_dirty = True
         df = self.session.sql(f"SHOW SCHEMAS IN DATABASE {db_name}").collect()
         schemas = [
                 row["name"] 
@@ -42,334 +211,413 @@ class RealDataProvider:
             ]
         return schemas
 
+    #All tables, dynamic tables and views of a schema, classified with 1 INFORMATION_SCHEMA.TABLES query
+    #(instead of SHOW TABLES + SHOW DYNAMIC TABLES + SHOW VIEWS)
+    def get_object_index(self, schema_name):
+        index = self._cache.get_or_load(('objects', schema_name.upper()), CACHE_TTL['objects'],
+                                        lambda: self._fetch_object_index(schema_name), schema=schema_name, copy_result=False)
+        self._maybe_save_snapshot()
+        return index
+
+    def _fetch_object_index(self, schema_name):
+        self._snapshot_dirty = True
+        df = self.session.sql(f"""
+            SELECT TABLE_NAME, TABLE_TYPE, IS_DYNAMIC, LAST_ALTERED
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = {_sql_str(schema_name.upper())}
+        """).collect()
+        index = ObjectIndex(schema_name)
+        for row in df:
+            kind = classify(row["TABLE_TYPE"], row["IS_DYNAMIC"])
+            if kind:
+                index.upsert(row["TABLE_NAME"], kind, row["LAST_ALTERED"])
+        return index
+
+    #Bring the cached object indexes up to date without re-listing every schema:
+    #1 query for the objects changed since the oldest index watermark (LAST_ALTERED) + 1 count per schema to spot drops
+    #Changed objects are merged into their index and get their cached columns reloaded (DDL only dropped when it can have changed),
+    #schemas where objects vanished are reloaded
+    def refresh_catalog(self):
+        indexes = {key[1]: index for key, index in self._cache.items() if key[0] == 'objects'}
+        #the schema list is 1 cheap SHOW, just reload it
+        for key, _ in self._cache.items():
+            if key[0] == 'schemas':
+                self._cache.delete(key)
+        if not indexes:
+            return
+
+        watermarks = [index.watermark() for index in indexes.values() if index.watermark() is not None]
+        changed = []
+        if watermarks:
+            df = self.session.sql(f"""
+                SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, IS_DYNAMIC, LAST_ALTERED
+                FROM INFORMATION_SCHEMA.TABLES
+                WHERE LAST_ALTERED >= {_sql_str(min(watermarks).isoformat())}::TIMESTAMP_LTZ
+                  AND TABLE_SCHEMA IN ({", ".join(_sql_str(schema) for schema in indexes)})
+            """).collect()
+            for row in df:
+                index = indexes[row["TABLE_SCHEMA"].upper()]
+                kind = classify(row["TABLE_TYPE"], row["IS_DYNAMIC"])
+                known = index.objects.get(row["TABLE_NAME"])
+                if kind and (known is None or known['last_altered'] != row["LAST_ALTERED"]):
+                    index.upsert(row["TABLE_NAME"], kind, row["LAST_ALTERED"])
+                    changed.append({'schema': index.schema, 'table': row["TABLE_NAME"], 'kind': kind})
+
+        #Dropped objects don't show up as changes -> compare the number of objects per schema
+        df = self.session.sql(f"""
+            SELECT TABLE_SCHEMA, COUNT(*) AS OBJECT_COUNT
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA IN ({", ".join(_sql_str(schema) for schema in indexes)})
+              AND (TABLE_TYPE IN ('BASE TABLE', 'TEMPORARY TABLE', 'VIEW', 'MATERIALIZED VIEW') OR IS_DYNAMIC = 'YES')
+            GROUP BY TABLE_SCHEMA
+        """).collect()
+        counts = {row["TABLE_SCHEMA"].upper(): row["OBJECT_COUNT"] for row in df}
+        for schema_key, index in indexes.items():
+            if counts.get(schema_key, 0) != len(index):
+                self._cache.invalidate(index.schema)  #something was dropped (or renamed), reload this schema on next use
+            else:
+                self._cache.put(('objects', schema_key), index, CACHE_TTL['objects'], schema=index.schema)
+
+        self._reload_changed(changed)
+        self._snapshot_dirty = True
+        self._maybe_save_snapshot()
+
+    #LAST_ALTERED also moves on DML (every load / insert / merge), not only on DDL: a table with regular loads is "changed"
+    #on every refresh and every cold start from the snapshot. So the cached columns of changed objects are refetched
+    #(1 query per schema) and compared, a table whose columns are the same keeps its cached DDL. Views and dynamic tables
+    #can change their query with the same columns -> their DDL is always dropped. Uncached columns are loaded on demand
+    def _reload_changed(self, changed):
+        reload = [obj for obj in changed if self._cache.get(('columns', obj['schema'].upper(), obj['table'].upper())) is not None]
+        fresh = self._fetch_columns_bulk(reload) if reload else {}
+        for obj in changed:
+            key = (obj['schema'].upper(), obj['table'].upper())
+            cached = self._cache.get(('columns',) + key)
+            columns = fresh.get(key)
+            if columns is not None:
+                self._cache.put(('columns',) + key, columns, CACHE_TTL['columns'], schema=obj['schema'])
+            else:
+                self._cache.delete(('columns',) + key)
+            same = cached is not None and columns is not None and [tuple(c) for c in cached] == [tuple(c) for c in columns]
+            if not (same and obj['kind'] == TABLE):
+                self._cache.delete(('ddl',) + key)
+
     #Get tables in a specific schema, default is all so don't need to specify in some cases
+    #obj_type: 'all', 'normal' (no dynamic tables) or 'dynamic'
     def get_tables(self, schema_name, obj_type='all'):
-        #1 collect all data
-        #maybe use UPPER() later, if someone was stupid enough to name the table with lowercase 
-        df_all = self.session.sql(f"SHOW TABLES IN SCHEMA {schema_name}").collect()
-        tables_all = [row["name"] for row in (df_all)]
-        if obj_type == 'all':
-            return tables_all
-
-        #2 collect dt data
-        df_dt = self.session.sql(f"SHOW DYNAMIC TABLES IN SCHEMA {schema_name}").collect()
-        tables_dt = [row["name"] for row in (df_dt)]
-        
-        #handle dt/normal
-        if obj_type == 'normal':
-            return list(set(tables_all) - set(tables_dt))  #Have to use "sets" bc cant substract 1list rom another. INVALID:[1, 2, 3] - [2], VALID:{1, 2, 3} - {2}  
-        elif obj_type == 'dynamic':
-            return tables_dt
-
+        return self.get_object_index(schema_name).tables(obj_type)
     
     #Get views in a specific schema
     def get_views(self, schema_name):
-        df = self.session.sql(f"SHOW VIEWS IN SCHEMA {schema_name}").collect()
-        views = [row["name"] for row in df]
-        return views
+        return self.get_object_index(schema_name).views()
+
+    #Type-ahead search in a schema, returns only the top matches instead of the whole object list
+    #obj_type: 'all', 'normal', 'dynamic' (like get_tables) or 'view'
+    def search_objects(self, schema_name, query, obj_type='all', limit=50):
+        return self.get_object_index(schema_name).search(query, obj_type, limit)
+
+    def count_objects(self, schema_name, obj_type='all'):
+        return self.get_object_index(schema_name).count(obj_type)
 
     #Get columns in a specific table/view 
-    def get_columns(self, schema_name, obj_name, obj_type):
+    #session: already resolved by the caller (worker threads don't go through get_session)
+    def get_columns(self, schema_name, obj_name, obj_type, session=None):
+        return self._cache.get_or_load(('columns', schema_name.upper(), obj_name.upper()), CACHE_TTL['columns'],
+                                       lambda: self._fetch_columns(schema_name, obj_name, obj_type, session), schema=schema_name)
+
+    def _fetch_columns(self, schema_name, obj_name, obj_type, session=None):
+        self._snapshot_dirty = True
+        session = session or self.session
         if obj_type in ('Table','Dynamic Table'):
-            df = self.session.sql(f"DESCRIBE TABLE {schema_name}.{obj_name}").collect()
+            df = session.sql(f"DESCRIBE TABLE {schema_name}.{obj_name}").collect()
         elif obj_type == 'View':
-            df = self.session.sql(f"DESCRIBE VIEW {schema_name}.{obj_name}").collect()
+            df = session.sql(f"DESCRIBE VIEW {schema_name}.{obj_name}").collect()
         columns = [(row["name"], row["type"], row["null?"]) for row in df]
         return columns
-    
-    #simple DESC command not enough to get the transforms like LEFT(ID,2)
-    def get_transform(self, schema_name, obj_name, obj_type):
+
+    #Get columns for many tables/views with 1 INFORMATION_SCHEMA query per schema, instead of a DESCRIBE per object
+    #objects: list of dicts with 'schema' and 'table' keys (same shape as builder_source_tables)
+    #Returns {(schema, table): [(name, type, null?), ...]} with the same tuples as get_columns
+    def get_columns_bulk(self, objects):
+        columns = {}
+        missing = []
+        for obj in objects:
+            cached = self._cache.get(('columns', obj['schema'].upper(), obj['table'].upper()))
+            if cached is not None:
+                columns[(obj['schema'], obj['table'])] = list(cached)
+            else:
+                missing.append(obj)
+        if not missing:
+            return columns
+
+        found = self._fetch_columns_bulk(missing)
+        not_found = []
+        for obj in missing:
+            cols = found.get((obj['schema'].upper(), obj['table'].upper()))
+            if cols is None:
+                not_found.append(obj)
+            else:
+                self._cache.put(('columns', obj['schema'].upper(), obj['table'].upper()), cols, CACHE_TTL['columns'], schema=obj['schema'])
+                columns[(obj['schema'], obj['table'])] = list(cols)
+
+        #Not found in INFORMATION_SCHEMA (eg. quoted lowercase name) -> fall back to DESCRIBE, all of them at the same time
+        session = self.session if not_found else None  #resolved here, not in every worker thread
+        described = _run_parallel(lambda obj: self.get_columns(obj['schema'], obj['table'], 'Table', session), not_found,
+                                  SESSION_THREAD_SAFE)
+        for obj, cols in zip(not_found, described):
+            columns[(obj['schema'], obj['table'])] = cols
+
+        self._maybe_save_snapshot()
+        #Same order as the requested sources
+        return {(obj['schema'], obj['table']): columns[(obj['schema'], obj['table'])] for obj in objects}
+
+    #Returns {(SCHEMA, TABLE): [(name, type, null?), ...]}, keys are uppercase
+    def _fetch_columns_bulk(self, objects):
+        self._snapshot_dirty = True
+        #Group the requested objects by schema, names are looked up in uppercase (unquoted identifiers are stored like that)
+        #Plain literal filters on TABLE_SCHEMA/TABLE_NAME keep the INFORMATION_SCHEMA query selective on big databases
+        by_schema = {}
+        for obj in objects:
+            by_schema.setdefault(obj['schema'].upper(), set()).add(obj['table'].upper())
+
+        session = self.session  #resolved here, not in every worker thread
+
+        def fetch_schema(schema_name):
+            table_names = by_schema[schema_name]
+            names_sql = ", ".join(_sql_str(name) for name in sorted(table_names))
+            return session.sql(f"""
+                SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE,
+                       NUMERIC_PRECISION, NUMERIC_SCALE, CHARACTER_MAXIMUM_LENGTH, DATETIME_PRECISION
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = {_sql_str(schema_name)}
+                  AND TABLE_NAME IN ({names_sql})
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """).collect()
+
+        #1 query per schema, the schemas are queried in parallel
+        schema_names = list(by_schema)
+        found = {}
+        for schema_name, df in zip(schema_names, _run_parallel(fetch_schema, schema_names, SESSION_THREAD_SAFE)):
+            for row in df:
+                #IS_NULLABLE is YES/NO, DESCRIBE gives Y/N -> keep the DESCRIBE format
+                null_flag = 'Y' if row["IS_NULLABLE"] == 'YES' else 'N'
+                found.setdefault((schema_name, row["TABLE_NAME"].upper()), []).append(
+                    (row["COLUMN_NAME"], _describe_type(row), null_flag)
+                )
+        return found
+
+    #Fetch GET_DDL once and parse everything Igloo needs from it (columns/transforms, sources/joins, lag, warehouse)
+    #The parsed result is memoized by (schema, name, DDL hash), so a changed object is re-parsed but an unchanged one never is
+    def get_object_definition(self, schema_name, obj_name, obj_type):
+        ddl = self._cache.get_or_load(('ddl', schema_name.upper(), obj_name.upper()), CACHE_TTL['ddl'],
+                                      lambda: self._fetch_ddl(schema_name, obj_name, obj_type), schema=schema_name)
+        key = (schema_name.upper(), obj_name.upper(), hashlib.sha256(ddl.encode()).hexdigest())
+        definition = self._definitions.get(key)
+        if definition is None:
+            definition = parse_definition(ddl, schema_name)
+            if len(self._definitions) >= CACHE_MAX_ENTRIES:
+                self._definitions.clear()  #old versions of objects, cheap to re-parse if ever needed again
+            self._definitions[key] = definition
+        return definition
+
+    def _fetch_ddl(self, schema_name, obj_name, obj_type):
         if obj_type == 'View':
             df = self.session.sql(f"SELECT GET_DDL('VIEW', '{schema_name}.{obj_name}')").collect()
-            
-
         elif obj_type == 'Dynamic Table':
             df = self.session.sql(f"SELECT GET_DDL('TABLE', '{schema_name}.{obj_name}')").collect()
-            
-
-        ddl = df[0][0]  # Extract the DDL string
-
-        # Find the SELECT statement part
-        select_start = ddl.upper().find('SELECT')
-        from_start = ddl.upper().find('FROM', select_start)
-
-        if select_start != -1 and from_start != -1:
-            # Extract the column definitions between SELECT and FROM
-            select_clause = ddl[select_start + 6:from_start].strip()
+        return df[0][0]  # Extract the DDL string
 
-            # Split by comma (handling potential commas in functions)
-            columns = []
-            paren_depth = 0
-            current_col = []
-
-            # If we just split by commas, LEFT(KEK,2) would be incorrectly split into LEFT(KEK and 2)
-            # At this point I understand this, but tomorrow i'll need AI again
-            for char in select_clause:
-                if char == '(':
-                    paren_depth += 1
-                elif char == ')':
-                    paren_depth -= 1
-                elif char == ',' and paren_depth == 0:
-                    columns.append(''.join(current_col).strip())
-                    current_col = []
-                    continue
-                current_col.append(char)
-
-            # Add the last column
-            if current_col:
-                columns.append(''.join(current_col).strip())
-
-            # Parse columns with transformations into different variables to be able to re-use them.
-            results = []
-            for col in columns:
-                col_upper = col.upper()
-                if ' AS ' in col_upper and '::' in col:
-                    # Find the AS keyword position
-                    as_pos = col_upper.rfind(' AS ')
-                    alias = col[as_pos + 4:].strip()
-
-                    # Everything before AS
-                    before_as = col[:as_pos].strip()
-
-                    # Find the :: to split transformation and type
-                    type_pos = before_as.rfind('::')
-                    transformation = before_as[:type_pos].strip()
-                    data_type = before_as[type_pos + 2:].strip()
-
-                    results.append({
-                        'alias': alias,
-                        'type': data_type,
-                        'transformation': transformation
-                    })
-
-            return results
-
-        return []
+    #simple DESC command not enough to get the transforms like LEFT(ID,2)
+    def get_transform(self, schema_name, obj_name, obj_type):
+        return copy.deepcopy(self.get_object_definition(schema_name, obj_name, obj_type).columns)
         
     #Helper method for transform, to be able to get the transformation based on the "alias"
+    #Prefer get_object_definition(...).transform_by_alias() in loops, that skips the lookup of the definition
     def get_transform_by_alias(self, schema_name, obj_name, obj_type, alias):
-        transformations = self.get_transform(schema_name, obj_name, obj_type)
-     
-        for tf in transformations:
-            if tf['alias'].upper() == alias.upper():
-                return tf['transformation'].upper()
-     
-        return None  #or return {'alias': alias, 'type': None, 'transformation': None}
-    
+        return self.get_object_definition(schema_name, obj_name, obj_type).transform_by_alias(alias)
 
     # Returns the source details (tables and joins) from the DDL
     def get_source_details(self, schema_name, obj_name, obj_type):
-        if obj_type == 'View':
-            df = self.session.sql(f"SELECT GET_DDL('VIEW', '{schema_name}.{obj_name}')").collect()
-        elif obj_type == 'Dynamic Table':
-            df = self.session.sql(f"SELECT GET_DDL('TABLE', '{schema_name}.{obj_name}')").collect()
-        
-        ddl = df[0][0]
-        
-        # 1. Extract the FROM clause
-        # We need to find the FROM that is part of the main SELECT, not a subquery
-        # Simple heuristic: It's after the column definitions which are after "AS SELECT" or just "AS"
-        
-        # Setup defaults
-        source_tables = []
-        joins = []
-        
-        # Find FROM
-        # This is a bit brittle with simple string manipulation, but sufficient for the generated DDLs
-        # We assume the DDL structure is relatively standard as generated by this tool
-        
-        from_pos = ddl.upper().find('FROM')
-        if from_pos == -1:
-            return source_tables, joins
-            
-        # Get everything after FROM until the end or WHERE/GROUP BY/etc if we supported them (we don't currently)
-        # The tool currently only generates FROM ... JOIN ...
-        # Stop at semicolon
-        clause = ddl[from_pos+4:].split(';')[0].strip()
-        
-        # Split by newlines to separate joins usually
-        # But DDL might be one line. 
-        # Let's try to split by known keywords "LEFT JOIN", "INNER JOIN", etc.
-        # OR simply split by "JOIN" and reconstruct
-        
-        # Better approach for this specific tool's generation:
-        # The tool generates: FROM schema.table alias \n LEFT JOIN schema.table alias ON condition
-        
-        # normalization
-        clause = clause.replace('\n', ' ').replace('\t', ' ')
-        
-        # We can split by 'JOIN' but need to preserve the type (LEFT, INNER, etc)
-        # Let's look for " JOIN "
-        
-        # Actually, let's just parse the first part as base table
-        # Then look for joins
-        
-        # Identify start of next join
-        join_types = ["LEFT JOIN", "INNER JOIN", "RIGHT JOIN", "FULL OUTER JOIN", "JOIN"]
-        
-        # We need to tokenize or split carefully. 
-        # Simple parser loop:
-        
-        parts = []
-        current_part = ""
-        words = clause.split()
-        
-        # This implementation assumes the standard format generated by the tool
-        # Example: DB.SCHEMA.TABLE T1 LEFT JOIN DB.SCHEMA.TABLE T2 ON T1.ID = T2.ID
-        
-        # 1. Get Base Table
-        # The first token is likely Schema.Table. The second is Alias.
-        # But checks for JOIN keywords
-        
-        # Let's use a regex approach for robustness if possible, or simple state machine
-        import re
-        
-        # Match base table:  database.schema.table alias   OR   schema.table alias
-        # We expect:  SourceTable [Alias]  (JoinType JoinTable [Alias] ON Condition)*
-        
-        # Let's try to get the raw textual parts
-        
-        # Split by join keywords to separate chunks
-        # We replace join keywords with a delimiter
-        temp_clause = clause
-        for jt in join_types:
-            temp_clause = re.sub(f"(?i){jt}", f"<JOIN_MARKER>{jt}", temp_clause)
-            
-        segments = temp_clause.split('<JOIN_MARKER>')
-        
-        # Segment 0 is the base table definition
-        base_def = segments[0].strip()
-        base_parts = base_def.split()
-        
-        # base_parts[0] should be schema.table (or db.schema.table)
-        # base_parts[1] should be alias (optional but usually present in our tool)
-        
-        base_obj_path = base_parts[0]
-        base_alias = base_parts[1] if len(base_parts) > 1 else f"T1" 
-        
-        # Parse schema/table from path
-        if '.' in base_obj_path:
-             path_parts = base_obj_path.split('.')
-             if len(path_parts) == 3:
-                 b_schema = path_parts[1]
-                 b_table = path_parts[2]
-             elif len(path_parts) == 2:
-                 b_schema = path_parts[0]
-                 b_table = path_parts[1]
-             else:
-                 b_schema = schema_name # fallback
-                 b_table = base_obj_path
-        else:
-             b_schema = schema_name
-             b_table = base_obj_path
-             
-        source_tables.append({
-            'schema': b_schema,
-            'table': b_table,
-            'alias': base_alias
-        })
-        
-        # Process Joins
-        for seg in segments[1:]:
-            seg = seg.strip()
-            # seg looks like: "LEFT JOIN schema.table alias ON condition"
-            # distinct join type
-            
-            # Find the ON keyword
-            on_match = re.search(r"(?i)\s+ON\s+", seg)
-            if not on_match:
-                continue
-                
-            on_start = on_match.start()
-            on_end = on_match.end()
-            
-            pre_on = seg[:on_start].strip() # "LEFT JOIN schema.table alias"
-            on_condition = seg[on_end:].strip() # "T1.ID = T2.ID"
-            
-            # Parse pre_on to get Join Type and Table/Alias
-            # pre_on words: "LEFT", "JOIN", "schema.table", "alias"
-            pre_parts = pre_on.split()
-            
-            # Join type is definitely at the start
-            # We know it ends with "JOIN"
-            join_keyword_idx = -1
-            for i, word in enumerate(pre_parts):
-                if word.upper() == 'JOIN':
-                     join_keyword_idx = i
-                     break
-            
-            if join_keyword_idx != -1:
-                join_type = " ".join(pre_parts[:join_keyword_idx+1])
-                table_def_parts = pre_parts[join_keyword_idx+1:]
-                
-                t_obj_path = table_def_parts[0]
-                t_alias = table_def_parts[1] if len(table_def_parts) > 1 else f"T{len(source_tables)+1}"
-                
-                # Parse schema/table
-                if '.' in t_obj_path:
-                     path_parts = t_obj_path.split('.')
-                     if len(path_parts) == 3:
-                         t_schema = path_parts[1]
-                         t_table = path_parts[2]
-                     elif len(path_parts) == 2:
-                         t_schema = path_parts[0]
-                         t_table = path_parts[1]
-                     else:
-                         t_schema = schema_name
-                         t_table = t_obj_path
-                else:
-                     t_schema = schema_name
-                     t_table = t_obj_path
-                
-                source_tables.append({
-                    'schema': t_schema,
-                    'table': t_table,
-                    'alias': t_alias
-                })
-                
-                joins.append({
-                    'join_type': join_type.upper(),
-                    'right_alias': t_alias,
-                    'on_condition': on_condition
-                })
-
-        return source_tables, joins
-        
-
-
+        definition = self.get_object_definition(schema_name, obj_name, obj_type)
+        #copies -> the builder keeps these lists in session_state and appends to them
+        return copy.deepcopy(definition.source_tables), copy.deepcopy(definition.joins)
 
     def get_dynamic_table_config(self, schema_name,obj_name):
-        df = self.session.sql(f"SELECT GET_DDL('TABLE', '{schema_name}.{obj_name}')").collect()
-        ddl = df[0][0] #have to get the "body" part
-
-        #Find target_lag
-        target_lag = None
-        target_lag_pos = ddl.upper().find('TARGET_LAG')
-        if target_lag_pos != -1:
-            #Find the opening quote after target_lag =
-            quote_start = ddl.find("'", target_lag_pos)
-            if quote_start != -1:
-                #Find the closing quote
-                quote_end = ddl.find("'", quote_start + 1)
-                if quote_end != -1:
-                    target_lag = ddl[quote_start + 1:quote_end]
-
-        #Find warehouse
-        warehouse = None
-        warehouse_pos = ddl.upper().find('WAREHOUSE')
-        if warehouse_pos != -1:
-            #Find the = sign after warehouse
-            equals_pos = ddl.find('=', warehouse_pos)
-            if equals_pos != -1:
-                #et everything after = and extract the warehouse name
-                after_equals = ddl[equals_pos + 1:].strip()
-                #Split by whitespace and take the first word
-                warehouse = after_equals.split()[0].strip()
-
-        return warehouse, target_lag
+        definition = self.get_object_definition(schema_name, obj_name, 'Dynamic Table')
+        return definition.warehouse, definition.target_lag
+
+#Synthetic catalog for offline dev and scale tests: same class as the real provider, only the _fetch_* methods
+#(the Snowflake round trips) are replaced, so caching, search, DDL parsing... run exactly like against Snowflake
+#Everything is generated lazily and deterministically from (seed, schema, object): the same settings give the same catalog,
+#50 schemas x 10k objects x 500 columns costs nothing until a page asks for it
+#latency_ms: sleep per simulated query, to see how a page behaves with real round trips
+_MOCK_LAYERS = ["BRONZE", "SILVER", "GOLD", "STAGING", "MART"]
+_MOCK_DOMAINS = ["SALES", "FINANCE", "HR", "MARKETING", "SUPPLY", "PRODUCT", "CUSTOMER", "WEB", "IOT", "BILLING"]
+_MOCK_NOUNS = ["ORDERS", "CUSTOMERS", "EVENTS", "PAYMENTS", "INVOICES", "SESSIONS", "PRODUCTS", "SHIPMENTS", "ACCOUNTS", "LOGS"]
+#column name word -> type
+_MOCK_COLUMNS = {
+    "ID": "NUMBER(38,0)", "AMOUNT": "NUMBER(18,2)", "NAME": "VARCHAR(16777216)", "STATUS": "VARCHAR(50)",
+    "CREATED_AT": "TIMESTAMP_NTZ(9)", "UPDATED_AT": "TIMESTAMP_NTZ(9)", "CODE": "VARCHAR(10)", "QTY": "NUMBER(38,0)",
+    "PRICE": "FLOAT", "IS_ACTIVE": "BOOLEAN", "EVENT_DATE": "DATE", "PAYLOAD": "VARIANT",
+}
+_MOCK_LAGS = ["1 minute", "5 minutes", "1 hour", "DOWNSTREAM"]
+_MOCK_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class MockDataProvider(RealDataProvider):
+
+    def __init__(self, schemas=5, objects_per_schema=200, columns=30, latency_ms=0, seed=0):
+        self.schema_count = int(schemas)
+        self.objects_per_schema = int(objects_per_schema)
+        self.max_columns = max(2, int(columns))
+        self.latency = float(latency_ms) / 1000
+        self.seed = seed
+        self._objects = {}  #SCHEMA -> {NAME: kind}, generated on first use
+        self._specs = {}  #(SCHEMA, NAME) -> model of the object
+        self._lock = threading.Lock()
+        super().__init__()
+
+    #No Snowflake behind this provider
+    def _connect(self):
+        return None
+
+    #1 simulated query
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def schema_names(self):
+        names = []
+        for i in range(self.schema_count):
+            layer, domain = _MOCK_LAYERS[i % len(_MOCK_LAYERS)], _MOCK_DOMAINS[i // len(_MOCK_LAYERS) % len(_MOCK_DOMAINS)]
+            round_number = i // (len(_MOCK_LAYERS) * len(_MOCK_DOMAINS))
+            names.append(f"{layer}_{domain}" + (f"_{round_number + 1}" if round_number else ""))
+        return names
+
+    #NAME -> kind of every object of a schema: 60% tables, 30% views, 10% dynamic tables
+    def _schema_objects(self, schema_name):
+        schema_key = schema_name.upper()
+        with self._lock:
+            objects = self._objects.get(schema_key)
+            if objects is None:
+                objects = {}
+                if schema_key in self.schema_names():
+                    rnd = random.Random(f"{self.seed}:{schema_key}")
+                    for i in range(self.objects_per_schema):
+                        kind = TABLE if i % 10 < 6 else VIEW if i % 10 < 9 else DYNAMIC_TABLE
+                        prefix = {TABLE: "", VIEW: "V_", DYNAMIC_TABLE: "DT_"}[kind]
+                        objects[f"{prefix}{rnd.choice(_MOCK_NOUNS)}_{i:05d}"] = kind
+                self._objects[schema_key] = objects
+            return objects
+
+    #Table / View / DynamicTable model of an object (None if it doesn't exist), the columns and GET_DDL come from it
+    def _spec(self, schema_name, obj_name):
+        key = (schema_name.upper(), obj_name.upper())
+        spec = self._specs.get(key)
+        if spec is not None:
+            return spec
+        kind = self._schema_objects(key[0]).get(key[1])
+        if kind is None:
+            return None
+        rnd = random.Random(f"{self.seed}:{key[0]}:{key[1]}")
+        if kind == TABLE:
+            words = list(_MOCK_COLUMNS)
+            columns = [Column("ID", _MOCK_COLUMNS["ID"], False)]
+            for i in range(1, rnd.randint(self.max_columns // 2, self.max_columns)):
+                word = rnd.choice(words[1:])
+                columns.append(Column(f"{word}_{i}", _MOCK_COLUMNS[word], rnd.random() < 0.8))
+            spec = Table(key[0], key[1], tuple(columns))
+        else:
+            #reads 1 table of the same schema, sometimes joined with a 2nd one on ID
+            tables = [name for name, obj_kind in self._schema_objects(key[0]).items() if obj_kind == TABLE]
+            if not tables:
+                return None
+            source_tables = [{'schema': key[0], 'table': rnd.choice(tables), 'alias': 'T1'}]
+            joins = []
+            if rnd.random() < 0.3:
+                source_tables.append({'schema': key[0], 'table': rnd.choice(tables), 'alias': 'T2'})
+                joins.append({'join_type': rnd.choice(["LEFT JOIN", "INNER JOIN"]), 'right_alias': 'T2', 'on_condition': 'T1.ID = T2.ID'})
+            columns = []
+            for src in source_tables:
+                for col in self._spec(key[0], src['table']).columns:
+                    if len(columns) >= self.max_columns:
+                        break
+                    if src['alias'] == 'T2' and col.name == "ID":
+                        continue  #the join key is already there
+                    name = col.name if src['alias'] == 'T1' else f"T2_{col.name}"
+                    expression = f"{src['alias']}.{col.name}"
+                    if col.data_type.startswith("VARCHAR") and rnd.random() < 0.2:
+                        expression = f"UPPER({expression})"
+                    columns.append(Column(name, col.data_type, True, expression))
+            source_object = compile_from_clause(source_tables, joins)
+            if kind == VIEW:
+                spec = View(key[0], key[1], tuple(columns), source_object)
+            else:
+                spec = DynamicTable(key[0], key[1], tuple(columns), source_object, "MOCK_WH", rnd.choice(_MOCK_LAGS))
+        with self._lock:
+            self._specs[key] = spec
+        return spec
+
+    def _fetch_schemas(self, db_name):
+        self._wait()
+        return self.schema_names()
+
+    def _fetch_object_index(self, schema_name):
+        self._wait()
+        index = ObjectIndex(schema_name)
+        for i, (name, kind) in enumerate(self._schema_objects(schema_name).items()):
+            index.upsert(name, kind, _MOCK_EPOCH + datetime.timedelta(minutes=i))
+        return index
+
+    #Same tuples as DESCRIBE: (name, type, 'Y' / 'N')
+    def _fetch_columns(self, schema_name, obj_name, obj_type, session=None):
+        self._wait()
+        spec = self._spec(schema_name, obj_name)
+        if spec is None:
+            return []
+        return [(col.name, col.data_type, 'Y' if col.nullable else 'N') for col in spec.columns]
+
+    #1 simulated query per schema, run in parallel like the real one
+    def _fetch_columns_bulk(self, objects):
+        by_schema = {}
+        for obj in objects:
+            by_schema.setdefault(obj['schema'].upper(), set()).add(obj['table'].upper())
+
+        def fetch_schema(schema_name):
+            self._wait()
+            found = {}
+            for obj_name in by_schema[schema_name]:
+                spec = self._spec(schema_name, obj_name)
+                if spec is not None:
+                    found[(schema_name, obj_name)] = [(col.name, col.data_type, 'Y' if col.nullable else 'N') for col in spec.columns]
+            return found
+
+        found = {}
+        for part in _run_parallel(fetch_schema, list(by_schema)):
+            found.update(part)
+        return found
+
+    def _fetch_ddl(self, schema_name, obj_name, obj_type):
+        self._wait()
+        spec = self._spec(schema_name, obj_name)
+        if spec is None:
+            raise ValueError(f"Object '{schema_name}.{obj_name}' does not exist.")
+        return spec.create_ddl()
+
+    #The synthetic catalog never changes, drop the cache so the next page load goes through the _fetch_* methods again
+    def refresh_catalog(self):
+        self.invalidate()
+
 
 # Factory function to get the provider
+# cache_resource -> every page/component shares the same provider (and catalog cache) in this process
+#[igloo] data_provider = "mock" -> synthetic catalog (MockDataProvider), sized by the mock_* settings
+@st.cache_resource
 def get_data_provider():
-    #if local -> use Mock, if Server -> use Real
-    return RealDataProvider()
-    #return MockDataProvider()
\ No newline at end of file
+    settings = get_igloo_settings()
+    if settings.get("data_provider") == "mock":
+        return MockDataProvider(schemas=settings.get("mock_schemas", 5),
+                                objects_per_schema=settings.get("mock_objects_per_schema", 200),
+                                columns=settings.get("mock_columns", 30),
+                                latency_ms=settings.get("mock_latency_ms", 0),
+                                seed=settings.get("mock_seed", 0))
+    return RealDataProvider(snapshot_path=settings.get("catalog_snapshot_path"))
@@ -0,0 +1,72 @@
+import pandas as pd
+from models.column import Column
+
+#Turns the st.data_editor result into Column records + the FROM clause, shared by every editor
+#Works on whole columns at once instead of iterrows() (that boxes every row into a Series, slow on 800+ column tables)
+
+#Values meaning "NOT NULL": False from the checkbox, 'N' from DESCRIBE TABLE, 'NO' from INFORMATION_SCHEMA
+_NOT_NULL_VALUES = [False, 'N', 'NO', 'False']
+
+
+#Text column with empty cells ('' / None / NaN, eg. a new row the user didn't fill) as ''
+def _text(df, column):
+    if column not in df:
+        return pd.Series('', index=df.index)
+    return df[column].fillna('').astype(str)
+
+
+#Table columns -> (Column('ID', 'NUMBER', nullable=False), Column('NAME', 'VARCHAR'), ...)
+#name_column: 'col_nm' on the create page, 'src_col_nm' on the modify page, rows without a name are skipped
+def compile_table_columns(editor_result, name_column):
+    if editor_result.empty or name_column not in editor_result:
+        return ()
+    names = _text(editor_result, name_column)
+    keep = names != ''
+    if 'nullable' in editor_result:
+        nullable = ~editor_result['nullable'].isin(_NOT_NULL_VALUES)
+    else:
+        nullable = pd.Series(True, index=editor_result.index)
+
+    return tuple(map(Column, names[keep].tolist(), _text(editor_result, 'data_type')[keep].tolist(), nullable[keep].tolist()))
+
+
+#View / dynamic table columns -> (Column('USER_ID', 'NUMBER', expression='T1.ID'), ...)
+#A row without transformation selects its source column
+def compile_select_columns(editor_result):
+    if editor_result.empty or 'src_col_nm' not in editor_result:
+        return ()
+    sources = _text(editor_result, 'src_col_nm')
+    keep = sources != ''
+    transformations = _text(editor_result, 'transformation')
+    new_names = _text(editor_result, 'new_col_nm')
+
+    rules = transformations.where(transformations != '', sources)
+    #a transformation that is just the new name means "keep the source column"
+    expressions = rules.where(rules != new_names, sources)
+    names = new_names[keep].tolist()
+    return tuple(map(Column, names, _text(editor_result, 'data_type')[keep].tolist(), [True] * len(names),
+                     expressions[keep].tolist()))
+
+
+#Editor row (position in editor_result, from 0) of every column compile_select_columns keeps: blank rows are skipped there,
+#so obj.columns[i] is shown on row select_column_rows(...)[i] of the editor
+def select_column_rows(editor_result):
+    if editor_result.empty or 'src_col_nm' not in editor_result:
+        return []
+    return [row for row, kept in enumerate((_text(editor_result, 'src_col_nm') != '').tolist()) if kept]
+
+
+#source_tables[0] is the base, every join adds its table by alias -> "S.T T1\nLEFT JOIN S.T2 T2 ON T1.ID = T2.ID"
+#"" if there are no sources (the modify pages keep the deployed FROM clause then)
+def compile_from_clause(source_tables, joins):
+    if not source_tables:
+        return ""
+    base_tbl = source_tables[0]
+    from_clause = f"{base_tbl['schema']}.{base_tbl['table']} {base_tbl['alias']}"
+    tables_by_alias = {tbl['alias']: tbl for tbl in reversed(source_tables)}  #reversed: the first table wins on a duplicate alias
+    for join in joins:
+        # join = {'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': 'T1.ID = T2.ID'}
+        right_tbl_def = tables_by_alias.get(join['right_alias'])
+        if right_tbl_def:
+            from_clause += f"\n{join['join_type']} {right_tbl_def['schema']}.{right_tbl_def['table']} {right_tbl_def['alias']} ON {join['on_condition']}"
+    return from_clause
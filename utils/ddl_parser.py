@@ -0,0 +1,389 @@
+import re
+from collections import namedtuple
+
+#1 regex, 1 pass over the DDL: string literals, quoted identifiers and comments are single tokens,
+#so commas/keywords inside them can't confuse the parser
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+      (?P<word>[^\W\d][\w$]*)
+    | (?P<comment>--[^\n]*|//[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.|'')*')
+    | (?P<dollar>\$\$.*?\$\$)
+    | (?P<quoted>"(?:[^"]|"")*")
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    | (?P<op>::|<=|>=|<>|!=|\|\||=>|\S)
+    )
+""", re.S | re.X)
+
+Token = namedtuple('Token', ['kind', 'text', 'upper', 'start', 'end'])
+
+#Words that end a FROM item (so they are never taken as a table alias)
+_FROM_KEYWORDS = {
+    'JOIN', 'LEFT', 'RIGHT', 'FULL', 'INNER', 'OUTER', 'CROSS', 'NATURAL', 'ON', 'USING',
+    'WHERE', 'GROUP', 'HAVING', 'QUALIFY', 'ORDER', 'LIMIT', 'UNION', 'EXCEPT', 'MINUS', 'INTERSECT',
+    'WINDOW', 'LATERAL', 'SAMPLE', 'TABLESAMPLE', 'AT', 'BEFORE', 'CHANGES', 'PIVOT', 'UNPIVOT', 'MATCH_RECOGNIZE',
+}
+_JOIN_WORDS = {'LEFT', 'RIGHT', 'FULL', 'INNER', 'OUTER', 'CROSS', 'NATURAL', 'JOIN'}
+#Clauses after FROM ... JOIN, Igloo doesn't read them back (they stay in source_object)
+_CLAUSE_END = {'WHERE', 'GROUP', 'HAVING', 'QUALIFY', 'ORDER', 'LIMIT', 'UNION', 'EXCEPT', 'MINUS', 'INTERSECT', 'WINDOW'}
+
+
+def tokenize(sql):
+    tokens = []
+    append = tokens.append
+    new_token = Token._make
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if kind is None or kind == 'comment':  #trailing whitespace / comment
+            continue
+        text = match.group(kind)
+        append(new_token((kind, text, text.upper() if kind == 'word' else text, match.start(kind), match.end(kind))))
+    return tokens
+
+
+#Split a script into statements on the ; tokens (a ; inside a string or comment doesn't count)
+#Only looks for the ; -> runs the regex without building Token objects (GET_DDL of a whole schema can be megabytes)
+def split_statements(sql):
+    statements = []
+    start = 0
+    for match in _TOKEN_RE.finditer(sql):
+        if match.lastgroup == 'op' and match.group('op') == ';':
+            statement = sql[start:match.start('op')].strip()
+            if statement:
+                statements.append(statement)
+            start = match.end('op')
+    statement = sql[start:].strip()
+    if statement and any(match.lastgroup not in (None, 'comment') for match in _TOKEN_RE.finditer(statement)):
+        statements.append(statement)  #skip a trailing comment-only part
+    return statements
+
+
+#Token texts of a query without whitespace/comments, keywords and unquoted names uppercased:
+#2 queries with the same fingerprint are the same query, however they are formatted
+def query_fingerprint(sql):
+    return fingerprint_tokens(tokenize(sql))
+
+
+#Same on tokens already at hand. An alias repeating the column name in the main SELECT list is left out:
+#"T1.ID::NUMBER AS ID" and "T1.ID::NUMBER" select the same column
+def fingerprint_tokens(tokens):
+    tokens = [token for token in tokens if token.text != ';']
+    start = next((pos + 1 for pos, token in enumerate(tokens) if token.upper == 'SELECT'), None)
+    if start is None:
+        return tuple(token.upper for token in tokens)
+    texts = [token.upper for token in tokens[:start]]
+    item = []
+    depth = 0
+    for pos in range(start, len(tokens)):
+        token = tokens[pos]
+        if depth == 0 and token.upper in ('FROM', ','):
+            texts += _without_same_name_alias(item)
+            item = []
+            if token.upper == 'FROM':
+                return tuple(texts + [t.upper for t in tokens[pos:]])
+            texts.append(',')
+            continue
+        if token.text == '(' or token.upper == 'CASE':
+            depth += 1
+        elif token.text == ')' or token.upper == 'END':
+            depth -= 1
+        item.append(token)
+    return tuple(texts + _without_same_name_alias(item))
+
+
+#1 select item -> its token texts, without "AS X" if the item is [T1.]X[::type]
+def _without_same_name_alias(item):
+    texts = [token.upper for token in item]
+    if len(item) < 3 or item[-2].upper != 'AS':
+        return texts
+    expression = item[:-2]
+    depth = 0
+    for pos, token in enumerate(expression):
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+        elif token.text == '::' and depth == 0:
+            expression = expression[:pos]
+            break
+    is_column = len(expression) % 2 == 1 and all(token.kind in ('word', 'quoted') if i % 2 == 0 else token.text == '.'
+                                                for i, token in enumerate(expression))
+    if is_column and expression[-1].upper == item[-1].upper:
+        return texts[:-2]
+    return texts
+
+
+#Everything Igloo reads back from a GET_DDL result, parsed in one go
+#Build it with parse_definition(), the provider caches it so the DDL is fetched and parsed only once per object version
+class ObjectDefinition:
+
+    def __init__(self, ddl, columns, source_tables, joins, source_object, options, query):
+        self.ddl = ddl
+        self.columns = columns  #[{'alias': 'ID', 'type': 'NUMBER', 'transformation': 'T1.ID'}, ...]
+        self.source_tables = source_tables  #[{'schema': 'S', 'table': 'T', 'alias': 'T1'}, ...]
+        self.joins = joins  #[{'join_type': 'LEFT JOIN', 'right_alias': 'T2', 'on_condition': 'T1.ID = T2.ID'}, ...]
+        self.source_object = source_object  #the raw FROM clause, eg. "S.T T1 LEFT JOIN S.T2 T2 ON T1.ID = T2.ID"
+        self.options = options  #KEY = value pairs before AS SELECT, eg. {'TARGET_LAG': '1 minute', 'WAREHOUSE': 'COMPUTE_WH'}
+        self.query = query  #the SELECT ... FROM ... part
+        self.warehouse = options.get('WAREHOUSE')
+        self.target_lag = options.get('TARGET_LAG')
+        self.refresh_mode = options.get('REFRESH_MODE')
+        self.initialize = options.get('INITIALIZE')
+        #alias -> transformation, so per-column lookups don't loop over every column again
+        self._transform_by_alias = {col['alias'].upper(): col['transformation'] for col in columns}
+
+    #Get the transformation based on the "alias" (output column name)
+    def transform_by_alias(self, alias):
+        transformation = self._transform_by_alias.get(alias.upper())
+        return transformation.upper() if transformation is not None else None
+
+
+def parse_definition(ddl, schema_name):
+    return _Parser(ddl, schema_name).parse()
+
+
+#Small recursive-descent parser for the DDL subset Igloo writes and reads back:
+#CREATE ... [(cols)] [KEY = value ...] AS SELECT expr::type AS alias, ... FROM table alias [JOIN table alias ON cond]...
+#Every token is visited a constant number of times -> linear in the DDL size
+class _Parser:
+
+    def __init__(self, ddl, schema_name):
+        self.ddl = ddl
+        self.schema_name = schema_name
+        self.tokens = tokenize(ddl)
+        self.pos = 0
+
+    def peek(self, offset=0):
+        pos = self.pos + offset
+        return self.tokens[pos] if pos < len(self.tokens) else None
+
+    def at(self, *words):
+        token = self.peek()
+        return token is not None and token.upper in words
+
+    def at_end(self):
+        token = self.peek()
+        return token is None or token.text == ';'
+
+    #Skip a ( ... ) group (self.pos is on the opening paren)
+    def skip_group(self):
+        depth = 0
+        while self.peek() is not None:
+            text = self.next().text
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def text(self, first, last):
+        return self.ddl[first.start:last.end]
+
+    def parse(self):
+        options = self.parse_header()
+        query = ""
+        columns, source_tables, joins, source_object = [], [], [], ""
+        if self.at('SELECT'):
+            select_token = self.next()
+            if self.at('DISTINCT', 'ALL'):
+                self.next()
+            columns = self.parse_select_list()
+            if self.at('FROM'):
+                self.next()
+                source_object = self.remaining_text()
+                source_tables, joins = self.parse_from()
+            query = self.ddl[select_token.start:self.statement_end()].strip()
+        return ObjectDefinition(
+            ddl=self.ddl,
+            columns=columns,
+            source_tables=source_tables,
+            joins=joins,
+            source_object=source_object,
+            options=options,
+            query=query)
+
+    #Everything before the main SELECT: collect KEY = value options (TARGET_LAG, WAREHOUSE, ...), skip the rest
+    def parse_header(self):
+        options = {}
+        while not self.at_end() and not self.at('SELECT'):
+            token = self.peek()
+            if token.text == '(':
+                self.skip_group()  #column list or a CTE body
+                continue
+            following, value = self.peek(1), self.peek(2)
+            if token.kind == 'word' and following is not None and following.text == '=' and value is not None:
+                options[token.upper] = value.text[1:-1].replace("''", "'") if value.kind == 'string' else value.text
+                self.pos += 3
+                continue
+            self.next()
+        return options
+
+    def statement_end(self):
+        for token in self.tokens[self.pos:]:
+            if token.text == ';':
+                return token.start
+        return len(self.ddl)
+
+    def remaining_text(self):
+        token = self.peek()
+        return self.ddl[token.start:self.statement_end()].strip() if token else ""
+
+    #SELECT list until FROM: items are split on commas outside of ( ) and CASE ... END
+    #(hot loop on wide tables -> walks the token list directly instead of peek()/next())
+    def parse_select_list(self):
+        columns = []
+        item = []
+        depth = 0
+        tokens = self.tokens
+        pos = self.pos
+        while pos < len(tokens):
+            token = tokens[pos]
+            upper = token.upper
+            if upper == ';' or (depth == 0 and upper == 'FROM'):
+                break
+            pos += 1
+            if upper == '(' or upper == 'CASE':
+                depth += 1
+            elif upper == ')' or upper == 'END':
+                depth -= 1
+            elif upper == ',' and depth == 0:
+                self.add_column(columns, item)
+                item = []
+                continue
+            item.append(token)
+        self.pos = pos
+        self.add_column(columns, item)
+        return columns
+
+    #1 select item -> {'alias', 'type', 'transformation'}, only expr::type [AS alias] items are read back
+    def add_column(self, columns, item):
+        if not item:
+            return
+        alias = None
+        if len(item) >= 3 and item[-2].upper == 'AS':
+            alias = item[-1].text
+            item = item[:-2]
+
+        #last :: outside of parentheses separates the transformation from the type
+        depth = 0
+        cast_pos = -1
+        for i, token in enumerate(item):
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                depth -= 1
+            elif token.text == '::' and depth == 0:
+                cast_pos = i
+        if cast_pos <= 0 or cast_pos == len(item) - 1:
+            return
+
+        expression = item[:cast_pos]
+        if alias is None:
+            #T1.ID::NUMBER -> the column keeps its name (ID)
+            if len(expression) % 2 == 1 and all(token.kind in ('word', 'quoted') if i % 2 == 0 else token.text == '.'
+                                                for i, token in enumerate(expression)):
+                alias = expression[-1].text
+            else:
+                return
+        columns.append({
+            'alias': alias,
+            'type': self.text(item[cast_pos + 1], item[-1]),
+            'transformation': self.text(expression[0], expression[-1])
+        })
+
+    #FROM table [alias] { [LEFT|INNER|...] JOIN table [alias] ON condition }
+    def parse_from(self):
+        source_tables = []
+        joins = []
+        base = self.parse_table_ref(default_alias="T1")
+        if base:
+            source_tables.append(base)
+
+        while not self.at_end() and not self.at(*_CLAUSE_END):
+            if self.at(*_JOIN_WORDS):
+                join_words = []
+                while self.at(*_JOIN_WORDS):
+                    join_words.append(self.next().upper)
+                table = self.parse_table_ref(default_alias=f"T{len(source_tables)+1}")
+                if table is None:
+                    continue
+                on_condition = ""
+                if self.at('ON'):
+                    self.next()
+                    on_condition = self.parse_condition()
+                #the builder can only rebuild joins with an ON condition (no CROSS JOIN / USING)
+                if join_words[-1] == 'JOIN' and on_condition:
+                    source_tables.append(table)
+                    joins.append({
+                        'join_type': " ".join(join_words),
+                        'right_alias': table['alias'],
+                        'on_condition': on_condition
+                    })
+            elif self.peek().text == ',':
+                #old style comma join: keep the source, there is no ON condition to read
+                self.next()
+                table = self.parse_table_ref(default_alias=f"T{len(source_tables)+1}")
+                if table:
+                    source_tables.append(table)
+            elif self.peek().text == '(':
+                self.skip_group()
+            else:
+                self.next()
+        return source_tables, joins
+
+    #schema.table [AS] [alias] -> {'schema', 'table', 'alias'}, None for subqueries/table functions
+    def parse_table_ref(self, default_alias):
+        if self.at_end():
+            return None
+        if self.peek().text == '(':
+            self.skip_group()
+            return None
+        parts = []
+        while self.peek() is not None and self.peek().kind in ('word', 'quoted'):
+            parts.append(self.next().text)
+            if self.peek() is not None and self.peek().text == '.':
+                self.next()
+            else:
+                break
+        if not parts:
+            return None
+        if self.peek() is not None and self.peek().text == '(':
+            self.skip_group()  #TABLE(...) / function call
+            return None
+
+        if len(parts) >= 3:
+            schema, table = parts[-2], parts[-1]
+        elif len(parts) == 2:
+            schema, table = parts
+        else:
+            schema, table = self.schema_name, parts[0]
+
+        if self.at('AS'):
+            self.next()
+        alias = default_alias
+        token = self.peek()
+        if token is not None and (token.kind == 'quoted' or (token.kind == 'word' and token.upper not in _FROM_KEYWORDS)):
+            alias = self.next().text
+        return {'schema': schema, 'table': table, 'alias': alias}
+
+    #ON condition until the next join or the end of the FROM clause
+    def parse_condition(self):
+        first = last = None
+        depth = 0
+        while not self.at_end():
+            token = self.peek()
+            if depth == 0 and (token.upper in _JOIN_WORDS or token.upper in _CLAUSE_END or token.text == ','):
+                break
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                depth -= 1
+            first = first or token
+            last = self.next()
+        return self.text(first, last) if first else ""
@@ -0,0 +1,138 @@
+import time
+import streamlit as st
+from utils.data_provider import get_data_provider
+from utils.ddl_parser import split_statements
+from utils.git_manager import get_git_queue
+
+#Deploys run as async Snowflake queries (collect_nowait): the deploy button returns at once and the
+#user can keep editing, the status panel polls the jobs. The registry lives in st.session_state (1 per browser session)
+
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+
+#Repo path of an object: snowflake_objects/SCHEMA/TYPE/NAME.sql (lowercase)
+def git_path(schema_name, object_type, object_name):
+    return f"snowflake_objects/{schema_name}/{object_type}/{object_name}.sql".lower()
+
+
+#1 script -> 1 query: more statements are wrapped in a Snowflake Scripting block, so the whole deploy runs server side
+#even if nobody polls. None if the script can't be wrapped ($$ inside), its statements are then submitted 1 by 1
+def to_single_query(statements):
+    if len(statements) == 1:
+        return statements[0]
+    if any("$$" in statement for statement in statements):
+        return None
+    body = "\n".join(f"    {statement.rstrip(';')};" for statement in statements)
+    return f"EXECUTE IMMEDIATE $$\nBEGIN\n{body}\nEND;\n$$"
+
+
+class DeployJob:
+
+    #push_git=False: the caller sends the file to git itself
+    def __init__(self, job_id, ddl_sql, schema_name, object_type, object_name, commitmsg, git_content=None, push_git=True):
+        self.job_id = job_id
+        self.ddl_sql = ddl_sql
+        self.schema_name = schema_name
+        self.object_type = object_type
+        self.object_name = object_name
+        self.commitmsg = commitmsg
+        self.git_content = git_content or ddl_sql
+        self.push_git = push_git
+        self.status = RUNNING
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.query_ids = []
+        self.error = None
+        self.result = []
+        self.git_result = None
+        self._pending = []  #queries not submitted yet (only when the script couldn't be wrapped)
+        self._async_job = None
+
+    #Seconds since the submit, frozen when the job finished
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+    def done(self):
+        return self.status != RUNNING
+
+    def start(self, session):
+        self.session = session
+        statements = split_statements(self.ddl_sql)
+        query = to_single_query(statements)
+        self._pending = [query] if query is not None else statements
+        self._submit_next()
+
+    def _submit_next(self):
+        query = self._pending.pop(0)
+        try:
+            self._async_job = self.session.sql(query).collect_nowait()
+            self.query_ids.append(self._async_job.query_id)
+        except NotImplementedError:
+            #no async queries in this environment: run it here, the job is finished when the submit returns
+            self._async_job = None
+            self.result += self.session.sql(query).collect()
+
+    #Check the running query, submit the next one when it's done. Returns True if the job finished in this call
+    def poll(self):
+        if self.done():
+            return False
+        try:
+            if self._async_job is not None:
+                if not self._async_job.is_done():
+                    return False
+                self.result += self._async_job.result()
+            if self._pending:
+                self._submit_next()
+                return False
+        except Exception as e:
+            self._finish(FAILED, error=str(e))
+            return True
+        self._finish(SUCCEEDED)
+        return True
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._async_job = None
+        if status != SUCCEEDED:
+            return
+        #The schema changed -> drop its cached tables/views/columns so the pickers show the new state
+        get_data_provider().invalidate(self.schema_name)
+        if not self.push_git:
+            return
+        #Only push if it is sucesfully deployed to sf. The push itself runs in the background (GitSyncQueue),
+        #the deploy is done as soon as Snowflake confirmed it
+        get_git_queue().enqueue(git_path(self.schema_name, self.object_type, self.object_name), self.git_content, self.commitmsg)
+        self.git_result = "Success! Queued for GitHub."
+
+
+#Jobs of this browser session, newest first
+def get_jobs():
+    if "deploy_jobs" not in st.session_state:
+        st.session_state.deploy_jobs = []
+    return st.session_state.deploy_jobs
+
+
+def submit_deploy(session, ddl_sql, schema_name, object_type, object_name, commitmsg, git_content=None):
+    jobs = get_jobs()
+    job = DeployJob(len(jobs) + 1, ddl_sql, schema_name, object_type, object_name, commitmsg, git_content)
+    jobs.insert(0, job)
+    try:
+        job.start(session)
+    except Exception as e:
+        job._finish(FAILED, error=str(e))
+        return job
+    job.poll()  #fast DDL (most views) is often done already
+    return job
+
+
+#Poll every running job -> list of the jobs that finished now
+def poll_jobs():
+    return [job for job in get_jobs() if job.poll()]
+
+
+def running_jobs():
+    return [job for job in get_jobs() if not job.done()]
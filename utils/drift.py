@@ -0,0 +1,242 @@
+import difflib
+import hashlib
+import time
+from utils.ddl_parser import tokenize, split_statements, fingerprint_tokens
+from utils.table_diff import normalize_type
+from utils.dynamic_table_diff import normalize_lag, normalize_refresh_mode
+from utils.deploy_jobs import git_path
+from utils.git_manager import get_repo_files, get_git_queue
+
+#Compares the deployed objects with the .sql files in the repo: 1 GET_DDL('SCHEMA', ...) query for all the scanned schemas,
+#the script is split per object, every definition is normalized + hashed and compared with the hash of its repo file
+#Normalized = only what Igloo writes (columns + types for tables, the query for views, query + settings for dynamic tables),
+#so formatting, casing and the type spelling GET_DDL uses (NUMBER(38,0) for INT...) don't count as drift
+
+IN_SYNC = "IN_SYNC"
+DRIFTED = "DRIFTED"
+NOT_IN_GIT = "NOT_IN_GIT"  #deployed, but no file in the repo
+NOT_DEPLOYED = "NOT_DEPLOYED"  #file in the repo, no object in Snowflake
+
+#Words naming the type of a CREATE statement, the 1st one found decides it
+_OBJECT_WORDS = {'TABLE', 'VIEW', 'SCHEMA', 'SEQUENCE', 'STAGE', 'FUNCTION', 'PROCEDURE', 'STREAM', 'TASK', 'PIPE',
+                 'FORMAT', 'TAG', 'ALERT', 'POLICY', 'INTEGRATION'}
+#TABLE / VIEW variants Igloo doesn't manage
+_SKIPPED_KINDS = {'MATERIALIZED', 'EXTERNAL', 'EVENT', 'ICEBERG', 'HYBRID'}
+#Column constraints: the type ends where one of them starts
+_COLUMN_WORDS = {'NOT', 'NULL', 'DEFAULT', 'COLLATE', 'COMMENT', 'PRIMARY', 'UNIQUE', 'REFERENCES', 'CONSTRAINT',
+                 'AUTOINCREMENT', 'IDENTITY', 'WITH', 'MASKING', 'TAG', 'FOREIGN'}
+
+
+#CREATE [OR REPLACE] [TRANSIENT|SECURE|DYNAMIC...] TABLE|VIEW [IF NOT EXISTS] db.schema.name ...
+#-> ('Table' / 'View' / 'Dynamic Table', NAME, position after the name), None for anything else
+def object_header(tokens):
+    if not tokens or tokens[0].upper != 'CREATE':
+        return None
+    for pos, token in enumerate(tokens):
+        if token.upper in _OBJECT_WORDS:
+            break
+    else:
+        return None
+    if token.upper not in ('TABLE', 'VIEW'):
+        return None
+    modifiers = {t.upper for t in tokens[1:pos]}
+    if modifiers & _SKIPPED_KINDS:
+        return None
+    object_type = 'Dynamic Table' if 'DYNAMIC' in modifiers else token.upper.title()
+
+    pos += 1
+    while pos < len(tokens) and tokens[pos].upper in ('IF', 'NOT', 'EXISTS'):
+        pos += 1
+    #dotted name, the last part is the object
+    name = None
+    while pos < len(tokens) and tokens[pos].kind in ('word', 'quoted'):
+        token = tokens[pos]
+        name = token.text[1:-1].replace('""', '"') if token.kind == 'quoted' else token.upper
+        pos += 1
+        if pos < len(tokens) and tokens[pos].text == '.':
+            pos += 1
+        else:
+            break
+    if name is None:
+        return None
+    return object_type, name, pos
+
+
+#(name, type, nullable) of every column of the ( ... ) list starting at tokens[pos]
+def _table_columns(ddl, tokens, pos):
+    if pos >= len(tokens) or tokens[pos].text != '(':
+        return ()
+    columns = []
+    items = [[]]
+    depth = 0
+    for token in tokens[pos:]:
+        if token.text == '(':
+            depth += 1
+            if depth == 1:
+                continue
+        elif token.text == ')':
+            depth -= 1
+            if depth == 0:
+                break
+        elif token.text == ',' and depth == 1:
+            items.append([])
+            continue
+        items[-1].append(token)
+
+    for item in items:
+        if len(item) < 2 or item[0].upper in ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN'):
+            continue  #out of line constraint
+        type_end = 1
+        while type_end < len(item) and item[type_end].upper not in _COLUMN_WORDS:
+            type_end += 1
+        name = item[0].text[1:-1] if item[0].kind == 'quoted' else item[0].upper
+        data_type = ddl[item[1].start:item[type_end - 1].end] if type_end > 1 else ""
+        words = [token.upper for token in item[type_end:]]
+        nullable = not any(word == 'NOT' and following == 'NULL' for word, following in zip(words, words[1:]))
+        columns.append((name, normalize_type(data_type), nullable))
+    return tuple(columns)
+
+
+#KEY = value options before the query + fingerprint of the query (from its SELECT on), same rules as parse_definition
+def _query_definition(tokens, pos):
+    options = {}
+    while pos < len(tokens) and tokens[pos].upper != 'SELECT' and tokens[pos].text != ';':
+        token = tokens[pos]
+        if token.text == '(':
+            depth = 0
+            while pos < len(tokens):
+                depth += {'(': 1, ')': -1}.get(tokens[pos].text, 0)
+                pos += 1
+                if depth == 0:
+                    break
+            continue
+        if token.kind == 'word' and pos + 2 < len(tokens) and tokens[pos + 1].text == '=':
+            value = tokens[pos + 2]
+            options[token.upper] = value.text[1:-1].replace("''", "'") if value.kind == 'string' else value.text
+            pos += 3
+            continue
+        pos += 1
+    return options, fingerprint_tokens(tokens[pos:])
+
+
+#1 CREATE statement -> (object type, NAME, normalized definition), None if it isn't a table / view / dynamic table
+#The statement is tokenized once, everything is read from the tokens
+def normalize_definition(ddl):
+    tokens = tokenize(ddl)
+    header = object_header(tokens)
+    if header is None:
+        return None
+    object_type, name, pos = header
+    if object_type == 'Table':
+        return object_type, name, _table_columns(ddl, tokens, pos)
+    options, query = _query_definition(tokens, pos)
+    if object_type == 'Dynamic Table':
+        return object_type, name, (query, normalize_lag(options.get('TARGET_LAG')), (options.get('WAREHOUSE') or "").upper(),
+                                   normalize_refresh_mode(options.get('REFRESH_MODE')))
+    return object_type, name, query
+
+
+#DDL text hash -> (object type, NAME, definition hash): an unchanged object / file isn't tokenized again on the next scan
+_hashes = {}
+_MAX_HASHES = 50000
+
+
+#-> (object type, NAME, definition hash) or None, memoized by the exact text
+def definition_hash(ddl):
+    key = hashlib.sha256(ddl.encode()).digest()
+    cached = _hashes.get(key, False)
+    if cached is not False:
+        return cached
+    normalized = normalize_definition(ddl)
+    result = None
+    if normalized is not None:
+        result = (normalized[0], normalized[1], hashlib.sha256(repr(normalized[2]).encode()).hexdigest()[:12])
+    if len(_hashes) >= _MAX_HASHES:
+        _hashes.clear()
+    _hashes[key] = result
+    return result
+
+
+#1 query for every schema: SELECT GET_DDL('SCHEMA', 'A'), GET_DDL('SCHEMA', 'B'), ... -> {schema: DDL script}
+def fetch_schema_ddl(session, schema_names):
+    if not schema_names:
+        return {}
+    columns = ", ".join("GET_DDL('SCHEMA', '{}')".format(schema.replace("'", "''")) for schema in schema_names)
+    row = session.sql(f"SELECT {columns}").collect()[0]
+    return {schema: row[i] or "" for i, schema in enumerate(schema_names)}
+
+
+#{git path: (object type, NAME, DDL statement, definition hash)} of the tables / views / dynamic tables in a GET_DDL('SCHEMA') script
+def deployed_objects(schema_name, script):
+    objects = {}
+    for statement in split_statements(script):
+        hashed = definition_hash(statement)
+        if hashed is not None:
+            object_type, name, digest = hashed
+            objects[git_path(schema_name, object_type, name)] = (object_type, name, statement, digest)
+    return objects
+
+
+class DriftReport:
+
+    def __init__(self, schemas, rows, deployed, repo_files, seconds):
+        self.schemas = schemas
+        self.rows = rows  #1 dict per object, see compare
+        self.deployed = deployed  #git path -> GET_DDL statement
+        self.repo_files = repo_files  #git path -> file content
+        self.seconds = seconds
+
+    def counts(self):
+        counts = {}
+        for row in self.rows:
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        return counts
+
+    #Unified diff repo file -> deployed DDL of 1 object
+    def diff(self, path):
+        repo = (self.repo_files.get(path) or "").strip().splitlines()
+        deployed = (self.deployed.get(path) or "").strip().splitlines()
+        return "\n".join(difflib.unified_diff(repo, deployed, fromfile=f"git: {path}", tofile="snowflake: GET_DDL", lineterm=""))
+
+
+#scripts: {schema: GET_DDL('SCHEMA') script} (fetch_schema_ddl), repo_files: {path: content} of the repo
+def compare(scripts, repo_files, seconds=0):
+    rows = []
+    deployed_ddl = {}
+    for schema_name, script in scripts.items():
+        prefix = f"snowflake_objects/{schema_name}/".lower()
+        deployed = deployed_objects(schema_name, script)
+        in_repo = {path: content for path, content in repo_files.items() if path.lower().startswith(prefix)}
+
+        for path in sorted(set(deployed) | set(in_repo)):
+            row = {'schema': schema_name, 'object': None, 'type': None, 'status': None,
+                   'snowflake_hash': None, 'git_hash': None, 'path': path}
+            if path in deployed:
+                object_type, name, statement, digest = deployed[path]
+                deployed_ddl[path] = statement
+                row.update(object=name, type=object_type, snowflake_hash=digest)
+            if path in in_repo:
+                hashed = definition_hash(in_repo[path])
+                if hashed is not None:
+                    row['git_hash'] = hashed[2]
+                    row['object'] = row['object'] or hashed[1]
+                    row['type'] = row['type'] or hashed[0]
+            if row['snowflake_hash'] is None:
+                row['status'] = NOT_DEPLOYED
+                row['object'] = row['object'] or path.rsplit("/", 1)[-1][:-len(".sql")].upper()
+            elif path not in in_repo:
+                row['status'] = NOT_IN_GIT
+            else:
+                row['status'] = IN_SYNC if row['snowflake_hash'] == row['git_hash'] else DRIFTED
+            rows.append(row)
+    return DriftReport(list(scripts), rows, deployed_ddl, repo_files, seconds)
+
+
+#Scan the schemas: 1 Snowflake query + 1 read of the repo. Files still waiting in the git queue count as in the repo
+#(they were deployed, only the push is pending)
+def scan_drift(session, schema_names):
+    started = time.perf_counter()
+    scripts = fetch_schema_ddl(session, schema_names)
+    repo_files = get_repo_files()
+    repo_files.update(get_git_queue().pending_files())
+    return compare(scripts, repo_files, time.perf_counter() - started)
@@ -0,0 +1,41 @@
+import re
+from utils.ddl_parser import query_fingerprint
+
+#Decides how a modified dynamic table is deployed:
+#only TARGET_LAG / WAREHOUSE changed -> ALTER DYNAMIC TABLE ... SET (no reinitialization, the data stays)
+#the query changed -> CREATE OR REPLACE (full refresh of the table)
+
+_LAG_RE = re.compile(r"^\s*(\d+)\s*(second|minute|hour|day)s?\s*$", re.I)
+_LAG_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+#'60 seconds', '1 minute' and '1 MINUTES' are the same lag, anything else (DOWNSTREAM) is compared as text
+def normalize_lag(target_lag):
+    text = (target_lag or "").strip()
+    match = _LAG_RE.match(text)
+    if match:
+        return int(match.group(1)) * _LAG_SECONDS[match.group(2).lower()]
+    return text.upper()
+
+
+#REFRESH_MODE not set is AUTO
+def normalize_refresh_mode(refresh_mode):
+    return (refresh_mode or "AUTO").strip().upper()
+
+
+#definition: the deployed ObjectDefinition (provider.get_object_definition), new: the edited DynamicTable
+#-> (statements, recreate)
+#REFRESH_MODE can't be altered, changing it recreates the table too (INITIALIZE only matters when the table is created)
+def plan_dynamic_table_changes(definition, new):
+    if query_fingerprint(definition.query) != query_fingerprint(new.query()):
+        return [new.create_ddl()], True
+    if new.refresh_mode and normalize_refresh_mode(definition.refresh_mode) != normalize_refresh_mode(new.refresh_mode):
+        return [new.create_ddl()], True
+
+    target = f"{new.schema}.{new.name}"
+    statements = []
+    if normalize_lag(definition.target_lag) != normalize_lag(new.target_lag):
+        statements.append(f"ALTER DYNAMIC TABLE {target} SET TARGET_LAG = {new.lag_sql()};")
+    if (definition.warehouse or "").upper() != (new.warehouse or "").upper():
+        statements.append(f"ALTER DYNAMIC TABLE {target} SET WAREHOUSE = {new.warehouse};")
+    return statements, False
@@ -1,38 +1,372 @@
+import os
+import subprocess
+import threading
+import time
 import streamlit as st
-from github import Github
-
-def push_to_github(file_path, file_content, commit_message):
-    try:
-        #Connect
-        token = st.secrets["github"]["token"]
-        repo_name = st.secrets["github"]["repo_name"]
-        branch = st.secrets["github"]["branch"]
-        
-        g = Github(token)
-        repo = g.get_repo(repo_name)
-
-        #Check if file exists to decide: Create or Update?
+from utils.settings import get_igloo_settings
+from utils.sqlite_db import connect
+
+#Files are written with the Git Data API (1 tree with the new file contents + 1 commit + 1 ref update),
+#not with 1 get_contents/update_file commit per file
+#The [github] api_url setting points the client somewhere else than api.github.com (GitHub Enterprise, a local test server)
+#Deploys don't push themselves: they enqueue the file in the GitSyncQueue, a background worker pushes it
+#[igloo] git_backend = "local" swaps the GitHub API for a local clone (git CLI): see LocalGitBackend
+
+DEFAULT_API_URL = "https://api.github.com"
+
+#Retry backoff of the sync worker: 5s, 10s, 20s ... max 10 minutes, the file is marked failed after MAX_ATTEMPTS
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+MAX_ATTEMPTS = 8
+
+#Pending commits must survive a restart (and a temp dir cleanup): the queue lives next to the app config by default
+DEFAULT_QUEUE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".streamlit", "igloo_git_queue.sqlite")
+
+#Seconds between 2 pushes of the local clone, if the [git_local] secrets don't say otherwise
+DEFAULT_PUSH_INTERVAL = 60
+#Max seconds of 1 git command (a push to an unreachable remote would block the sync queue forever otherwise)
+GIT_TIMEOUT = 120
+#git never asks for a password / host key: a missing credential fails the command instead of waiting for a terminal
+_GIT_ENV = {'GIT_TERMINAL_PROMPT': '0', 'GIT_SSH_COMMAND': os.environ.get('GIT_SSH_COMMAND', 'ssh -o BatchMode=yes')}
+
+
+#1 authenticated client + repo per token/repo, reused by every push of the process
+@st.cache_resource(show_spinner=False)
+def _get_repo(token, repo_name, api_url):
+    #PyGithub is only needed when something is deployed, keep it out of the app start
+    from github import Auth, Github
+    return Github(auth=Auth.Token(token), base_url=api_url).get_repo(repo_name)
+
+
+def _github_settings():
+    config = st.secrets["github"]
+    return config["token"], config["repo_name"], config["branch"], config.get("api_url", DEFAULT_API_URL)
+
+
+#Write {path: content} as 1 commit on the branch -> sha of the new commit (None if nothing changed)
+#A branch that moved in the meantime (another push) is re-read and the commit is made again on top of it
+def commit_files(files, commit_message, retries=2):
+    from github import GithubException, InputGitTreeElement
+
+    token, repo_name, branch, api_url = _github_settings()
+    repo = _get_repo(token, repo_name, api_url)
+    elements = [InputGitTreeElement(path, "100644", "blob", content=content) for path, content in sorted(files.items())]
+    for attempt in range(retries + 1):
+        ref = repo.get_git_ref(f"heads/{branch}")
+        parent = repo.get_git_commit(ref.object.sha)
+        tree = repo.create_git_tree(elements, parent.tree)
+        if tree.sha == parent.tree.sha:
+            return None  #same content as on the branch already
+        commit = repo.create_git_commit(commit_message, tree, [parent])
         try:
-            contents = repo.get_contents(file_path, ref=branch)
-            # UPDATE existing file
-            repo.update_file(
-                path=file_path,
-                message=commit_message,
-                content=file_content,
-                sha=contents.sha,
-                branch=branch
-            )
-            return f"Success! Updated {file_path} on GitHub!"
-            
-        except:
-            #CREATE new file
-            repo.create_file(
-                path=file_path,
-                message=commit_message,
-                content=file_content,
-                branch=branch
-            )
-            return f"Success! Created {file_path} on GitHub!"
-
-    except Exception as e:
-        return f"Git Error: {str(e)}"
\ No newline at end of file
+            ref.edit(commit.sha)
+            return commit.sha
+        except GithubException as e:
+            #422: not a fast forward any more, somebody pushed in between
+            if e.status != 422 or attempt == retries:
+                raise
+
+
+#Version control without the GitHub API: a working copy on disk, handled with the git CLI
+#Every commit_files() is a local commit (fast, no network), a background thread pushes the new commits
+#every push_interval seconds. Works with any remote (GitLab, Bitbucket, a bare repo on a share...), or none
+class LocalGitBackend:
+
+    def __init__(self, path, remote=None, branch="main", push_interval=DEFAULT_PUSH_INTERVAL):
+        self.path = path
+        self.remote = remote
+        self.branch = branch
+        self.push_interval = push_interval
+        self.last_push = None
+        self.last_error = None
+        self.unpushed = 0  #local commits not pushed yet, kept up to date by commit_files / push -> status() needs no git call
+        self._lock = threading.Lock()  #1 git command sequence at a time in the working copy (only local commands)
+        self._push_lock = threading.Lock()  #1 push at a time, the network part runs without self._lock
+        self._worker_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._cloned = False
+
+    def _git(self, *args, check=True):
+        try:
+            result = subprocess.run(["git", *args], cwd=self.path, capture_output=True, text=True,
+                                    timeout=GIT_TIMEOUT, env={**os.environ, **_GIT_ENV})
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"git {args[0]}: no answer in {GIT_TIMEOUT}s")
+        if check and result.returncode != 0:
+            raise RuntimeError(f"git {args[0]}: {(result.stderr or result.stdout).strip()}")
+        return result
+
+    #Clone the remote (or init an empty repo) the 1st time, check out the branch
+    def _ensure_clone(self):
+        if self._cloned:
+            return
+        if not os.path.isdir(os.path.join(self.path, ".git")):
+            os.makedirs(self.path, exist_ok=True)
+            if self.remote:
+                self._git("clone", self.remote, ".")
+            else:
+                self._git("init")
+        if self._git("rev-parse", "--abbrev-ref", "HEAD", check=False).stdout.strip() != self.branch:
+            if self.remote and self._git("rev-parse", "--verify", "--quiet", f"origin/{self.branch}", check=False).returncode == 0:
+                self._git("checkout", "-B", self.branch, f"origin/{self.branch}")
+            else:
+                self._git("checkout", "-B", self.branch)  #new branch (or an empty remote)
+        #commits need an author, the machine may have no global git config
+        if self._git("config", "user.email", check=False).returncode != 0:
+            self._git("config", "user.name", "Igloo")
+            self._git("config", "user.email", "igloo@localhost")
+        self._cloned = True
+
+    #Same contract as the module level commit_files: {path: content} -> sha of the new commit (None if nothing changed)
+    def commit_files(self, files, commit_message):
+        with self._lock:
+            self._ensure_clone()
+            for path, content in files.items():
+                full_path = os.path.join(self.path, path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, "w", encoding="utf-8", newline="\n") as f:
+                    f.write(content)
+            self._git("add", "--", *files)
+            if self._git("diff", "--cached", "--quiet", check=False).returncode == 0:
+                return None  #same content as committed already
+            self._git("commit", "-q", "-m", commit_message)
+            self.unpushed = self._unpushed() if self.remote else 0
+            return self._git("rev-parse", "HEAD").stdout.strip()
+
+    #{path: content} of the committed files under prefix, read from the working copy (only Igloo writes there)
+    def read_files(self, prefix):
+        with self._lock:
+            self._ensure_clone()
+            if not self._git("rev-parse", "--verify", "--quiet", "HEAD", check=False).stdout:
+                return {}
+            paths = self._git("ls-tree", "-r", "--name-only", "-z", "HEAD", "--", prefix).stdout.split("\0")
+            files = {}
+            for path in filter(None, paths):
+                with open(os.path.join(self.path, path), encoding="utf-8") as f:
+                    files[path] = f.read()
+            return files
+
+    #Local commits the remote doesn't have yet
+    def _unpushed(self):
+        if not self._git("rev-parse", "--verify", "--quiet", "HEAD", check=False).stdout:
+            return 0
+        upstream = f"origin/{self.branch}"
+        if self._git("rev-parse", "--verify", "--quiet", upstream, check=False).returncode != 0:
+            return int(self._git("rev-list", "--count", "HEAD").stdout)
+        return int(self._git("rev-list", "--count", f"{upstream}..HEAD").stdout)
+
+    #Push the local commits. A rejected push (somebody else pushed) is rebased on the remote branch and pushed again
+    #Only the rebase holds the working copy lock: commits go on while the push / fetch talk to the remote
+    def push(self):
+        if not self.remote or not os.path.isdir(os.path.join(self.path, ".git")):
+            return  #no clone yet, the 1st commit clones
+        with self._push_lock:
+            try:
+                with self._lock:
+                    self._ensure_clone()  #an existing clone: local commands only
+                    self.unpushed = self._unpushed()
+                if not self.unpushed:
+                    return
+                if self._git("push", "-q", "origin", f"HEAD:{self.branch}", check=False).returncode != 0:
+                    self._git("fetch", "-q", "origin", self.branch)
+                    with self._lock:
+                        if self._git("rebase", "-q", f"origin/{self.branch}", check=False).returncode != 0:
+                            self._git("rebase", "--abort", check=False)
+                            raise RuntimeError(f"the local commits conflict with origin/{self.branch}, resolve them in {self.path}")
+                    self._git("push", "-q", "origin", f"HEAD:{self.branch}")
+                with self._lock:
+                    self.unpushed = self._unpushed()
+                self.last_push = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+
+    #Start the push thread (once per process), it pushes right away: commits left by an earlier process go out first
+    def start(self):
+        with self._worker_lock:
+            if self.remote and (self._worker is None or not self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="igloo-git-push", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self.push()
+            self._wake.wait(timeout=self.push_interval)
+            self._wake.clear()
+
+    #Push now instead of waiting for the next round
+    def push_now(self):
+        self.start()
+        self._wake.set()
+
+    #{'unpushed': n, 'last_push': epoch or None, 'last_error': text}, from the counters: never waits for a running push
+    def status(self):
+        return {'unpushed': self.unpushed, 'last_push': self.last_push, 'last_error': self.last_error}
+
+
+def _git_backend_name():
+    return get_igloo_settings().get("git_backend", "github").lower()
+
+
+#[igloo] git_backend = "local" -> the LocalGitBackend of the [git_local] settings (1 per process), "github" (default) -> None
+@st.cache_resource(show_spinner=False)
+def get_git_backend():
+    if _git_backend_name() != "local":
+        return None
+    config = st.secrets["git_local"]
+    backend = LocalGitBackend(config["path"], remote=config.get("remote"), branch=config.get("branch", "main"),
+                              push_interval=float(config.get("push_interval", DEFAULT_PUSH_INTERVAL)))
+    backend.start()
+    return backend
+
+
+#{path: content} of every file under prefix on the branch, read in 1 go:
+#the working copy of the local backend, or 1 tarball download of the branch from GitHub (not 1 request per file)
+def get_repo_files(prefix="snowflake_objects/"):
+    backend = get_git_backend()
+    if backend is not None:
+        return backend.read_files(prefix)
+
+    import io
+    import tarfile
+    import requests
+
+    token, repo_name, branch, api_url = _github_settings()
+    url = _get_repo(token, repo_name, api_url).get_archive_link("tarball", ref=branch)
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as archive:
+        for member in archive:
+            #members are "<repo>-<sha>/path/in/repo"
+            path = member.name.split("/", 1)[-1]
+            if member.isfile() and path.startswith(prefix):
+                files[path] = archive.extractfile(member).read().decode("utf-8")
+    return files
+
+
+_QUEUE_TABLES = """
+CREATE TABLE IF NOT EXISTS git_queue (path TEXT PRIMARY KEY, content TEXT, message TEXT, version INTEGER,
+                                      enqueued_at REAL, attempts INTEGER, next_attempt REAL, last_error TEXT);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+#Durable outbound queue of repo files (sqlite), pushed by a background thread
+#1 row per path: writing a path again before it was pushed replaces the content (only the latest version is committed)
+#Everything due is pushed together in 1 commit
+class GitSyncQueue:
+
+    def __init__(self, path, push=None):
+        self.path = path
+        self._push = push or commit_files  #(files, message) -> commit sha, replaceable for tests
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        with connect(self.path) as conn:
+            conn.executescript(_QUEUE_TABLES)
+
+    def enqueue(self, path, content, message):
+        self.enqueue_many([(path, content, message)])
+
+    #[(path, content, message), ...] in 1 transaction, so the worker pushes them in the same commit
+    def enqueue_many(self, files):
+        now = time.time()
+        with self._lock, connect(self.path) as conn:
+            conn.executemany(
+                "INSERT INTO git_queue VALUES (?, ?, ?, 1, ?, 0, 0, NULL) "
+                "ON CONFLICT(path) DO UPDATE SET content = excluded.content, message = excluded.message, "
+                "version = version + 1, enqueued_at = excluded.enqueued_at, attempts = 0, next_attempt = 0, last_error = NULL",
+                [(path, content, message, now) for path, content, message in files])
+        self.start()
+        self._wake.set()
+
+    #Start the worker thread (once per process)
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="igloo-git-sync", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                wait = self.sync_once()
+            except Exception:
+                wait = RETRY_BASE_SECONDS  #eg. the sqlite file is locked, try again a bit later
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    #Push every due file in 1 commit -> seconds until the next retry is due (None: nothing left to wait for)
+    def sync_once(self):
+        now = time.time()
+        with self._lock, connect(self.path) as conn:
+            rows = conn.execute("SELECT path, content, message, version, attempts FROM git_queue "
+                                "WHERE attempts < ? AND next_attempt <= ? ORDER BY enqueued_at", (MAX_ATTEMPTS, now)).fetchall()
+        if rows:
+            files = {path: content for path, content, _, _, _ in rows}
+            if len(rows) == 1:
+                message = rows[0][2]
+            else:
+                message = f"Igloo sync of {len(rows)} files\n\n" + "\n".join(f"- {path}: {message}" for path, _, message, _, _ in rows)
+            try:
+                sha = self._push(files, message)
+                with self._lock, connect(self.path) as conn:
+                    #a row written again while it was pushed has a new version and stays in the queue
+                    conn.executemany("DELETE FROM git_queue WHERE path = ? AND version = ?", [(row[0], row[3]) for row in rows])
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_push', ?)", (str(time.time()),))
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_commit', ?)", (sha or "",))
+                    conn.execute("DELETE FROM meta WHERE key = 'last_error'")
+            except Exception as e:
+                with self._lock, connect(self.path) as conn:
+                    for path, _, _, version, attempts in rows:
+                        backoff = min(RETRY_BASE_SECONDS * 2 ** attempts, RETRY_MAX_SECONDS)
+                        conn.execute("UPDATE git_queue SET attempts = attempts + 1, next_attempt = ?, last_error = ? "
+                                     "WHERE path = ? AND version = ?", (time.time() + backoff, str(e), path, version))
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_error', ?)", (str(e),))
+
+        with self._lock, connect(self.path) as conn:
+            next_due = conn.execute("SELECT MIN(next_attempt) FROM git_queue WHERE attempts < ?", (MAX_ATTEMPTS,)).fetchone()[0]
+        return None if next_due is None else max(0.0, next_due - time.time())
+
+    #Give the failed files (MAX_ATTEMPTS reached) another round
+    def retry_failed(self):
+        with self._lock, connect(self.path) as conn:
+            conn.execute("UPDATE git_queue SET attempts = 0, next_attempt = 0 WHERE attempts >= ?", (MAX_ATTEMPTS,))
+        self.start()
+        self._wake.set()
+
+    #{path: content} of the files waiting in the queue (failed ones too): the newest version of those files
+    def pending_files(self):
+        with self._lock, connect(self.path) as conn:
+            return dict(conn.execute("SELECT path, content FROM git_queue"))
+
+    #{'pending': n, 'failed': n, 'last_push': epoch or None, 'last_commit': sha, 'last_error': text, 'files': [...]}
+    def status(self):
+        with self._lock, connect(self.path) as conn:
+            files = conn.execute("SELECT path, attempts, next_attempt, last_error FROM git_queue ORDER BY enqueued_at").fetchall()
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        failed = sum(1 for _, attempts, _, _ in files if attempts >= MAX_ATTEMPTS)
+        return {
+            'pending': len(files) - failed,
+            'failed': failed,
+            'last_push': float(meta['last_push']) if meta.get('last_push') else None,
+            'last_commit': meta.get('last_commit'),
+            'last_error': meta.get('last_error'),
+            'files': [{'path': path, 'attempts': attempts, 'next_attempt': next_attempt, 'error': error}
+                      for path, attempts, next_attempt, error in files],
+        }
+
+
+#1 queue (+ worker) per process, [igloo] git_queue_path says where the sqlite file is
+#Files left in the queue by an earlier process are pushed when it starts
+#With the local backend the worker commits into the clone, the clone pushes on its own schedule
+@st.cache_resource(show_spinner=False)
+def get_git_queue():
+    path = get_igloo_settings().get("git_queue_path", DEFAULT_QUEUE_PATH)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    backend = get_git_backend()
+    queue = GitSyncQueue(path, push=backend.commit_files if backend else None)
+    queue.start()
+    return queue
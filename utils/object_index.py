@@ -0,0 +1,81 @@
+from utils.object_search import ObjectSearchIndex
+
+#Object kinds in the index
+TABLE = 'table'
+DYNAMIC_TABLE = 'dynamic'
+VIEW = 'view'
+
+
+#Map 1 INFORMATION_SCHEMA.TABLES row to an object kind (None -> not something Igloo lists, eg. external tables)
+def classify(table_type, is_dynamic):
+    if is_dynamic == 'YES':
+        return DYNAMIC_TABLE
+    if table_type in ('VIEW', 'MATERIALIZED VIEW'):
+        return VIEW
+    if table_type in ('BASE TABLE', 'TEMPORARY TABLE'):
+        return TABLE
+    return None
+
+
+#Every table, dynamic table and view of 1 schema, loaded with 1 metadata query
+#get_tables/get_views are answered from here instead of separate SHOW commands
+class ObjectIndex:
+
+    def __init__(self, schema, objects=None):
+        self.schema = schema
+        self.objects = {}  #name -> {'kind': ..., 'last_altered': ...}
+        self._search = {}  #obj_type -> ObjectSearchIndex, built on first search
+        self._names = {}  #kinds -> sorted names, built on first use (the pages ask on every rerun)
+        for name, kind, last_altered in objects or []:
+            self.upsert(name, kind, last_altered)
+
+    def upsert(self, name, kind, last_altered=None):
+        self.objects[name] = {'kind': kind, 'last_altered': last_altered}
+        self._search = {}
+        self._names = {}
+
+    def _sorted_names(self, kinds):
+        names = self._names.get(kinds)
+        if names is None:
+            names = sorted(name for name, obj in self.objects.items() if obj['kind'] in kinds)
+            self._names[kinds] = names
+        return names
+
+    def names(self, *kinds):
+        return list(self._sorted_names(kinds))
+
+    #obj_type: 'all' (tables + dynamic tables, like SHOW TABLES), 'normal' or 'dynamic'
+    def tables(self, obj_type='all'):
+        if obj_type == 'normal':
+            return self.names(TABLE)
+        elif obj_type == 'dynamic':
+            return self.names(DYNAMIC_TABLE)
+        return self.names(TABLE, DYNAMIC_TABLE)
+
+    def views(self):
+        return self.names(VIEW)
+
+    #obj_type: same as tables() + 'view'
+    def list_objects(self, obj_type='all'):
+        return self.views() if obj_type == 'view' else self.tables(obj_type)
+
+    #Number of objects of list_objects(obj_type), without copying the list
+    def count(self, obj_type='all'):
+        kinds = {'view': (VIEW,), 'normal': (TABLE,), 'dynamic': (DYNAMIC_TABLE,)}.get(obj_type, (TABLE, DYNAMIC_TABLE))
+        return len(self._sorted_names(kinds))
+
+    #Top matches for a type-ahead box, the search index of an obj_type is built once and reused until the index changes
+    def search(self, query, obj_type='all', limit=50):
+        search_index = self._search.get(obj_type)
+        if search_index is None:
+            search_index = ObjectSearchIndex(self.list_objects(obj_type))
+            self._search[obj_type] = search_index
+        return search_index.search(query, limit)
+
+    #Newest LAST_ALTERED in this schema: everything changed after it is unknown to the index
+    def watermark(self):
+        stamps = [obj['last_altered'] for obj in self.objects.values() if obj['last_altered'] is not None]
+        return max(stamps) if stamps else None
+
+    def __len__(self):
+        return len(self.objects)
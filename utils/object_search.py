@@ -0,0 +1,57 @@
+from bisect import bisect_left
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+#Type-ahead search over object names (case insensitive)
+#Prefix matches come first (binary search on the sorted names), then names containing the text anywhere (trigram index)
+class ObjectSearchIndex:
+
+    def __init__(self, names):
+        self.names = sorted(names, key=str.upper)
+        self._upper = [name.upper() for name in self.names]
+        self._trigrams = {}  #trigram -> set of positions in self.names
+        for pos, name in enumerate(self._upper):
+            for gram in _trigrams(name):
+                self._trigrams.setdefault(gram, set()).add(pos)
+
+    #limit=None -> every match
+    def search(self, query, limit=50):
+        if limit is None:
+            limit = len(self.names)
+        query = (query or "").strip().upper()
+        if not query:
+            return self.names[:limit]
+
+        #1 prefix matches: they are next to each other in the sorted list
+        results = []
+        seen = set()
+        pos = bisect_left(self._upper, query)
+        while pos < len(self._upper) and self._upper[pos].startswith(query) and len(results) < limit:
+            results.append(self.names[pos])
+            seen.add(pos)
+            pos += 1
+
+        #2 substring matches: only names having every trigram of the query can contain it
+        if len(results) < limit:
+            if len(query) >= 3:
+                grams = sorted(_trigrams(query), key=lambda gram: len(self._trigrams.get(gram, ())))
+                candidates = set(self._trigrams.get(grams[0], ()))
+                for gram in grams[1:]:
+                    candidates &= self._trigrams.get(gram, set())
+                    if not candidates:
+                        break
+                candidates = sorted(candidates)
+            else:
+                candidates = range(len(self._upper))  #1-2 characters: too short for trigrams
+            for pos in candidates:
+                if pos not in seen and query in self._upper[pos]:
+                    results.append(self.names[pos])
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def __len__(self):
+        return len(self.names)
@@ -0,0 +1,70 @@
+from models.dynamic_table import DynamicTable
+from utils.ddl_parser import tokenize
+
+#Does a dynamic table query qualify for incremental refresh? Checked before deploy, so REFRESH_MODE = AUTO
+#doesn't silently fall back to FULL (every refresh recomputes the whole table)
+
+#Functions giving a different result on every refresh
+_NONDETERMINISTIC = {
+    'CURRENT_TIMESTAMP', 'CURRENT_TIME', 'CURRENT_DATE', 'LOCALTIMESTAMP', 'LOCALTIME', 'SYSDATE', 'GETDATE',
+    'SYSTIMESTAMP', 'RANDOM', 'RANDSTR', 'UNIFORM', 'NORMAL', 'ZIPF', 'UUID_STRING', 'SEQ1', 'SEQ2', 'SEQ4', 'SEQ8',
+    'CURRENT_USER', 'CURRENT_ROLE', 'CURRENT_SESSION', 'CURRENT_STATEMENT',
+}
+#Constructs incremental refresh doesn't support
+_UNSUPPORTED = {
+    'LIMIT': "LIMIT", 'TOP': "TOP", 'SAMPLE': "SAMPLE", 'TABLESAMPLE': "TABLESAMPLE",
+    'MINUS': "MINUS", 'EXCEPT': "EXCEPT", 'INTERSECT': "INTERSECT",
+    'PIVOT': "PIVOT", 'UNPIVOT': "UNPIVOT", 'MATCH_RECOGNIZE': "MATCH_RECOGNIZE", 'CONNECT': "CONNECT BY",
+    'RECURSIVE': "recursive CTE",
+}
+
+#Suffix of the throwaway table of check_incremental()
+CHECK_SUFFIX = "__IGLOO_CHECK"
+
+
+#Static check of the query text -> list of reasons it can't refresh incrementally ([] -> looks fine)
+#A heuristic: Snowflake has the last word (check_incremental), but this needs no query
+def incremental_blockers(query):
+    reasons = []
+    tokens = tokenize(query)
+    for pos, token in enumerate(tokens):
+        if token.kind != 'word':
+            continue
+        following = tokens[pos + 1] if pos + 1 < len(tokens) else None
+        if token.upper in _NONDETERMINISTIC:
+            reasons.append(f"non-deterministic function {token.upper}")
+        elif token.upper in _UNSUPPORTED:
+            if token.upper == 'CONNECT' and (following is None or following.upper != 'BY'):
+                continue
+            reasons.append(_UNSUPPORTED[token.upper])
+        elif token.upper == 'UNION' and (following is None or following.upper != 'ALL'):
+            reasons.append("UNION without ALL")
+    return list(dict.fromkeys(reasons))  #keep the order, drop repeats
+
+
+#Ask Snowflake: create the same query as an INCREMENTAL dynamic table with INITIALIZE = ON_SCHEDULE (returns at once,
+#no refresh runs), then drop it. -> None if it qualifies, the error message if not
+#The probe is named after the dynamic table, without a name there is nothing to probe
+def check_incremental(session, dynamic_table):
+    if not (dynamic_table.name or "").strip():
+        raise ValueError("The dynamic table needs a name before it can be checked.")
+    probe = DynamicTable(
+        schema=dynamic_table.schema,
+        name=f"{dynamic_table.name}{CHECK_SUFFIX}",
+        columns=dynamic_table.columns,
+        source_object=dynamic_table.sourceobject,
+        warehouse=dynamic_table.warehouse,
+        target_lag=dynamic_table.target_lag,
+        refresh_mode='INCREMENTAL',
+        initialize='ON_SCHEDULE')
+    try:
+        session.sql(probe.create_ddl()).collect()
+    except Exception as e:
+        return str(e)
+    finally:
+        #IF EXISTS: also runs when the create failed. A failed drop doesn't change the answer, the probe is only left behind
+        try:
+            session.sql(f"DROP DYNAMIC TABLE IF EXISTS {probe.schema}.{probe.name}").collect()
+        except Exception:
+            pass
+    return None
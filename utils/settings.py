@@ -0,0 +1,12 @@
+import streamlit as st
+
+#Optional app settings from the [igloo] section of .streamlit/secrets.toml
+#Streamlit in Snowflake has no secrets file at all: reading st.secrets raises there
+#(StreamlitSecretNotFoundError, a FileNotFoundError), which means "no settings", not an error
+def get_igloo_settings():
+    try:
+        if "igloo" in st.secrets:
+            return st.secrets["igloo"].to_dict()
+    except FileNotFoundError:
+        pass
+    return {}
@@ -1,7 +1,84 @@
+import threading
+import time
+from functools import lru_cache
 import streamlit as st
 from snowflake.snowpark import Session
 from snowflake.snowpark.context import get_active_session
-from cryptography.hazmat.primitives import serialization
+from utils.settings import get_igloo_settings
+
+#Seconds between 2 liveness checks of a cached local session
+HEALTH_CHECK_INTERVAL = 60
+
+
+#Read + decode the PEM only once per process, every later login reuses the DER bytes
+@lru_cache(maxsize=None)
+def _load_private_key(private_key_path):
+    #cryptography is only needed for key pair auth, so it's imported here and not at app start
+    from cryptography.hazmat.primitives import serialization
+
+    # Read the private key file
+    with open(private_key_path, "rb") as key_file:
+        p_key = serialization.load_pem_private_key(
+            key_file.read(),
+            password=None
+        )
+
+    # Snowpark expects the raw bytes of the key
+    return p_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+#Keeps 1 local Snowpark session alive and reuses it, instead of a new login on every get_session() call
+class SessionManager:
+
+    def __init__(self, config):
+        self.config = config
+        self._session = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        config = dict(self.config)
+        # A. Handle Key Pair Auth (The "Senior" Way)
+        if "private_key_path" in config:
+            config["private_key"] = _load_private_key(config["private_key_path"])
+            del config["private_key_path"] # Clean up param not needed by Snowpark
+        # B. Standard Auth (Password/ExternalBrowser) needs nothing extra
+        return Session.builder.configs(config).create()
+
+    #Cheap check, at most once per HEALTH_CHECK_INTERVAL: a SELECT 1 only needs cloud services, no warehouse
+    def _is_alive(self):
+        if time.monotonic() - self._checked_at < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            self._session.sql("SELECT 1").collect()
+            self._checked_at = time.monotonic()
+            return True
+        except Exception:
+            return False
+
+    #Returns the cached session, (re)connects transparently if there is none or it died (eg. expired token)
+    def get(self):
+        with self._lock:
+            if self._session is None or not self._is_alive():
+                if self._session is not None:
+                    try:
+                        self._session.close()
+                    except Exception:
+                        pass
+                self._session = self._connect()
+                self._checked_at = time.monotonic()
+            return self._session
+
+
+#1 manager per process and user (the secrets can point to different users on the same machine)
+@st.cache_resource(show_spinner=False)
+def _get_session_manager(account, user):
+    return SessionManager(st.secrets["snowflake"].to_dict())
+
 
 def get_session():
     """
@@ -9,6 +86,7 @@ def get_session():
     1. Checks for SiS (Active Session).
     2. Checks for Key Pair Auth (Local).
     3. Checks for Password/Browser Auth (Local Fallback).
+    Local sessions are created once and reused (see SessionManager).
     """
     # 1. Try Active Session (Running in Snowflake)
     try:
@@ -18,41 +96,51 @@ def get_session():
 
     # 2. Local Connection Logic
     if "snowflake" in st.secrets:
-        config = st.secrets["snowflake"].to_dict()
-        
-        # A. Handle Key Pair Auth (The "Senior" Way)
-        if "private_key_path" in config:
-            try:
-                # Read the private key file
-                with open(config["private_key_path"], "rb") as key_file:
-                    p_key = serialization.load_pem_private_key(
-                        key_file.read(),
-                        password=None
-                    )
-                
-                # Snowpark expects the raw bytes of the key
-                pkb = p_key.private_bytes(
-                    encoding=serialization.Encoding.DER,
-                    format=serialization.PrivateFormat.PKCS8,
-                    encryption_algorithm=serialization.NoEncryption()
-                )
-                
-                config["private_key"] = pkb
-                del config["private_key_path"] # Clean up param not needed by Snowpark
-                
-                return Session.builder.configs(config).create()
-                
-            except Exception as e:
+        config = st.secrets["snowflake"]
+        manager = _get_session_manager(config.get("account"), config.get("user"))
+        try:
+            return manager.get()
+        except Exception as e:
+            if "private_key_path" in config:
                 st.error(f"Key Pair Login failed: {e}")
-                return None
-
-        # B. Handle Standard Auth (Password/ExternalBrowser)
-        else:
-            try:
-                return Session.builder.configs(config).create()
-            except Exception as e:
+            else:
                 st.error(f"Standard Login failed: {e}")
-                return None
-    
+            return None
+
     st.error("No active session and no secrets found.")
-    return None
\ No newline at end of file
+    return None
+
+
+#Like get_session(), but without UI side effects: None instead of an st.error when there is no connection
+#(for optional checks running on every render, eg. the query validation)
+def find_session():
+    try:
+        return get_active_session()
+    except Exception:
+        pass
+    try:
+        if "snowflake" not in st.secrets:
+            return None
+        config = st.secrets["snowflake"]
+        return _get_session_manager(config.get("account"), config.get("user")).get()
+    except Exception:
+        return None  #no secrets file, login failed...
+
+
+#Database name the pages get with [igloo] data_provider = "mock" (no Snowflake session to ask)
+MOCK_DATABASE = "IGLOO_MOCK"
+
+
+#CURRENT_DATABASE() is a query, so it's asked once per browser session and remembered
+def get_current_database():
+    if "current_database" not in st.session_state:
+        #a Streamlit in Snowflake session wins, the secrets (and so the mock setting) are only read without one
+        try:
+            session = get_active_session()
+        except Exception:
+            session = None
+        if session is None and get_igloo_settings().get("data_provider") == "mock":
+            st.session_state.current_database = MOCK_DATABASE
+        else:
+            st.session_state.current_database = (session or get_session()).get_current_database()
+    return st.session_state.current_database
@@ -0,0 +1,13 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+#New connection per call -> safe to use from background threads too (the catalog snapshot, the git sync queue)
+@contextmanager
+def connect(path):
+    conn = sqlite3.connect(path)
+    try:
+        with conn:  #commit on success, rollback on error
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,169 @@
+import re
+import pandas as pd
+
+#Turns "deployed table -> edited table" into ALTER TABLE statements, so modify doesn't CREATE OR REPLACE
+#(that rewrites every row and loses Time Travel history + streams on the table)
+#Only changes Snowflake can't do in place fall back to a rebuild: CTAS into a temp table + SWAP WITH
+
+#Suffix of the temp table of a rebuild
+SWAP_SUFFIX = "__IGLOO_SWAP"
+
+_TYPE_RE = re.compile(r"^\s*([A-Z_ ]+?)\s*(?:\(\s*([^)]*)\))?\s*$")
+
+#Type name -> (family, default parameters), so 'NUMBER', 'INT' and 'NUMBER(38,0)' compare as the same type
+_TYPE_FAMILIES = {
+    'NUMBER': ('NUMBER', (38, 0)), 'DECIMAL': ('NUMBER', (38, 0)), 'NUMERIC': ('NUMBER', (38, 0)),
+    'INT': ('NUMBER', (38, 0)), 'INTEGER': ('NUMBER', (38, 0)), 'BIGINT': ('NUMBER', (38, 0)),
+    'SMALLINT': ('NUMBER', (38, 0)), 'TINYINT': ('NUMBER', (38, 0)), 'BYTEINT': ('NUMBER', (38, 0)),
+    'VARCHAR': ('VARCHAR', (16777216,)), 'STRING': ('VARCHAR', (16777216,)), 'TEXT': ('VARCHAR', (16777216,)),
+    'NVARCHAR': ('VARCHAR', (16777216,)), 'NVARCHAR2': ('VARCHAR', (16777216,)), 'CHAR VARYING': ('VARCHAR', (16777216,)),
+    'CHAR': ('VARCHAR', (1,)), 'CHARACTER': ('VARCHAR', (1,)), 'NCHAR': ('VARCHAR', (1,)),
+    'FLOAT': ('FLOAT', ()), 'FLOAT4': ('FLOAT', ()), 'FLOAT8': ('FLOAT', ()), 'DOUBLE': ('FLOAT', ()),
+    'DOUBLE PRECISION': ('FLOAT', ()), 'REAL': ('FLOAT', ()),
+    'TIMESTAMP': ('TIMESTAMP_NTZ', (9,)), 'DATETIME': ('TIMESTAMP_NTZ', (9,)), 'TIMESTAMP_NTZ': ('TIMESTAMP_NTZ', (9,)),
+    'TIMESTAMP_LTZ': ('TIMESTAMP_LTZ', (9,)), 'TIMESTAMP_TZ': ('TIMESTAMP_TZ', (9,)), 'TIME': ('TIME', (9,)),
+    'BINARY': ('BINARY', (8388608,)), 'VARBINARY': ('BINARY', (8388608,)),
+}
+
+
+#'varchar(100)' -> ('VARCHAR', (100,)), unknown types keep their text
+def normalize_type(data_type):
+    text = (data_type or "").upper()
+    match = _TYPE_RE.match(text)
+    if not match:
+        return (text.strip(), ())
+    name, params = " ".join(match.group(1).split()), match.group(2)
+    family, defaults = _TYPE_FAMILIES.get(name, (name, ()))
+    if params is None:
+        return (family, defaults)
+    values = []
+    for param in params.split(','):
+        param = param.strip()
+        values.append(int(param) if param.isdigit() else param)
+    #NUMBER(10) is NUMBER(10,0)
+    values += list(defaults[len(values):])
+    return (family, tuple(values))
+
+
+#Can ALTER COLUMN ... SET DATA TYPE turn old_type into new_type? Snowflake only allows widening:
+#longer VARCHAR, more NUMBER precision with the same scale
+def can_widen(old_type, new_type):
+    (old_family, old_params), (new_family, new_params) = normalize_type(old_type), normalize_type(new_type)
+    if old_family != new_family or len(old_params) != len(new_params) or not old_params:
+        return False
+    if old_family == 'VARCHAR':
+        return new_params[0] >= old_params[0]
+    if old_family == 'NUMBER':
+        return new_params[1] == old_params[1] and new_params[0] >= old_params[0]
+    return False
+
+
+#Which deployed column each edited row comes from, using the st.data_editor index:
+#the rows shown at start keep their position as index, rows added in the editor get a new one (>= the original row count)
+#-> 1 old column name (or None for added rows) per row that compile_table_columns keeps
+def column_origins(editor_result, name_column, old_table):
+    if editor_result.empty or name_column not in editor_result:
+        return []
+    old_columns = old_table.columns
+    names = editor_result[name_column].fillna('').astype(str).tolist()
+    origins = []
+    for index, name in zip(editor_result.index, names):
+        if not name:
+            continue
+        if pd.api.types.is_integer(index) and 0 <= index < len(old_columns):
+            origins.append(old_columns[index].name)
+        else:
+            origins.append(None)
+    return origins
+
+
+#What modify deploys for a table: either ALTER statements (in_place) or a rebuild, reasons says why a rebuild was needed
+class TableChangePlan:
+
+    def __init__(self, statements, in_place, reasons):
+        self.statements = statements
+        self.in_place = in_place
+        self.reasons = reasons
+
+    def script(self):
+        return "\n".join(self.statements)
+
+    def __bool__(self):
+        return bool(self.statements)
+
+
+#old: the deployed Table (from DESCRIBE TABLE), new: the edited Table
+#origins: old column name per new column (see column_origins), None -> columns are matched by name
+def plan_table_changes(old, new, origins=None):
+    target = f"{new.schema}.{new.name}"
+    old_by_name = {col.name.upper(): col for col in old.columns}
+    if origins is None:
+        origins = [col.name if col.name.upper() in old_by_name else None for col in new.columns]
+
+    kept = {origin.upper() for origin in origins if origin}
+    dropped = [col for col in old.columns if col.name.upper() not in kept]
+    remaining = {name for name in old_by_name if name in kept}  #old names still there after the drops
+    new_names = [col.name.upper() for col in new.columns]
+
+    reasons = []
+    if not kept:
+        reasons.append("every existing column is removed")
+    if len(set(new_names)) != len(new_names):
+        reasons.append("duplicate column names")
+
+    renames, type_changes, null_changes, adds = [], [], [], []
+    for col, origin in zip(new.columns, origins):
+        if origin is None:
+            adds.append(col)
+            continue
+        old_col = old_by_name[origin.upper()]
+        if col.name.upper() != old_col.name.upper():
+            if col.name.upper() in remaining:
+                reasons.append(f"{old_col.name} is renamed to the name of an existing column ({col.name})")
+            renames.append((old_col, col))
+        if normalize_type(col.data_type) != normalize_type(old_col.data_type):
+            if can_widen(old_col.data_type, col.data_type):
+                type_changes.append(col)
+            else:
+                reasons.append(f"{col.name}: {old_col.data_type} -> {col.data_type} can't be altered in place")
+        if col.nullable != old_col.nullable:
+            null_changes.append(col)
+
+    if reasons:
+        return TableChangePlan(rebuild_statements(old, new, origins), False, reasons)
+
+    #drops first (a new/renamed column may reuse a dropped name), adds last (ADD COLUMN appends, like the editor does)
+    statements = [f"ALTER TABLE {target} DROP COLUMN {col.name};" for col in dropped]
+    statements += [f"ALTER TABLE {target} RENAME COLUMN {old_col.name} TO {col.name};" for old_col, col in renames]
+    statements += [f"ALTER TABLE {target} ALTER COLUMN {col.name} SET DATA TYPE {col.data_type};" for col in type_changes]
+    statements += [f"ALTER TABLE {target} ALTER COLUMN {col.name} {'DROP' if col.nullable else 'SET'} NOT NULL;"
+                   for col in null_changes]
+    statements += [f"ALTER TABLE {target} ADD COLUMN {col.table_sql()};" for col in adds]
+    return TableChangePlan(statements, True, [])
+
+
+#Name of the temp table of a rebuild of schema.name
+def swap_table(schema, name):
+    return f"{schema}.{name}{SWAP_SUFFIX}"
+
+
+#CTAS the edited structure from the current data into a temp table, then SWAP WITH it: the table is replaced in 1 metadata step
+#and the old data stays under the temp name until drop_swap_statement is run (separate, explicit step)
+#SWAP WITH swaps the grants too, so the temp table has to carry the grants of the table: COPY GRANTS only copies them
+#from a cloned / replaced table, hence the CLONE first. A plain CREATE (no OR REPLACE) -> a leftover temp table fails the deploy
+def rebuild_statements(old, new, origins):
+    target = f"{new.schema}.{new.name}"
+    swap = swap_table(new.schema, new.name)
+    definitions = ",\n\t".join(col.table_sql() for col in new.columns)
+    #every new column reads its old column (cast to the new type), added ones start as NULL
+    selects = ",\n\t".join(f"{origin if origin else 'NULL'}::{col.data_type}" for col, origin in zip(new.columns, origins))
+    return [
+        f"CREATE TABLE {swap} CLONE {target} COPY GRANTS;",
+        f"CREATE OR REPLACE TABLE {swap}(\n\t{definitions}\n)\nCOPY GRANTS\nAS SELECT\n\t{selects}\nFROM {target};",
+        f"ALTER TABLE {target} SWAP WITH {swap};",
+    ]
+
+
+#Drops the old data a rebuild left under the temp name, once the rebuilt table is checked
+def drop_swap_statement(schema, name):
+    return f"DROP TABLE {swap_table(schema, name)};"
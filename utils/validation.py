@@ -0,0 +1,108 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+#Compiles the SELECT of a view / dynamic table with EXPLAIN before it's deployed: a bad expression or join condition
+#is found without running anything (EXPLAIN only needs cloud services, no warehouse resume)
+#Every column is on its own line of the query, so the "error line N" of the message points to the editor row
+
+#Seconds a result is reused (the sources can change in the meantime)
+VALIDATION_TTL = 300
+_MAX_CACHED = 512
+
+_LINE_RE = re.compile(r"line (\d+) at position (\d+)", re.I)
+
+#(user, role, database) + query hash -> (checked at, ValidationResult), shared by every session of the process:
+#the same query can compile for one role / database and fail for another, so a result is only reused by the same context
+_results = OrderedDict()
+_lock = threading.Lock()
+
+
+class ValidationResult:
+
+    def __init__(self, ok, message=None, column_index=None, join_index=None, checked=True):
+        self.ok = ok
+        self.message = message
+        self.column_index = column_index  #position in obj.columns the error points to (not the editor row, see location)
+        self.join_index = join_index  #-1: the base table (FROM), 0..: the joins in order
+        self.checked = checked  #False: Snowflake couldn't be asked (no session, network error...), deploy isn't blocked
+
+    #"Row 3 (SHORT_NAME)", "Join 2", ... for the error message
+    #rows: editor row of every column (ddl_compiler.select_column_rows), None -> the editor has no blank rows
+    def location(self, obj, rows=None):
+        if self.column_index is not None:
+            row = rows[self.column_index] if rows else self.column_index
+            return f"Row {row + 1} ({obj.columns[self.column_index].name})"
+        if self.join_index is not None:
+            return "FROM (base table)" if self.join_index < 0 else f"Join {self.join_index + 1}"
+        return None
+
+
+#-> (EXPLAIN query, [(first line, last line, 'column' / 'from', index), ...])
+def explain_query(obj):
+    lines = ["EXPLAIN USING TEXT", "SELECT"]
+    spans = []
+    for index, col in enumerate(obj.columns):
+        text = "\t" + col.select_sql() + ("," if index < len(obj.columns) - 1 else "")
+        first = len(lines) + 1  #error lines count from 1
+        lines += text.split("\n")
+        spans.append((first, len(lines), 'column', index))
+    #compile_from_clause writes the base table and every join on its own line
+    for index, text in enumerate(f"FROM {obj.sourceobject}".split("\n")):
+        lines.append(text)
+        spans.append((len(lines), len(lines), 'from', index - 1))
+    return "\n".join(lines), spans
+
+
+def _map_error(message, spans):
+    match = _LINE_RE.search(message)
+    detail = message.split("SQL compilation error:", 1)[-1].strip()
+    if match:
+        line = int(match.group(1))
+        for first, last, kind, index in spans:
+            if first <= line <= last:
+                if kind == 'column':
+                    return ValidationResult(False, detail, column_index=index)
+                return ValidationResult(False, detail, join_index=index)
+    return ValidationResult(False, detail)
+
+
+#Who the EXPLAIN runs as. Snowpark reads these from the connection (no query), a session that can't tell is only its own key
+def _context(session):
+    try:
+        return (session.get_current_user(), session.get_current_role(), session.get_current_database())
+    except Exception:
+        return (id(session),)
+
+
+#Validate a View / DynamicTable model, cached per context + query hash (an unchanged editor doesn't query again)
+def validate(session, obj):
+    if session is None:
+        return ValidationResult(True, "No Snowflake session, the query wasn't validated.", checked=False)
+    if not obj.columns:
+        return ValidationResult(False, "There are no columns to select.")
+    query, spans = explain_query(obj)
+    key = (_context(session), hashlib.sha256(query.encode()).hexdigest())
+    with _lock:
+        cached = _results.get(key)
+        if cached is not None and time.monotonic() - cached[0] < VALIDATION_TTL:
+            _results.move_to_end(key)
+            return cached[1]
+
+    try:
+        session.sql(query).collect()
+        result = ValidationResult(True)
+    except Exception as e:
+        message = str(e)
+        if "compilation error" not in message.lower():
+            #not a problem of the query: don't cache it and don't block the deploy
+            return ValidationResult(True, f"Couldn't validate the query: {message}", checked=False)
+        result = _map_error(message, spans)
+
+    with _lock:
+        _results[key] = (time.monotonic(), result)
+        while len(_results) > _MAX_CACHED:
+            _results.popitem(last=False)
+    return result